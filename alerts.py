@@ -0,0 +1,169 @@
+import threading
+import time
+from datetime import datetime
+
+from notifications import ConsoleNotifier
+
+# Stock below min_stock_level is LOW, below this fraction of it is CRITICAL
+CRITICAL_RATIO = 0.3
+
+
+def stock_alert_level(stock_quantity, min_stock_level):
+    """Return 'CRITICAL', 'LOW' or None for a product's stock position"""
+    if stock_quantity < min_stock_level * CRITICAL_RATIO:
+        return "CRITICAL"
+    if stock_quantity < min_stock_level:
+        return "LOW"
+    return None
+
+
+class LowStockAlertEngine:
+    """Incrementally maintained set of low-stock alerts.
+
+    Only products whose stock changed are re-evaluated: either products that
+    have new rows in inventory_log since the last pass, or products passed to
+    `evaluate_products` whose stock/minimum differ from what was last seen.
+    Notifications are deduplicated per (product, level), rate-limited by a
+    per-product cooldown and sent as one digest per flush.
+    """
+
+    def __init__(self, db, notifier=None, cooldown_minutes=60, max_per_digest=50):
+        self.db = db
+        self.notifier = notifier or ConsoleNotifier()
+        self.notifications_enabled = True
+        self.cooldown_seconds = cooldown_minutes * 60
+        self.max_per_digest = max_per_digest
+
+        self._lock = threading.Lock()
+        self._alerts = {}       # product_id -> alert dict
+        self._seen = {}         # product_id -> (stock_quantity, min_stock_level)
+        self._last_sent = {}    # (product_id, level) -> epoch seconds
+        self._pending = []      # alerts waiting for the next digest
+        self._last_log_id = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def evaluate_products(self, products):
+        """Re-evaluate the given product dicts that changed since last seen"""
+        with self._lock:
+            for product in products:
+                key = (product['stock_quantity'], product['min_stock_level'])
+                if self._seen.get(product['id']) != key:
+                    self._seen[product['id']] = key
+                    self._evaluate(product)
+
+    def process_inventory_log(self):
+        """Evaluate products with inventory_log rows newer than the last pass"""
+        if self._last_log_id is None:
+            # First pass: start from the current end of the log and evaluate everything
+            row = self.db.execute_query("SELECT COALESCE(MAX(id), 0) AS last_id FROM inventory_log")
+            if row is None:
+                return 0
+            self._last_log_id = row[0]['last_id']
+            changed = self.db.execute_query(
+                "SELECT id, name, category, stock_quantity, min_stock_level FROM products"
+            )
+        else:
+            changed_ids = self.db.execute_query("""
+                SELECT product_id, MAX(id) AS last_id FROM inventory_log
+                WHERE id > ? GROUP BY product_id
+            """, (self._last_log_id,))
+            if not changed_ids:
+                return 0
+            self._last_log_id = max(row['last_id'] for row in changed_ids)
+            placeholders = ",".join("?" * len(changed_ids))
+            changed = self.db.execute_query(f"""
+                SELECT id, name, category, stock_quantity, min_stock_level FROM products
+                WHERE id IN ({placeholders})
+            """, tuple(row['product_id'] for row in changed_ids))
+
+        self.evaluate_products(changed or [])
+        return len(changed or [])
+
+    def _evaluate(self, product):
+        level = stock_alert_level(product['stock_quantity'], product['min_stock_level'])
+        previous = self._alerts.get(product['id'])
+
+        if level is None:
+            # Stock recovered: resolve the alert so it can fire again later
+            self._alerts.pop(product['id'], None)
+            return
+
+        alert = {
+            'product_id': product['id'],
+            'Product': product['name'],
+            'Category': product.get('category'),
+            'Current Stock': product['stock_quantity'],
+            'Min Required': product['min_stock_level'],
+            'Status': level,
+            'raised_at': previous['raised_at'] if previous else datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        self._alerts[product['id']] = alert
+
+        # Only a new alert or a change of level is worth notifying about
+        if previous is None or previous['Status'] != level:
+            last = self._last_sent.get((product['id'], level))
+            if last is None or time.time() - last >= self.cooldown_seconds:
+                self._pending.append(alert)
+
+    def active_alerts(self, product_ids=None):
+        """Current alerts (for `product_ids` only, if given), critical first"""
+        with self._lock:
+            alerts = [a for a in self._alerts.values() if product_ids is None or a['product_id'] in product_ids]
+        return sorted(alerts, key=lambda a: (a['Status'] != "CRITICAL", a['Product']))
+
+    def counts(self, product_ids=None):
+        """Return (low_or_critical, critical) counts for the dashboard"""
+        alerts = self.active_alerts(product_ids)
+        return len(alerts), sum(1 for a in alerts if a['Status'] == "CRITICAL")
+
+    def flush(self):
+        """Send pending alerts as one digest; returns how many were sent"""
+        with self._lock:
+            pending = self._pending[:self.max_per_digest]
+            self._pending = self._pending[self.max_per_digest:]
+
+        if not pending or not self.notifications_enabled:
+            return 0
+
+        lines = [
+            f"{a['Status']}: {a['Product']} ({a['Category']}) - "
+            f"{a['Current Stock']} in stock, minimum {a['Min Required']}"
+            for a in pending
+        ]
+        critical = sum(1 for a in pending if a['Status'] == "CRITICAL")
+        subject = f"Low stock alert: {len(pending)} product(s), {critical} critical"
+
+        if not self.notifier.send(subject, "\n".join(lines)):
+            # Put them back so the next flush retries
+            with self._lock:
+                self._pending = pending + self._pending
+            return 0
+
+        now = time.time()
+        with self._lock:
+            for alert in pending:
+                self._last_sent[(alert['product_id'], alert['Status'])] = now
+        return len(pending)
+
+    def start(self, interval_seconds=30):
+        """Poll inventory_log and flush notifications in a background thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, interval_seconds):
+        while not self._stop_event.is_set():
+            try:
+                self.process_inventory_log()
+                self.flush()
+            except Exception as e:
+                print(f"Alert engine error: {e}")
+            self._stop_event.wait(interval_seconds)
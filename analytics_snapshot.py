@@ -0,0 +1,219 @@
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # snapshots are optional; reports fall back to the database
+    pa = None
+
+# Tables copied into the snapshot, with the timestamp column used for monthly partitions
+SNAPSHOT_TABLES = {
+    'sales': 'sale_date',
+    'inventory_log': 'created_at',
+}
+
+PART_PATTERN = re.compile(r"part-(\d+)-(\d+)\.parquet$")
+
+
+def arrow_type(declared):
+    """Arrow type for a SQLite declared column type"""
+    declared = (declared or "").upper()
+    if "INT" in declared:
+        return pa.int64()
+    if "REAL" in declared or "FLOA" in declared or "DOUB" in declared:
+        return pa.float64()
+    if "BOOL" in declared:
+        return pa.bool_()
+    if "TIMESTAMP" in declared or "DATE" in declared:
+        return pa.timestamp("s")
+    return pa.string()
+
+
+class AnalyticsSnapshot:
+    """Append-only Parquet copy of sales and inventory_log for analytics.
+
+    Files are laid out as `<root>/<table>/month=YYYY-MM/part-<first>-<last>.parquet`,
+    where first/last are the row-ID bounds of the export batch. Each run reads
+    only rows above the table's watermark (the highest exported ID, kept in
+    `<root>/_state.json`) through a read-only connection, so the tills' writes
+    are never blocked. Readers use pyarrow datasets with column and partition
+    pruning and never open the SQLite file.
+    """
+
+    def __init__(self, db, root="analytics", batch_size=50000, archive=None):
+        self.db = db
+        self.root = root
+        self.batch_size = batch_size
+        self.archive = archive  # lets the first export pick up months already archived
+        self.state_path = os.path.join(root, "_state.json")
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    @property
+    def available(self):
+        return pa is not None
+
+    def _read_state(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_state(self, state):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def synced_at(self):
+        """Time of the last completed export run, or None"""
+        value = self._read_state().get('synced_at')
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S") if value else None
+
+    def _connect(self):
+        conn = sqlite3.connect(f"file:{self.db.db_path}?mode=ro", uri=True, timeout=self.db.timeout)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def schema(self, conn, table):
+        return pa.schema([(row['name'], arrow_type(row['type']))
+                          for row in conn.execute(f"PRAGMA table_info({table})")])
+
+    def export(self):
+        """Append rows added since the last run to the Parquet snapshot; returns rows written per table"""
+        if not self.available:
+            print("Analytics snapshot skipped: pyarrow is not installed")
+            return None
+
+        with self._lock:
+            state = self._read_state()
+            written = {}
+            conn = self._connect()
+            try:
+                for table, time_col in SNAPSHOT_TABLES.items():
+                    watermark = state.get(table, 0)
+                    self._remove_orphans(table, watermark)
+                    schema = self.schema(conn, table)
+                    written[table] = 0
+                    # The first sales export also covers the archived months; the flag stays in the
+                    # state until that pass is complete, so an interrupted one resumes from the archive
+                    from_archive = (table == 'sales' and self.archive is not None
+                                    and state.get('sales_from_archive', watermark == 0))
+
+                    while True:
+                        if from_archive:
+                            rows = self.archive.query(datetime(1970, 1, 1), datetime(9999, 1, 1),
+                                                      "SELECT * FROM {sales} WHERE id > ? ORDER BY id LIMIT ?",
+                                                      (watermark, self.batch_size))
+                            if rows is None:
+                                raise sqlite3.OperationalError("sales archive query failed")
+                            # Each group of attached months is limited on its own; keep the lowest IDs overall
+                            rows = sorted(rows, key=lambda row: row['id'])[:self.batch_size]
+                            df = pd.DataFrame(rows, columns=schema.names)
+                            state['sales_from_archive'] = True
+                        else:
+                            df = pd.read_sql_query(
+                                f"SELECT * FROM {table} WHERE id > ? ORDER BY id LIMIT ?",
+                                conn, params=(watermark, self.batch_size)
+                            )
+                        if df.empty:
+                            break
+
+                        self._write_batch(table, time_col, schema, df)
+                        watermark = int(df['id'].max())
+                        written[table] += len(df)
+                        # Record progress per batch so a crash only repeats the current batch
+                        state[table] = watermark
+                        self._write_state(state)
+
+                    if from_archive:
+                        state.pop('sales_from_archive', None)
+            except Exception as e:
+                print(f"Analytics snapshot error: {e}")
+                return None
+            finally:
+                conn.close()
+
+            state['synced_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._write_state(state)
+            return written
+
+    def _write_batch(self, table, time_col, schema, df):
+        for name, field in zip(schema.names, schema.types):
+            if pa.types.is_timestamp(field):
+                df[name] = pd.to_datetime(df[name], errors='coerce')
+
+        first, last = int(df['id'].min()), int(df['id'].max())
+        months = df[time_col].dt.strftime("%Y-%m").fillna("unknown")
+        for month, part in df.groupby(months):
+            directory = os.path.join(self.root, table, f"month={month}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{first:012d}-{last:012d}.parquet")
+            arrow_table = pa.Table.from_pandas(part, schema=schema, preserve_index=False)
+            pq.write_table(arrow_table, path + ".tmp", compression="zstd")
+            os.replace(path + ".tmp", path)
+
+    def _remove_orphans(self, table, watermark):
+        """Drop files from a batch that was written but never recorded (interrupted run)"""
+        for path in glob.glob(os.path.join(self.root, table, "month=*", "part-*.parquet*")):
+            match = PART_PATTERN.search(path)
+            if path.endswith(".tmp") or (match and int(match.group(1)) > watermark):
+                os.remove(path)
+
+    def read(self, table, columns=None, start=None, end=None):
+        """Read a snapshot table as a DataFrame, loading only `columns` and the months in [start, end)"""
+        if not self.available:
+            return None
+        directory = os.path.join(self.root, table)
+        if not os.path.isdir(directory):
+            return None
+
+        time_col = SNAPSHOT_TABLES[table]
+        dataset = ds.dataset(directory, format="parquet", partitioning="hive")
+        conditions = []
+        if start is not None:
+            conditions.append(ds.field('month') >= start.strftime("%Y-%m"))
+            conditions.append(ds.field(time_col) >= pa.scalar(start, type=pa.timestamp("s")))
+        if end is not None:
+            conditions.append(ds.field('month') <= end.strftime("%Y-%m"))
+            conditions.append(ds.field(time_col) < pa.scalar(end, type=pa.timestamp("s")))
+
+        row_filter = None
+        for condition in conditions:
+            row_filter = condition if row_filter is None else row_filter & condition
+        return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+    def start(self, interval_seconds=3600):
+        """Export new rows in a background thread (hourly by default)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, interval_seconds):
+        while not self._stop_event.is_set():
+            try:
+                self.export()
+            except Exception as e:
+                print(f"Analytics snapshot error: {e}")
+            self._stop_event.wait(interval_seconds)
@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+from datetime import datetime
+
+# Events recorded by the app (audit_log.event)
+EVENTS = ('Login', 'Login Failed', 'Logout', 'Sale', 'Product Added', 'Product Updated', 'Product Deleted',
+          'Settings Changed', 'User Added', 'User Updated', 'User Deleted', 'Password Reset', 'Logs Cleared',
+          'Access Denied')
+STATUSES = ('SUCCESS', 'FAILED', 'WARNING')
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _text(value):
+    return None if value is None else str(value)
+
+
+class AuditLog:
+    """Append-only audit trail written through an in-memory buffer.
+
+    `record` only appends to the buffer, so callers such as checkout never
+    wait on the database; a background thread inserts the buffer in one
+    transaction every `flush_interval` seconds, or as soon as `batch_size`
+    entries are waiting. If the database is unavailable the batch is kept
+    and retried. At most `max_buffer` entries are held; beyond that the
+    oldest are dropped and counted in `dropped`.
+    """
+
+    def __init__(self, db, batch_size=200, flush_interval=2.0, max_buffer=50000):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = deque(maxlen=max_buffer)
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def record(self, event, user=None, details=None, status='SUCCESS', ip_address=None):
+        """Queue an audit entry; returns immediately"""
+        # Stored as text so one odd value can never make a whole batch fail to bind
+        entry = (datetime.now().strftime(TIMESTAMP_FORMAT), _text(user), str(event), str(status),
+                 _text(details), _text(ip_address))
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append(entry)
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """Write buffered entries in one transaction; returns how many were written"""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+            if not batch:
+                return 0
+
+            written = self.db.execute_many("""
+                INSERT INTO audit_log (created_at, user, event, status, details, ip_address)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, batch)
+            if not written:
+                # Keep the batch (ahead of anything recorded meanwhile) for the next attempt
+                with self._lock:
+                    room = self._buffer.maxlen - len(self._buffer)
+                    self.dropped += max(len(batch) - room, 0)
+                    self._buffer.extendleft(reversed(batch[-room:] if room else []))
+                return 0
+            return len(batch)
+
+    def query(self, users=None, events=None, statuses=None, start=None, end=None, limit=100, before=None):
+        """Newest-first page of entries matching the filters.
+
+        `before` is the (created_at, id) of the last row of the previous page
+        (keyset paging), so deep pages cost the same as the first one. Each
+        filter column has a (column, created_at) index.
+        """
+        conditions, params = [], []
+        for column, values in (('user', users), ('event', events), ('status', statuses)):
+            if values:
+                conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if start is not None:
+            conditions.append("created_at >= ?")
+            params.append(start.strftime(TIMESTAMP_FORMAT))
+        if end is not None:
+            conditions.append("created_at < ?")
+            params.append(end.strftime(TIMESTAMP_FORMAT))
+        if before is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(before)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.db.execute_query(f"""
+            SELECT id, created_at, user, event, status, details, ip_address
+            FROM audit_log
+            {where}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        """, params + [limit]) or []
+
+    def purge(self, before):
+        """Delete entries older than the datetime `before` (retention); returns True on success"""
+        self.flush()
+        return self.db.execute_query("DELETE FROM audit_log WHERE created_at < ?",
+                                     (before.strftime(TIMESTAMP_FORMAT),))
+
+    def start(self):
+        """Flush in the background until stop()"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Audit log flush error: {e}")
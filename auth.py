@@ -1,60 +1,72 @@
+import time
 import streamlit as st
-import hashlib
+import metrics
+import passwords
 from database import Database
 
 class Authentication:
-    def __init__(self):
-        self.db = Database()
+    def __init__(self, db=None, limiter=None):
+        # Share the app's connection instead of opening a second one per session
+        self.db = db or Database()
+        # Process-wide LoginRateLimiter (None disables rate limiting)
+        self.limiter = limiter
         
     def hash_password(self, password):
-        """Simple password hashing"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Salted, cost-tunable password hash (see passwords.py)"""
+        return passwords.hash_password(password)
     
-    def login(self, username, password):
+    def login(self, username, password, ip_address=None):
         """Authenticate user"""
+        # Bursts are turned away in memory, before any hashing or database work
+        if self.limiter is not None:
+            wait = self.limiter.check(username, ip_address)
+            if wait:
+                metrics.LOGIN_ATTEMPTS.labels("rate_limited").inc()
+                return {'authenticated': False, 'rate_limited': True,
+                        'error': f'Too many login attempts, try again in {int(wait) + 1} seconds'}
+        
+        start = time.perf_counter()
         # SQLite uses ? as placeholder, not %s
-        query = "SELECT * FROM users WHERE username = ? AND password = ? AND is_active = TRUE"
-        hashed_password = self.hash_password(password)
+        query = "SELECT * FROM users WHERE username = ? AND is_active = TRUE"
         
         try:
-            result = self.db.execute_query(query, (username, hashed_password))
-            
-            if result and len(result) > 0:
-                user = result[0]
-                
-                # Store authentication in session state
-                st.session_state.authenticated = True
-                st.session_state.username = user['username']
-                st.session_state.role = user['role']
-                st.session_state.user_id = user['id']
-                
-                return {
-                    'authenticated': True,
-                    'username': user['username'],
-                    'role': user['role'],
-                    'user_id': user['id']
-                }
-                
+            result = self.db.execute_query(query, (username,))
         except Exception as e:
             st.error(f"Database error: {e}")
             return {'authenticated': False, 'error': 'System error'}
+        if result is None:
+            return {'authenticated': False, 'error': 'System error'}
+        
+        user = result[0] if result else None
+        if user is None:
+            # Unknown usernames cost as much as wrong passwords, so timing does not reveal accounts
+            passwords.dummy_verify(password)
+        if user is None or not passwords.verify_password(password, user['password']):
+            metrics.LOGIN_ATTEMPTS.labels("failed").inc()
+            metrics.LOGIN_SECONDS.observe(time.perf_counter() - start)
+            return {'authenticated': False, 'error': 'Invalid credentials'}
+        
+        # Legacy (plaintext / unsalted) or weaker-than-current hashes are upgraded on the way in
+        if passwords.needs_rehash(user['password']):
+            self.db.execute_query("UPDATE users SET password = ? WHERE id = ?",
+                                  (self.hash_password(password), user['id']))
+        if self.limiter is not None:
+            self.limiter.succeeded(username)
+        metrics.LOGIN_ATTEMPTS.labels("success").inc()
+        metrics.LOGIN_SECONDS.observe(time.perf_counter() - start)
         
-        # For demo purposes, check default credentials
-        if username == 'admin' and password == 'admin123':
-            # Store in session state for demo user too
-            st.session_state.authenticated = True
-            st.session_state.username = 'admin'
-            st.session_state.role = 'admin'
-            st.session_state.user_id = 1
-            
-            return {
-                'authenticated': True,
-                'username': 'admin',
-                'role': 'admin',
-                'user_id': 1
-            }
+        # Store authentication in session state
+        st.session_state.authenticated = True
+        st.session_state.username = user['username']
+        st.session_state.role = user['role']
+        st.session_state.user_id = user['id']
         
-        return {'authenticated': False, 'error': 'Invalid credentials'}
+        return {
+            'authenticated': True,
+            'username': user['username'],
+            'role': user['role'],
+            'user_id': user['id']
+        }
     
     def logout(self):
         """Clear session state - only auth-related keys"""
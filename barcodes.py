@@ -0,0 +1,67 @@
+import re
+from collections import namedtuple
+
+# GS1 reserves EAN-13 prefixes 20-29 for in-store numbering, so codes the shop
+# prints itself never clash with manufacturers' barcodes
+IN_STORE_PREFIX = "20"
+
+# "3*5012345678900" adds three units of one product with a single scan
+QUANTITY_PREFIX = re.compile(r"^(\d{1,3})\*(.+)$")
+
+Scan = namedtuple('Scan', ['code', 'quantity'])
+
+
+def ean13_check_digit(digits):
+    """Check digit for the first 12 digits of an EAN-13 code"""
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return str((10 - total % 10) % 10)
+
+
+def in_store_barcode(product_id):
+    """EAN-13 barcode for a product without a manufacturer's one, from its id"""
+    body = f"{IN_STORE_PREFIX}{product_id:010d}"
+    return body + ean13_check_digit(body)
+
+
+def default_sku(product_id):
+    return f"SKU-{product_id:05d}"
+
+
+def normalize_code(code):
+    """A scanned or typed code as it is indexed: no surrounding whitespace, SKUs upper-case"""
+    return (code or "").strip().upper()
+
+
+def parse_scan(text):
+    """Scan for scanner input, honouring a 'quantity*' prefix; None if empty"""
+    text = normalize_code(text)
+    if not text:
+        return None
+    match = QUANTITY_PREFIX.match(text)
+    if match and int(match.group(1)) > 0:
+        return Scan(match.group(2).strip(), int(match.group(1)))
+    return Scan(text, 1)
+
+
+class BarcodeIndex:
+    """Barcode and SKU -> product for one catalogue, so a scan is a single dictionary lookup.
+
+    Built once per catalogue version from the product rows the session
+    already holds; the rows themselves are the snapshot handed back.
+    """
+
+    def __init__(self, products):
+        self._by_code = {}
+        for product in products or []:
+            # A barcode wins over a SKU that happens to be spelled the same
+            for column in ('sku', 'barcode'):
+                code = normalize_code(product.get(column))
+                if code:
+                    self._by_code[code] = product
+
+    def __len__(self):
+        return len(self._by_code)
+
+    def lookup(self, code):
+        """The product with this barcode or SKU, or None"""
+        return self._by_code.get(normalize_code(code))
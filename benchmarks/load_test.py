@@ -0,0 +1,227 @@
+"""Load test: concurrent tills, report viewers and backups against one database.
+
+Drives the same code the app uses -- the shared `Database`, `OfflineTill` /
+`CheckoutPipeline` for sales and the `sales_reports` queries behind the
+Reports page -- from threads, without a browser. The database is seeded with
+a synthetic catalogue and sales history by data_generator.bulk_load first
+(or reused with --db if it is already seeded), then N tills, M managers and
+a periodic backup run for --duration seconds. Throughput and latency percentiles per operation are
+printed as JSON, so runs can be diffed to spot regressions.
+
+    python benchmarks/load_test.py --products 10000 --sales 10000000 --tills 8 --managers 2
+    python benchmarks/load_test.py --sales 200000 --duration 20 --output results.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+from checkout import CheckoutPipeline
+from data_generator import PAYMENT_METHODS, bulk_load
+from database import Database
+from instrumentation import percentile
+from money import cart_totals
+from sales_reports import TIMESTAMP_FORMAT, period_range, load_sales, sales_over_time
+from till_queue import OfflineTill, TillQueue
+
+REPORT_PERIODS = ("Today", "Yesterday", "Last 7 Days", "This Month", "Last Month")
+
+
+class LatencyRecorder:
+    """Every sample per operation (the run is bounded, so nothing is windowed)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._errors = {}
+
+    def record(self, operation, seconds, ok=True):
+        with self._lock:
+            self._samples.setdefault(operation, []).append(seconds * 1000)
+            if not ok:
+                self._errors[operation] = self._errors.get(operation, 0) + 1
+
+    def summary(self, elapsed):
+        with self._lock:
+            items = [(op, sorted(values), self._errors.get(op, 0)) for op, values in self._samples.items()]
+
+        result = {}
+        for operation, values, errors in sorted(items):
+            result[operation] = {
+                'count': len(values),
+                'errors': errors,
+                'throughput_per_s': round(len(values) / elapsed, 2),
+                'p50_ms': round(percentile(values, 0.50), 2),
+                'p95_ms': round(percentile(values, 0.95), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'max_ms': round(values[-1], 2)
+            }
+        return result
+
+
+def is_seeded(db, products, sales):
+    result = db.execute_query("""
+        SELECT (SELECT COUNT(*) FROM products) AS products,
+               (SELECT COUNT(*) FROM sales WHERE transaction_id >= 'GEN' AND transaction_id < 'GEO') AS sales
+    """)
+    return bool(result) and result[0]['products'] == products and result[0]['sales'] == sales
+
+
+def run_till(till_no, db, till, recorder, stop, seed, products, max_lines):
+    """Add random products to a cart and check out, back to back"""
+    rng = random.Random(seed + till_no)
+    run_id = datetime.now().strftime("%Y%m%d%H%M%S")  # keeps IDs unique when --db is reused
+    sale_no = 0
+    while not stop.is_set():
+        cart = []
+        for _ in range(rng.randint(1, max_lines)):
+            start = time.perf_counter()
+            rows = db.execute_query("SELECT id, name, price_cents, stock_quantity FROM products WHERE id = ?",
+                                    (rng.randint(1, products),))
+            recorder.record('add_to_cart', time.perf_counter() - start, ok=bool(rows))
+            if rows:
+                product = rows[0]
+                quantity = rng.randint(1, 5)
+                cart.append({'id': product['id'], 'name': product['name'], 'price_cents': product['price_cents'],
+                             'quantity': quantity, 'total_cents': product['price_cents'] * quantity})
+
+        sale_no += 1
+        totals = cart_totals([item['price_cents'] for item in cart], [item['quantity'] for item in cart], 16.0)
+        receipt_data = {
+            'transaction_id': f"LOAD{run_id}-{till_no:02d}-{sale_no:08d}",
+            'customer_name': f"Customer {sale_no}",
+            'items': [dict(item, tax_cents=int(tax)) for item, tax in zip(cart, totals.line_tax)],
+            'subtotal_cents': totals.subtotal,
+            'tax_rate': 16.0,
+            'tax_cents': totals.tax,
+            'total_cents': totals.total,
+            'payment_method': rng.choice(PAYMENT_METHODS),
+            'date': datetime.now().strftime(TIMESTAMP_FORMAT),
+            'user': f"till{till_no}"
+        }
+        start = time.perf_counter()
+        try:
+            status = till.checkout(receipt_data, user_id=1)
+        except Exception as e:
+            print(f"Till {till_no} checkout error: {e}")
+            status = None
+        recorder.record('checkout', time.perf_counter() - start, ok=status is not None)
+        if status:
+            recorder.record(f"checkout_{status}", time.perf_counter() - start)
+
+
+def run_manager(manager_no, db, recorder, stop, seed):
+    """Load the Reports page's sales table and trend chart for random periods"""
+    rng = random.Random(seed + 1000 + manager_no)
+    while not stop.is_set():
+        start, end = period_range(rng.choice(REPORT_PERIODS))
+        began = time.perf_counter()
+        try:
+            df = load_sales(db, start, end)
+            sales_over_time(db, start, end)
+            ok = df is not None
+        except Exception as e:
+            print(f"Manager {manager_no} report error: {e}")
+            ok = False
+        recorder.record('report', time.perf_counter() - began, ok=ok)
+
+
+def run_backups(db, recorder, stop, interval, workdir):
+    """Back the database up every `interval` seconds while the load runs"""
+    while not stop.wait(interval):
+        path = os.path.join(workdir, "backup.db")
+        start = time.perf_counter()
+        ok = db.backup_database(path) is not None
+        recorder.record('backup', time.perf_counter() - start, ok=ok)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def run(args, workdir):
+    """Seed (unless already seeded), run the load for args.duration and return the results"""
+    db = Database(args.db or os.path.join(workdir, "load_test.db"), timeout=30)
+    db.create_tables()
+
+    seed_seconds = 0.0
+    if not is_seeded(db, args.products, args.sales):
+        start = time.perf_counter()
+        bulk_load(db, args.products, sales=args.sales, years=args.years, seed=args.seed)
+        seed_seconds = time.perf_counter() - start
+
+    pipeline = CheckoutPipeline(db)
+    till = OfflineTill(pipeline, TillQueue(os.path.join(workdir, "till_queue.jsonl")), busy_timeout=5)
+    recorder = LatencyRecorder()
+    stop = threading.Event()
+
+    threads = [threading.Thread(target=run_till, args=(n, db, till, recorder, stop, args.seed,
+                                                       args.products, args.max_lines))
+               for n in range(args.tills)]
+    threads += [threading.Thread(target=run_manager, args=(n, db, recorder, stop, args.seed))
+                for n in range(args.managers)]
+    if args.backup_interval > 0:
+        threads.append(threading.Thread(target=run_backups,
+                                        args=(db, recorder, stop, args.backup_interval, workdir)))
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pipeline.shutdown()
+
+    db.close()
+
+    return {
+        'run_at': datetime.now().strftime(TIMESTAMP_FORMAT),
+        'config': vars(args),
+        'seed_seconds': round(seed_seconds, 2),
+        'elapsed_seconds': round(elapsed, 2),
+        'operations': recorder.summary(elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--sales", type=int, default=10_000_000, help="sales lines of seeded history")
+    parser.add_argument("--years", type=float, default=2, help="years of seeded history")
+    parser.add_argument("--tills", type=int, default=4)
+    parser.add_argument("--managers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after seeding")
+    parser.add_argument("--backup-interval", type=float, default=20, help="seconds between backups (0 = none)")
+    parser.add_argument("--max-lines", type=int, default=5, help="most cart lines per sale")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="database to seed and reuse between runs (default: a temporary file)")
+    parser.add_argument("--output", help="write the JSON results here as well as to stdout")
+    args = parser.parse_args()
+
+    # The app logs with print(); keep stdout for the JSON results
+    with contextlib.redirect_stdout(sys.stderr):
+        workdir = tempfile.mkdtemp(prefix="load_test_")
+        try:
+            results = run(args, workdir)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Money arithmetic benchmark: integer cents (money.py) against float amounts in NumPy.
+
+Computes line totals, tax and the day's total for `--lines` sales lines
+both ways, per tax rounding rule, and reports the best of `--repeat` runs
+plus how far the float grand total drifted from the exact integer one.
+
+    python benchmarks/money_benchmark.py --lines 1000000
+    python benchmarks/money_benchmark.py --lines 5000000 --repeat 10 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from money import PER_INVOICE, PER_LINE, apply_rate, from_cents, rate_basis_points, to_cents
+
+TAX_RATE = 16.0
+
+
+def best_of(repeat, func):
+    """Fastest wall time (seconds) of `repeat` calls, and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    prices = np.round(rng.lognormal(5, 0.8, args.lines), 2)
+    quantities = rng.geometric(0.6, args.lines)
+    price_cents = to_cents(prices)
+    basis_points = rate_basis_points(TAX_RATE)
+
+    def floats():
+        lines = prices * quantities
+        return (lines + lines * (TAX_RATE / 100)).sum()
+
+    def cents(rounding):
+        def compute():
+            lines = price_cents * quantities
+            if rounding == PER_LINE:
+                return int((lines + apply_rate(lines, basis_points)).sum())
+            subtotal = int(lines.sum())
+            return subtotal + apply_rate(subtotal, basis_points)
+        return compute
+
+    float_seconds, float_total = best_of(args.repeat, floats)
+    results = {'lines': args.lines, 'float_ms': round(float_seconds * 1000, 2), 'float_total': float(float_total)}
+    exact = {}
+    for rounding in (PER_INVOICE, PER_LINE):
+        seconds, exact[rounding] = best_of(args.repeat, cents(rounding))
+        key = rounding.lower().replace(" ", "_")
+        results[f"cents_{key}_ms"] = round(seconds * 1000, 2)
+        results[f"cents_{key}_total"] = from_cents(exact[rounding])
+    results['float_drift_cents'] = round(float(float_total) * 100 - exact[PER_INVOICE], 4)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['lines']:,} lines")
+    print(f"  float64:             {results['float_ms']:8.2f} ms  total {results['float_total']:,.6f}")
+    print(f"  cents, per invoice:  {results['cents_per_invoice_ms']:8.2f} ms  total {results['cents_per_invoice_total']:,.2f}")
+    print(f"  cents, per line:     {results['cents_per_line_ms']:8.2f} ms  total {results['cents_per_line_total']:,.2f}")
+    print(f"  float drift:         {results['float_drift_cents']} cents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Password hash cost benchmark: login latency for each scrypt / PBKDF2 cost setting.
+
+Each candidate hashes the admin password at that cost, then runs full
+Authentication.login calls (database lookup + verify) from `--concurrency`
+threads, as simultaneous logins at shift start would. Reports p50/p95/p99
+per setting and recommends the strongest one whose p95 stays under
+`--target-ms`; apply it with the PASSWORD_SCRYPT_N (or PASSWORD_SCHEME=
+pbkdf2_sha256 and PASSWORD_PBKDF2_ITERATIONS) environment variables.
+
+    python benchmarks/password_hash_benchmark.py --target-ms 250
+    python benchmarks/password_hash_benchmark.py --concurrency 8 --logins 40 --json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import passwords
+from auth import Authentication
+from database import Database
+from instrumentation import percentile
+
+SCRYPT_CANDIDATES = [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16, 2 ** 17]
+PBKDF2_CANDIDATES = [100000, 200000, 400000, 600000, 1000000]
+PASSWORD = "admin123"
+
+
+def measure(auth, logins, concurrency):
+    """Latencies (seconds) of `logins` successful logins split across `concurrency` threads"""
+    samples = []
+    lock = threading.Lock()
+
+    def worker(count):
+        for _ in range(count):
+            start = time.perf_counter()
+            result = auth.login("admin", PASSWORD)
+            elapsed = time.perf_counter() - start
+            if not result.get('authenticated'):
+                raise RuntimeError(f"login failed: {result}")
+            with lock:
+                samples.append(elapsed)
+
+    per_thread = max(1, logins // concurrency)
+    threads = [threading.Thread(target=worker, args=(per_thread,)) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(samples)
+
+
+def run(args, workdir):
+    db = Database(os.path.join(workdir, "password_bench.db"))
+    db.create_tables()
+    auth = Authentication(db)   # no rate limiter: every attempt is hashed
+
+    candidates = [('scrypt', {'n': n}) for n in SCRYPT_CANDIDATES]
+    candidates += [('pbkdf2_sha256', {'iterations': i}) for i in PBKDF2_CANDIDATES]
+    results = []
+    for scheme, params in candidates:
+        # Run as if configured through the environment, so login does not rehash to other defaults
+        passwords.DEFAULT_SCHEME = scheme
+        passwords.SCRYPT_N = params.get('n', passwords.SCRYPT_N)
+        passwords.PBKDF2_ITERATIONS = params.get('iterations', passwords.PBKDF2_ITERATIONS)
+        db.execute_query("UPDATE users SET password = ? WHERE username = 'admin'",
+                         (passwords.hash_password(PASSWORD),))
+        samples = measure(auth, args.logins, args.concurrency)
+        results.append({
+            'scheme': scheme,
+            'params': params,
+            'p50_ms': percentile(samples, 0.50) * 1000,
+            'p95_ms': percentile(samples, 0.95) * 1000,
+            'p99_ms': percentile(samples, 0.99) * 1000,
+        })
+    db.close()
+
+    recommended = {}
+    for scheme in ('scrypt', 'pbkdf2_sha256'):
+        fitting = [r for r in results if r['scheme'] == scheme and r['p95_ms'] <= args.target_ms]
+        recommended[scheme] = fitting[-1]['params'] if fitting else None
+    return {'target_ms': args.target_ms, 'concurrency': args.concurrency,
+            'results': results, 'recommended': recommended}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=250, help="login p95 budget")
+    parser.add_argument("--concurrency", type=int, default=4, help="simultaneous logins")
+    parser.add_argument("--logins", type=int, default=20, help="logins per cost setting")
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    # Authentication writes to st.session_state; outside `streamlit run` that only logs warnings
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(args, workdir)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"Login latency, {args.concurrency} concurrent logins, target p95 {args.target_ms:.0f} ms")
+    for r in results['results']:
+        params = ", ".join(f"{k}={v}" for k, v in r['params'].items())
+        marker = "" if r['p95_ms'] <= args.target_ms else "  over target"
+        print(f"  {r['scheme']:<14} {params:<18} p50 {r['p50_ms']:7.1f}  p95 {r['p95_ms']:7.1f}  "
+              f"p99 {r['p99_ms']:7.1f} ms{marker}")
+    for scheme, params in results['recommended'].items():
+        print(f"  recommended {scheme}: {params or 'none within target'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Scan lookup benchmark: the barcode/SKU hash index (barcodes.py) against a linear catalogue search.
+
+Builds a synthetic catalogue of `--products` rows with data_generator,
+then resolves `--scans` random barcodes and SKUs through BarcodeIndex and,
+for comparison, by scanning the product list the way the search box does.
+Reports the index build time and the per-scan latency of both.
+
+    python benchmarks/scan_benchmark.py --products 50000
+    python benchmarks/scan_benchmark.py --products 200000 --scans 5000 --json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from barcodes import BarcodeIndex
+from data_generator import generate_products
+
+
+def catalogue(rng, count):
+    """Product rows as the session holds them (dicts, like Database.get_products)"""
+    columns = generate_products(rng, count)
+    names = ('id', 'name', 'category', 'price_cents', 'stock_quantity', 'sku', 'barcode')
+    values = [columns[c] if isinstance(columns[c], list) else columns[c].tolist() for c in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    products = catalogue(rng, args.products)
+    picks = rng.integers(len(products), size=args.scans).tolist()
+    codes = [products[i]['barcode'] if n % 2 else products[i]['sku'].lower() for n, i in enumerate(picks)]
+
+    start = time.perf_counter()
+    index = BarcodeIndex(products)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = [index.lookup(code) for code in codes]
+    index_seconds = time.perf_counter() - start
+
+    # The linear search only gets a fraction of the scans; it is the slow path being replaced
+    linear_codes = codes[:args.linear_scans]
+    start = time.perf_counter()
+    for code in linear_codes:
+        code = code.strip().upper()
+        next((p for p in products if p['barcode'] == code or p['sku'] == code), None)
+    linear_seconds = time.perf_counter() - start
+
+    return {
+        'products': args.products,
+        'scans': args.scans,
+        'all_found': all(p is not None and p['id'] == products[i]['id'] for p, i in zip(found, picks)),
+        'index_build_ms': round(build_seconds * 1000, 2),
+        'index_lookup_us': round(index_seconds / len(codes) * 1e6, 3),
+        'linear_lookup_us': round(linear_seconds / len(linear_codes) * 1e6, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--scans", type=int, default=100_000)
+    parser.add_argument("--linear-scans", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{results['products']:,} products, {results['scans']:,} scans (all found: {results['all_found']})")
+    print(f"  index build:     {results['index_build_ms']:10.2f} ms")
+    print(f"  index lookup:    {results['index_lookup_us']:10.3f} us per scan")
+    print(f"  linear search:   {results['linear_lookup_us']:10.3f} us per scan")
+
+
+if __name__ == "__main__":
+    main()
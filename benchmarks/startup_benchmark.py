@@ -0,0 +1,82 @@
+"""Cold-start benchmark: time until the login page of app.py is first rendered.
+
+Every run is a fresh Python process with an empty working directory (so the
+database is created from scratch, as on a first deploy). Reports the median
+and spread, and which heavy modules had been imported by the time the login
+page was on screen -- ideally none.
+
+    python benchmarks/startup_benchmark.py --runs 5
+    python benchmarks/startup_benchmark.py --runs 5 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'plotly.express', 'reportlab', 'pyarrow', 'streamlit_option_menu')
+
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {app_dir!r})
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file({app_path!r}, default_timeout=120).run()
+painted = time.perf_counter()
+print(json.dumps({{
+    'streamlit_import': imported - start,
+    'first_paint': painted - imported,
+    'total': painted - start,
+    'login_rendered': any(b.key == 'login_btn' for b in at.button),
+    'exception': [str(e.value) for e in at.exception],
+    'heavy_loaded': [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once():
+    code = CHILD.format(app_dir=APP_DIR, app_path=os.path.join(APP_DIR, "app.py"), heavy=HEAVY_MODULES)
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(os.environ, TILL_QUEUE_PATH=os.path.join(workdir, "till_queue.jsonl"))
+        output = subprocess.run([sys.executable, "-c", code], cwd=workdir, env=env,
+                                capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {}
+    for metric in ('streamlit_import', 'first_paint', 'total'):
+        values = [r[metric] for r in runs]
+        summary[metric] = {
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values),
+        }
+    summary['login_rendered'] = all(r['login_rendered'] and not r['exception'] for r in runs)
+    summary['heavy_loaded'] = sorted({m for r in runs for m in r['heavy_loaded']})
+
+    if args.json:
+        print(json.dumps({'runs': runs, 'summary': summary}, indent=2))
+        return
+
+    print(f"{args.runs} cold starts of the login page")
+    for metric in ('streamlit_import', 'first_paint', 'total'):
+        s = summary[metric]
+        print(f"  {metric:<17} median {s['median'] * 1000:7.1f} ms   "
+              f"(min {s['min'] * 1000:.1f}, max {s['max'] * 1000:.1f})")
+    print(f"  login rendered    {'yes' if summary['login_rendered'] else 'NO'}")
+    print(f"  heavy modules     {', '.join(summary['heavy_loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
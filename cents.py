@@ -0,0 +1,21 @@
+# The NumPy-free part of money.py: column names, SQL conversion and scalar
+# rounding, so the database layer can use them without loading NumPy at startup
+CENTS = 100
+
+# Integer-cents column -> the REAL column it replaced; rows written before the
+# cents columns existed (and old archives) are converted with cents_sql
+PRODUCT_CENTS_COLUMNS = {'price_cents': 'price'}
+SALES_CENTS_COLUMNS = {'unit_price_cents': 'unit_price', 'total_cents': 'total_price', 'tax_cents': 'tax_amount'}
+
+
+def cents_sql(column):
+    """SQL expression converting a REAL amount column to integer cents"""
+    return f"CAST(ROUND({column} * {CENTS}) AS INTEGER)"
+
+
+def amount_to_cents(amount):
+    """One amount in currency units as integer cents, rounding half away from zero (as money.to_cents)"""
+    # Rounded to 6 places first, so 1.005 (stored as 1.00499999...) still counts as a half cent
+    value = round(float(amount) * CENTS, 6)
+    cents = int(abs(value) + 0.5)
+    return -cents if value < 0 else cents
@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from inventory_ledger import InventoryLedger
+from money import from_cents, with_cents
+from stores import DEFAULT_STORE_ID
+
+
+def line_transaction_id(transaction_id, line_no):
+    """sales.transaction_id is unique per row, so each cart line gets a suffix"""
+    return f"{transaction_id}-{line_no}"
+
+
+class CheckoutPipeline:
+    """Commit sales synchronously, then run follow-up work in the background.
+
+    `commit_sale` writes the sale lines and their stock movements in one
+    transaction and returns as soon as that commit is done. Everything else
+    (receipt rendering, alerts, audit logging, rollups...) is registered with
+    `add_task` and runs on a small worker pool, with retries and exponential
+    backoff, after the commit.
+    """
+
+    def __init__(self, db, ledger=None, workers=2, max_retries=3, retry_delay=0.5, keep_results=500):
+        self.db = db
+        self.ledger = ledger or InventoryLedger(db)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.keep_results = keep_results
+
+        self._tasks = []
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="checkout")
+        self._lock = threading.Lock()
+        self._results = OrderedDict()   # (transaction_id, task name) -> result
+        self._pending = 0
+        self.failures = []
+
+    def add_task(self, name, func):
+        """Register func(receipt_data) to run in the background after every sale"""
+        self._tasks.append((name, func))
+
+    def commit_sale(self, receipt_data, user_id=None):
+        """Write the sale and its stock movements; returns True once committed"""
+        try:
+            self.write_sales([(receipt_data, user_id)])
+        except Exception as e:
+            print(f"Checkout error: {e}")
+            return False
+        return True
+
+    def write_sales(self, sales):
+        """Commit (receipt_data, user_id) pairs in one transaction and dispatch their tasks.
+
+        Idempotent by transaction ID: sales that are already in the database
+        are skipped, so replaying the same sale twice is harmless. Returns
+        the receipts that were newly written; raises if the commit fails.
+        """
+        conn = self.db.get_connection()
+        if conn is None:
+            raise sqlite3.OperationalError("Database unavailable")
+
+        written = []
+        counts = {}
+        # The connection is shared with every other writer, which all hold db.lock
+        with self.db.lock:
+            with conn:
+                for receipt_data, user_id in sales:
+                    # Sales queued on a till before money was kept in cents carry float amounts
+                    receipt_data = with_cents(receipt_data)
+                    if self._write_sale(conn, receipt_data, user_id, counts):
+                        written.append(receipt_data)
+            self.ledger.committed(counts)
+
+        for receipt_data in written:
+            self._dispatch(receipt_data)
+        return written
+
+    def _write_sale(self, conn, receipt_data, user_id, counts):
+        transaction_id = receipt_data['transaction_id']
+        already_saved = conn.execute(
+            "SELECT 1 FROM sales WHERE transaction_id = ?",
+            (line_transaction_id(transaction_id, 1),)
+        ).fetchone()
+        if already_saved:
+            return False
+
+        sale_date = receipt_data.get('date') or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        # Sales queued on a till before stores existed carry no store
+        store_id = receipt_data.get('store_id') or DEFAULT_STORE_ID
+
+        rows = []
+        for line_no, item in enumerate(receipt_data['items'], start=1):
+            rows.append((
+                line_transaction_id(transaction_id, line_no),
+                item['id'],
+                item['quantity'],
+                item['price_cents'],
+                item['total_cents'],
+                item['tax_cents'],
+                item.get('discount_cents', 0),
+                from_cents(item['price_cents']),
+                from_cents(item['total_cents']),
+                from_cents(item['tax_cents']),
+                receipt_data.get('payment_method'),
+                receipt_data.get('customer_name'),
+                user_id,
+                sale_date,
+                store_id
+            ))
+
+        movements = [{
+            'product_id': item['id'],
+            'action': 'sale',
+            'quantity_change': -item['quantity'],
+            'notes': transaction_id
+        } for item in receipt_data['items']]
+
+        conn.executemany("""
+            INSERT INTO sales (transaction_id, product_id, quantity, unit_price_cents, total_cents, tax_cents,
+                               discount_cents, unit_price, total_price, tax_amount, payment_method, customer_info,
+                               user_id, sale_date, store_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        self.ledger.apply_movements(conn, movements, user_id=user_id, created_at=sale_date, counts=counts)
+        return True
+
+    def _dispatch(self, receipt_data):
+        for name, func in self._tasks:
+            with self._lock:
+                self._pending += 1
+            self._executor.submit(self._run_task, name, func, receipt_data)
+
+    def _run_task(self, name, func, receipt_data):
+        transaction_id = receipt_data['transaction_id']
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    result = func(receipt_data)
+                    with self._lock:
+                        self._results[(transaction_id, name)] = result
+                        while len(self._results) > self.keep_results:
+                            self._results.popitem(last=False)
+                    return
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        print(f"Checkout task '{name}' failed for {transaction_id}: {e}")
+                        with self._lock:
+                            self.failures.append({
+                                'transaction_id': transaction_id,
+                                'task': name,
+                                'error': str(e),
+                                'failed_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                            })
+                        return
+                    time.sleep(self.retry_delay * (2 ** attempt))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def result(self, transaction_id, name):
+        """Result of a finished background task, or None if not (yet) available"""
+        with self._lock:
+            return self._results.get((transaction_id, name))
+
+    def pending(self):
+        """Number of background tasks queued or running"""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,271 @@
+"""Deterministic synthetic data at scale: catalogue, users and years of sales.
+
+Everything is drawn from one seeded numpy generator, so the same seed and
+end date always produce the same database. Sales are generated and inserted
+in time order, a few weeks at a time, so memory stays bounded and both the
+transaction_id and sale_date indexes are only ever appended to.
+
+    python data_generator.py --db perf.db --products 10000 --sales 10000000 --years 3
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import passwords
+from barcodes import default_sku, in_store_barcode
+from database import Database
+from money import apply_rate, from_cents, rate_basis_points, to_cents
+
+# Department -> sub-category -> typical price (KES); departments are stored as products.category
+CATALOGUE = {
+    'Beverages': {'Water': 50, 'Soft Drinks': 80, 'Juice': 150, 'Coffee': 200, 'Tea': 120, 'Energy Drinks': 250},
+    'Food': {'Sandwiches': 300, 'Burgers': 450, 'Pizza': 800, 'Grills': 650, 'Salads': 400, 'Breakfast': 500},
+    'Dessert': {'Ice Cream': 200, 'Cakes': 250, 'Pastries': 180},
+    'Bar': {'Beer': 300, 'Wine': 1500, 'Spirits': 2500, 'Cocktails': 900},
+    'Snacks': {'Crisps': 100, 'Nuts': 150, 'Chocolate': 120, 'Biscuits': 90},
+    'Toiletries': {'Soap': 120, 'Toothpaste': 180, 'Sunscreen': 1200, 'Shampoo': 450},
+    'Spa': {'Massage': 4500, 'Facial': 3500, 'Sauna': 1500},
+}
+BRANDS = ('Savanna', 'Rift', 'Tusker', 'Amani', 'Kilima', 'Pwani', 'Safari', 'Jambo', 'Baraka', 'Zawadi')
+SIZES = ('Small', 'Regular', 'Large', 'Family', 'Single', 'Double')
+
+PAYMENT_METHODS = ('Cash', 'Credit Card', 'M-Pesa', 'Debit Card', 'Bank Transfer')
+PAYMENT_MIX = (0.22, 0.18, 0.45, 0.12, 0.03)
+
+# Cart lines per transaction (1..6)
+BASKET_SIZES = np.arange(1, 7)
+BASKET_MIX = np.array([0.40, 0.25, 0.15, 0.10, 0.06, 0.04])
+
+# Relative traffic by weekday (Mon..Sun) and by hour of day
+WEEKDAY_WEIGHTS = np.array([0.80, 0.85, 0.90, 0.95, 1.20, 1.45, 1.25])
+HOUR_WEIGHTS = np.array([0.1, 0.05, 0.02, 0.02, 0.02, 0.1, 0.5, 1.2, 1.5, 1.0, 0.9, 1.1,
+                         1.8, 1.7, 1.1, 0.9, 1.0, 1.4, 2.0, 2.2, 1.9, 1.3, 0.7, 0.3])
+
+ANNUAL_GROWTH = 0.15
+TAX_RATE = 16.0  # percent
+CHUNK_DAYS = 28
+
+
+def _digit_codes(numbers, width):
+    """Unicode code points of zero-padded decimal ints, one row per number"""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    return (numbers[:, None] // powers % 10 + ord('0')).astype(np.uint32)
+
+
+def _transaction_ids(numbers, line_no):
+    """'GEN<10 digits>-<line>' strings, assembled as code points without a Python loop"""
+    prefix = np.broadcast_to(np.array([ord(c) for c in 'GEN'], dtype=np.uint32), (len(numbers), 3))
+    dash = np.full((len(numbers), 1), ord('-'), dtype=np.uint32)
+    codes = np.hstack([prefix, _digit_codes(numbers, 10), dash, _digit_codes(line_no, 1)])
+    return codes.view('U15').ravel()
+
+
+def _timestamps(seconds):
+    """'YYYY-MM-DD HH:MM:SS' strings for Unix seconds (SQLite's TIMESTAMP text format)"""
+    text = np.datetime_as_string(seconds.astype('datetime64[s]'), unit='s').astype('U19')
+    text.view('U1').reshape(len(text), 19)[:, 10] = ' '
+    return text
+
+
+def generate_products(rng, count):
+    """Columns of a catalogue: lognormal prices around each sub-category's typical price"""
+    subcategories = [(department, name, price) for department, items in CATALOGUE.items()
+                     for name, price in items.items()]
+    pick = rng.integers(len(subcategories), size=count)
+    typical = np.array([s[2] for s in subcategories], dtype=float)[pick]
+    # Prices end in 0 or 5 like real shelf prices
+    prices = np.maximum(np.round(typical * rng.lognormal(0, 0.35, count) / 5) * 5, 5)
+    brands = rng.integers(len(BRANDS), size=count)
+    sizes = rng.integers(len(SIZES), size=count)
+    min_stock = rng.integers(5, 50, size=count)
+
+    names, categories, descriptions = [], [], []
+    for i, (s, b, z) in enumerate(zip(pick.tolist(), brands.tolist(), sizes.tolist()), start=1):
+        department, subcategory, _ = subcategories[s]
+        names.append(f"{BRANDS[b]} {subcategory} {SIZES[z]} #{i}")
+        categories.append(department)
+        descriptions.append(f"{department} > {subcategory}")
+
+    return {
+        'id': np.arange(1, count + 1),
+        'name': names,
+        'category': categories,
+        'price': prices,
+        'price_cents': to_cents(prices),
+        'stock_quantity': min_stock * rng.integers(2, 20, size=count),
+        'min_stock_level': min_stock,
+        'description': descriptions,
+        'sku': [default_sku(i) for i in range(1, count + 1)],
+        'barcode': [in_store_barcode(i) for i in range(1, count + 1)],
+    }
+
+
+def generate_users(rng, count):
+    """Columns of staff accounts: mostly clerks, a few managers (the admin is created by create_tables)"""
+    roles = rng.choice(['manager', 'clerk'], size=count, p=[0.15, 0.85])
+    usernames = [f"{role}{i:04d}" for i, role in enumerate(roles.tolist(), start=1)]
+    return {
+        'username': usernames,
+        # Salted hashes, so the random salts are the only non-deterministic values
+        'password': [passwords.hash_password('changeme') for _ in range(count)],
+        'role': roles.tolist(),
+        'email': [f"{u}@system.com" for u in usernames],
+    }
+
+
+def day_weights(days):
+    """Relative sales volume per day: weekly cycle, holiday season peak, steady growth"""
+    ordinals = np.array([d.toordinal() for d in days])
+    weekday = np.array([d.weekday() for d in days])
+    day_of_year = np.array([d.timetuple().tm_yday for d in days])
+    years = (ordinals - ordinals[0]) / 365.25
+    annual = 1 + 0.25 * np.cos(2 * np.pi * (day_of_year - 355) / 365.25)  # peaks around Christmas
+    return WEEKDAY_WEIGHTS[weekday] * annual * (1 + ANNUAL_GROWTH) ** years
+
+
+def generate_sales(rng, count, price_cents, user_ids, start, end):
+    """Yield column chunks of `count` sales lines between the dates start and end, oldest first"""
+    days = [start + timedelta(days=i) for i in range((end - start).days)]
+    if count <= 0 or not days:
+        return
+    weights = day_weights(days)
+
+    # Basket sizes up front, so the lines add up to exactly `count`
+    n_transactions = int(count / (BASKET_SIZES * BASKET_MIX).sum() * 1.05) + 10
+    baskets = rng.choice(BASKET_SIZES, size=n_transactions, p=BASKET_MIX)
+    cut = int(np.searchsorted(np.cumsum(baskets), count))
+    baskets = baskets[:cut + 1]
+    baskets[-1] -= baskets.sum() - count
+    per_day = rng.multinomial(len(baskets), weights / weights.sum())
+
+    # Zipf-like popularity over a shuffled catalogue: a few best sellers, a long tail
+    popularity = 1 / np.arange(1, len(price_cents) + 1) ** 1.1
+    popularity = rng.permutation(popularity / popularity.sum())
+    hour_p = HOUR_WEIGHTS / HOUR_WEIGHTS.sum()
+    epoch = datetime(1970, 1, 1)
+
+    txn = 0
+    for first_day in range(0, len(days), CHUNK_DAYS):
+        chunk = per_day[first_day:first_day + CHUNK_DAYS]
+        n = int(chunk.sum())
+        if n == 0:
+            continue
+        midnight = int((datetime.combine(days[first_day], datetime.min.time()) - epoch).total_seconds())
+        seconds = (midnight + np.repeat(np.arange(len(chunk)) * 86400, chunk)
+                   + rng.choice(24, size=n, p=hour_p) * 3600 + rng.integers(3600, size=n))
+        seconds.sort()
+
+        sizes = baskets[txn:txn + n]
+        lines = int(sizes.sum())
+        numbers = np.repeat(np.arange(txn + 1, txn + n + 1), sizes)
+        line_no = np.arange(lines) - np.repeat(np.cumsum(sizes) - sizes, sizes) + 1
+        product_ids = rng.choice(len(price_cents), size=lines, p=popularity) + 1
+        quantity = rng.geometric(0.6, size=lines)
+        unit_price = price_cents[product_ids - 1]
+        total = unit_price * quantity
+        tax = apply_rate(total, rate_basis_points(TAX_RATE))
+
+        yield {
+            'transaction_id': _transaction_ids(numbers, line_no),
+            'product_id': product_ids,
+            'quantity': quantity,
+            'unit_price_cents': unit_price,
+            'total_cents': total,
+            'tax_cents': tax,
+            'unit_price': from_cents(unit_price),
+            'total_price': from_cents(total),
+            'tax_amount': from_cents(tax),
+            'payment_method': np.array(PAYMENT_METHODS)[np.repeat(
+                rng.choice(len(PAYMENT_METHODS), size=n, p=PAYMENT_MIX), sizes)],
+            'user_id': np.repeat(rng.choice(user_ids, size=n), sizes),
+            'sale_date': _timestamps(np.repeat(seconds, sizes)),
+        }
+        txn += n
+
+
+def bulk_load(db, products=10000, users=50, sales=1_000_000, years=2, seed=42, end=None):
+    """Replace the catalogue, staff (except admin) and sales history with generated data.
+
+    Sales cover `years` years up to the day before `end` (default today).
+    Returns a dict of row counts and load time.
+    """
+    rng = np.random.default_rng(seed)
+    end = end or date.today()
+    start = end - timedelta(days=int(round(years * 365.25)))
+    conn = db.get_connection()
+    began = time.perf_counter()
+
+    product_cols = generate_products(rng, products)
+    user_cols = generate_users(rng, users)
+
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")  # a failed load is simply rerun
+    try:
+        with db.lock, conn:
+            for table in ('inventory_snapshots', 'inventory_log', 'sales', 'products'):
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("DELETE FROM users WHERE username != 'admin'")
+            conn.executemany("""
+                INSERT INTO products (id, name, category, price, price_cents, stock_quantity, min_stock_level,
+                                      description, sku, barcode)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, zip(*(product_cols[c] if isinstance(product_cols[c], list) else product_cols[c].tolist()
+                       for c in ('id', 'name', 'category', 'price', 'price_cents', 'stock_quantity',
+                                 'min_stock_level', 'description', 'sku', 'barcode'))))
+            conn.execute("""
+                INSERT INTO inventory_log (product_id, action, quantity_change, new_quantity, notes, created_at)
+                SELECT id, 'adjustment', stock_quantity, stock_quantity, 'Opening stock', ?
+                FROM products
+            """, (start.strftime("%Y-%m-%d 00:00:00"),))
+            conn.executemany("INSERT INTO users (username, password, role, email) VALUES (?, ?, ?, ?)",
+                             zip(user_cols['username'], user_cols['password'], user_cols['role'],
+                                 user_cols['email']))
+
+        user_ids = np.array([row[0] for row in conn.execute("SELECT id FROM users")])
+        for chunk in generate_sales(rng, sales, product_cols['price_cents'], user_ids, start, end):
+            with db.lock, conn:
+                conn.executemany("""
+                    INSERT INTO sales (transaction_id, product_id, quantity, unit_price_cents, total_cents,
+                                       tax_cents, unit_price, total_price, tax_amount, payment_method, user_id,
+                                       sale_date)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, zip(*(chunk[c].tolist() for c in ('transaction_id', 'product_id', 'quantity',
+                                                       'unit_price_cents', 'total_cents', 'tax_cents',
+                                                       'unit_price', 'total_price', 'tax_amount',
+                                                       'payment_method', 'user_id', 'sale_date'))))
+    finally:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+
+    return {
+        'products': products,
+        'users': users + 1,
+        'sales': sales,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'seconds': round(time.perf_counter() - began, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="synthetic.db")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--sales", type=int, default=1_000_000, help="sales lines")
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end", type=date.fromisoformat, help="day after the last sale (default today)")
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.create_tables()
+    result = bulk_load(db, args.products, args.users, args.sales, args.years, args.seed, args.end)
+    print(f"Loaded {result['products']} products, {result['users']} users and {result['sales']} sales "
+          f"({result['start']} to {result['end']}) in {result['seconds']}s")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,29 @@
 import sqlite3
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import json
-import os
+import threading
+import time
+from instrumentation import timings, normalize_sql
+import metrics
+import passwords
+from permissions import DEFAULT_ROLE_PERMISSIONS
+from stores import DEFAULT_STORE_ID
+from cents import PRODUCT_CENTS_COLUMNS, SALES_CENTS_COLUMNS, amount_to_cents, cents_sql
+from barcodes import default_sku, in_store_barcode
 
 class Database:
-    def __init__(self, db_path="sales_system.db"):
+    def __init__(self, db_path="sales_system.db", timeout=5.0):
         self.db_path = db_path
+        self.timeout = timeout  # seconds to wait on a locked database
         self.connection = None
+        # The connection is shared by every session's thread; hold this around multi-statement transactions
+        self.lock = threading.RLock()
         self.connect()
         
     def connect(self):
         """Establish database connection"""
         try:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
             self.connection.row_factory = sqlite3.Row  # This enables dictionary-like access
             print(f"Database connected successfully: {self.db_path}")
         except sqlite3.Error as err:
@@ -21,6 +31,12 @@ class Database:
             # Create in-memory data for demo
             self.connection = None
             
+    def set_timeout(self, seconds):
+        """Change how long queries wait on a locked database"""
+        self.timeout = seconds
+        if self.connection:
+            self.connection.execute(f"PRAGMA busy_timeout = {int(seconds * 1000)}")
+    
     def get_connection(self):
         if not self.connection:
             self.connect()
@@ -31,29 +47,64 @@ class Database:
         if conn is None:
             return None
             
-        cursor = conn.cursor()
+        start = time.perf_counter()
+        rows = None
+        with self.lock:
+            cursor = conn.cursor()
+            try:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                    
+                if query.strip().upper().startswith('SELECT'):
+                    results = cursor.fetchall()
+                    rows = len(results)
+                    # Convert sqlite3.Row objects to dictionaries
+                    return [dict(row) for row in results]
+                conn.commit()
+                rows = cursor.rowcount
+                return True
+            except Exception as e:
+                print(f"Query error: {e}")
+                print(f"Query: {query}")
+                print(f"Params: {params}")
+                return None
+            finally:
+                cursor.close()
+                self._record_query(query, time.perf_counter() - start, rows)
+    
+    def _record_query(self, query, seconds, rows):
+        statement = normalize_sql(query)
+        timings.record('sql', statement, seconds * 1000, rows)
+        metrics.DB_QUERY_SECONDS.labels(statement).observe(seconds)
+    
+    def execute_many(self, query, params_list):
+        """Run one statement for many parameter rows in a single transaction"""
+        conn = self.get_connection()
+        if conn is None:
+            return None
+        
+        start = time.perf_counter()
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-                
-            if query.strip().upper().startswith('SELECT'):
-                results = cursor.fetchall()
-                # Convert sqlite3.Row objects to dictionaries
-                return [dict(row) for row in results]
-            conn.commit()
+            with self.lock, conn:
+                cursor = conn.executemany(query, params_list)
+            self._record_query(query, time.perf_counter() - start, cursor.rowcount)
             return True
         except Exception as e:
             print(f"Query error: {e}")
             print(f"Query: {query}")
-            print(f"Params: {params}")
             return None
-        finally:
-            cursor.close()
     
-    def create_tables(self):
-        """Create necessary tables"""
+    def _add_column(self, table, column, definition):
+        """ALTER TABLE ... ADD COLUMN unless the column exists already; returns True if it was added"""
+        columns = self.execute_query("SELECT name FROM pragma_table_info(?)", (table,)) or []
+        if column not in {c['name'] for c in columns}:
+            return self.execute_query(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        return False
+    
+    def create_tables(self, store_id=DEFAULT_STORE_ID, seed_demo=True):
+        """Create necessary tables (and, with seed_demo, the demo catalogue for `store_id` if it has no products)"""
         queries = [
             """
             CREATE TABLE IF NOT EXISTS users (
@@ -63,7 +114,8 @@ class Database:
                 role TEXT CHECK(role IN ('admin', 'manager', 'clerk')) DEFAULT 'clerk',
                 email TEXT,
                 is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_login_at TIMESTAMP
             )
             """,
             """
@@ -112,6 +164,23 @@ class Database:
             )
             """,
             """
+            CREATE TABLE IF NOT EXISTS inventory_snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                product_id INTEGER NOT NULL,
+                log_id INTEGER NOT NULL,
+                quantity INTEGER NOT NULL,
+                snapshot_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (product_id) REFERENCES products(id),
+                FOREIGN KEY (log_id) REFERENCES inventory_log(id)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS data_versions (
+                name TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            """
             CREATE TABLE IF NOT EXISTS settings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 business_name TEXT,
@@ -128,6 +197,153 @@ class Database:
         for query in queries:
             self.execute_query(query)
         
+        # Indexes for stock-at-date lookups (snapshot + bounded log replay)
+        self.execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_inventory_log_product_time
+            ON inventory_log (product_id, created_at)
+        """)
+        self.execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_inventory_snapshots_product_time
+            ON inventory_snapshots (product_id, snapshot_at)
+        """)
+
+        # Catalogue of sales months moved to compressed archive files
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS sales_archive_months (
+                month TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                row_count INTEGER,
+                total_sales REAL,
+                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # Index for report date ranges and time bucketing
+        self.execute_query("""
+            CREATE INDEX IF NOT EXISTS idx_sales_date
+            ON sales (sale_date)
+        """)
+
+        # Append-only audit trail; indexes serve newest-first paging, optionally filtered by user, event or status
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at TIMESTAMP NOT NULL,
+                user TEXT,
+                event TEXT NOT NULL,
+                status TEXT DEFAULT 'SUCCESS',
+                details TEXT,
+                ip_address TEXT
+            )
+        """)
+        for name, columns in (('time', 'created_at'), ('user_time', 'user, created_at'),
+                              ('event_time', 'event, created_at'), ('status_time', 'status, created_at')):
+            self.execute_query(f"CREATE INDEX IF NOT EXISTS idx_audit_log_{name} ON audit_log ({columns})")
+
+        # Server-side login sessions (see session_store.py)
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                token_hash TEXT PRIMARY KEY,
+                user_id INTEGER,
+                username TEXT NOT NULL,
+                role TEXT,
+                created_at TIMESTAMP NOT NULL,
+                last_seen TIMESTAMP NOT NULL,
+                expires_at TIMESTAMP NOT NULL
+            )
+        """)
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_sessions_username ON sessions (username)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)")
+
+        # Columns added after the first release, for databases created before them
+        self._add_column('users', 'last_login_at', 'TIMESTAMP')
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users (username COLLATE NOCASE, id)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_users_email_nocase ON users (email COLLATE NOCASE)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_users_role ON users (role, username COLLATE NOCASE, id)")
+
+        # Outlets (see stores.py). Products and sales belong to one store; a user with no store may work at any
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS stores (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                code TEXT UNIQUE NOT NULL,
+                name TEXT NOT NULL,
+                address TEXT,
+                phone TEXT,
+                email TEXT,
+                db_path TEXT,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.execute_query("INSERT OR IGNORE INTO stores (id, code, name) VALUES (?, 'main', 'Main Store')",
+                           (DEFAULT_STORE_ID,))
+        self._add_column('products', 'store_id', f'INTEGER NOT NULL DEFAULT {DEFAULT_STORE_ID}')
+        self._add_column('sales', 'store_id', f'INTEGER NOT NULL DEFAULT {DEFAULT_STORE_ID}')
+        self._add_column('users', 'store_id', 'INTEGER')
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_products_store ON products (store_id, id)")
+        self.execute_query("CREATE INDEX IF NOT EXISTS idx_sales_store_date ON sales (store_id, sale_date)")
+
+        # Money in integer cents (see money.py); the REAL columns are still written alongside for the
+        # analytics snapshot and archives made before, and existing rows are converted once
+        for table, cents_columns in (('products', PRODUCT_CENTS_COLUMNS), ('sales', SALES_CENTS_COLUMNS)):
+            for column, amount_column in cents_columns.items():
+                if self._add_column(table, column, 'INTEGER'):
+                    self.execute_query(f"UPDATE {table} SET {column} = {cents_sql(amount_column)}")
+
+        # Tax and discount rules (see pricing.py); a rule without a store applies at every store
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS pricing_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                kind TEXT CHECK(kind IN ('tax', 'promotion', 'quantity', 'bundle')) NOT NULL,
+                category TEXT,
+                product_ids TEXT,
+                rate REAL,
+                min_quantity INTEGER,
+                discount_cents INTEGER,
+                store_id INTEGER,
+                starts_at TIMESTAMP,
+                ends_at TIMESTAMP,
+                is_active BOOLEAN DEFAULT 1,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self._add_column('sales', 'discount_cents', 'INTEGER NOT NULL DEFAULT 0')
+
+        # Scan lookups (see barcodes.py): codes are unique within a store, whose catalogue may repeat another's
+        added_sku = self._add_column('products', 'sku', 'TEXT')
+        if self._add_column('products', 'barcode', 'TEXT') or added_sku:
+            self.assign_product_codes()
+        self.execute_query("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_products_store_barcode ON products (store_id, barcode)
+            WHERE barcode IS NOT NULL
+        """)
+        self.execute_query("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_products_store_sku ON products (store_id, sku COLLATE NOCASE)
+            WHERE sku IS NOT NULL
+        """)
+
+        # Typed application settings, one JSON value per key (see settings_service.py)
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS app_settings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                value TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_by TEXT
+            )
+        """)
+
+        # Role -> permission grants (see permissions.py); admins implicitly hold all of them
+        self.execute_query("""
+            CREATE TABLE IF NOT EXISTS role_permissions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                role TEXT NOT NULL,
+                permission TEXT NOT NULL,
+                UNIQUE (role, permission)
+            )
+        """)
+
         # Create trigger for updated_at in products table
         self.execute_query("""
             CREATE TRIGGER IF NOT EXISTS update_products_timestamp 
@@ -146,17 +362,195 @@ class Database:
             END;
         """)
         
-        # Insert default admin user
+        # Data versions let caches (catalogue, charts, permissions) notice when their table changes.
+        # Inserts into sales, role_permissions, app_settings, stores and pricing_rules are covered by
+        # MAX(id) in get_data_version, so only edits need triggers there.
+        self.execute_query("INSERT OR IGNORE INTO data_versions (name) VALUES ('products'), ('sales'), "
+                           "('role_permissions'), ('app_settings'), ('stores'), ('pricing_rules')")
+        for table, events in (('products', ('INSERT', 'UPDATE', 'DELETE')), ('sales', ('UPDATE', 'DELETE')),
+                              ('role_permissions', ('UPDATE', 'DELETE')), ('app_settings', ('UPDATE', 'DELETE')),
+                              ('stores', ('UPDATE', 'DELETE')), ('pricing_rules', ('UPDATE', 'DELETE'))):
+            for event in events:
+                self.execute_query(f"""
+                    CREATE TRIGGER IF NOT EXISTS bump_{table}_version_{event.lower()}
+                    AFTER {event} ON {table}
+                    BEGIN
+                        UPDATE data_versions SET version = version + 1 WHERE name = '{table}';
+                    END;
+                """)
+        
+        # Insert default admin user (hashed; hashing is only paid on a fresh database)
+        if not self.execute_query("SELECT 1 FROM users WHERE username = 'admin'"):
+            self.execute_query("""
+                INSERT OR IGNORE INTO users (username, password, role, email) 
+                VALUES ('admin', ?, 'admin', 'admin@system.com')
+            """, (passwords.hash_password('admin123'),))
+        
+        # Default role permissions
+        if not self.execute_query("SELECT 1 FROM role_permissions LIMIT 1"):
+            self.execute_many("INSERT OR IGNORE INTO role_permissions (role, permission) VALUES (?, ?)",
+                              [(role, permission) for role, granted in DEFAULT_ROLE_PERMISSIONS.items()
+                               for permission in sorted(granted)])
+        
+        # Insert default settings (one row; this table predates app_settings)
         self.execute_query("""
-            INSERT OR IGNORE INTO users (username, password, role, email) 
-            VALUES ('admin', 'admin123', 'admin', 'admin@system.com')
+            INSERT INTO settings (business_name) 
+            SELECT 'Salphine Chemos Getaway Resort' WHERE NOT EXISTS (SELECT 1 FROM settings)
         """)
+        # Carry the values kept in the old settings row over to app_settings once
+        if not self.execute_query("SELECT 1 FROM app_settings LIMIT 1"):
+            legacy = self.execute_query("SELECT business_name, tax_rate, currency FROM settings ORDER BY id LIMIT 1")
+            if legacy:
+                self.execute_many("INSERT OR IGNORE INTO app_settings (key, value) VALUES (?, ?)",
+                                  [(key, json.dumps(value)) for key, value in legacy[0].items() if value is not None])
+        
+        if seed_demo:
+            self.seed_sample_products(store_id)
+    
+    def assign_product_codes(self):
+        """Give products without a SKU or barcode ones derived from their id (in-store EAN-13 barcodes)"""
+        missing = self.execute_query("SELECT id FROM products WHERE sku IS NULL OR barcode IS NULL") or []
+        if missing:
+            self.execute_many("""
+                UPDATE products SET sku = COALESCE(sku, ?), barcode = COALESCE(barcode, ?) WHERE id = ?
+            """, [(default_sku(row['id']), in_store_barcode(row['id']), row['id']) for row in missing])
+    
+    def seed_sample_products(self, store_id=DEFAULT_STORE_ID):
+        """Load the demo catalogue into a store that has no products yet, with opening stock logged"""
+        count = self.execute_query("SELECT COUNT(*) AS n FROM products WHERE store_id = ?", (store_id,))
+        if not count or count[0]['n'] > 0:
+            return
         
-        # Insert default settings
+        products, _ = self.get_sample_data()
+        self.execute_many("""
+            INSERT INTO products (name, category, price, price_cents, stock_quantity, min_stock_level, store_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [(p['name'], p['category'], p['price'], p['price_cents'], p['stock_quantity'], p['min_stock_level'],
+               store_id) for p in products])
+        # Local time, like every other ledger row (the column default would be UTC)
         self.execute_query("""
-            INSERT OR IGNORE INTO settings (business_name) 
-            VALUES ('Salphine Chemos Getaway Resort')
-        """)
+            INSERT INTO inventory_log (product_id, action, quantity_change, new_quantity, notes, created_at)
+            SELECT id, 'adjustment', stock_quantity, stock_quantity, 'Opening stock', ?
+            FROM products
+            WHERE NOT EXISTS (SELECT 1 FROM inventory_log l WHERE l.product_id = products.id)
+        """, (datetime.now().strftime("%Y-%m-%d %H:%M:%S"),))
+        self.assign_product_codes()
+    
+    def get_data_version(self, table):
+        """Cheap token that changes whenever rows of `table` (products, sales, role_permissions, app_settings, stores,
+        pricing_rules) change"""
+        result = self.execute_query(f"""
+            SELECT (SELECT version FROM data_versions WHERE name = ?) AS version,
+                   (SELECT MAX(id) FROM {table}) AS max_id
+        """, (table,))
+        if not result:
+            return None
+        return f"{result[0]['version']}.{result[0]['max_id']}"
+    
+    def get_products(self, store_id=DEFAULT_STORE_ID):
+        """Return a store's product catalogue from the products table"""
+        return self.execute_query("""
+            SELECT id, name, category, price, price_cents, stock_quantity, min_stock_level, max_stock_level, description,
+                   sku, barcode
+            FROM products
+            WHERE store_id = ?
+            ORDER BY id
+        """, (store_id,))
+    
+    # User accounts. Listing and search are case-insensitive on username/email, ordered by username.
+    USER_COLUMNS = "id, username, role, email, is_active, created_at, last_login_at, store_id"
+    
+    def _user_filters(self, search=None, role=None, active=None):
+        conditions, params = [], []
+        low = (search or "").strip().lower()
+        if low:
+            # Prefix ranges instead of LIKE '%...%', so both NOCASE indexes are used
+            high = low[:-1] + chr(ord(low[-1]) + 1)
+            conditions.append("((username COLLATE NOCASE >= ? AND username COLLATE NOCASE < ?) "
+                              "OR (email COLLATE NOCASE >= ? AND email COLLATE NOCASE < ?))")
+            params.extend([low, high, low, high])
+        if role:
+            conditions.append("role = ?")
+            params.append(role)
+        if active is not None:
+            conditions.append("is_active = ?")
+            params.append(1 if active else 0)
+        return conditions, params
+    
+    def list_users(self, search=None, role=None, active=None, after=None, limit=50):
+        """One page of users (no password hashes) by username; `after` is the (username, id) of the previous page's last row"""
+        conditions, params = self._user_filters(search, role, active)
+        if after is not None:
+            # Spelled out rather than as a row value, which SQLite will not seek on with a collation
+            conditions.append("username COLLATE NOCASE >= ? AND (username COLLATE NOCASE > ? OR id > ?)")
+            params.extend([after[0], after[0], after[1]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.execute_query(f"""
+            SELECT {self.USER_COLUMNS} FROM users
+            {where}
+            ORDER BY username COLLATE NOCASE, id
+            LIMIT ?
+        """, params + [limit]) or []
+    
+    def count_users(self, search=None, role=None, active=None):
+        conditions, params = self._user_filters(search, role, active)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        result = self.execute_query(f"SELECT COUNT(*) AS n FROM users {where}", params)
+        return result[0]['n'] if result else 0
+    
+    def get_user(self, user_id=None, username=None):
+        """A user by id or username (no password hash), or None"""
+        column, value = ('id', user_id) if user_id is not None else ('username', username)
+        result = self.execute_query(f"SELECT {self.USER_COLUMNS} FROM users WHERE {column} = ?", (value,))
+        return result[0] if result else None
+    
+    def create_user(self, username, password, role='clerk', email=None, is_active=True, store_id=None):
+        """Add a user with a hashed password; returns the new id, or None (e.g. username taken)"""
+        saved = self.execute_query("""
+            INSERT INTO users (username, password, role, email, is_active, store_id) VALUES (?, ?, ?, ?, ?, ?)
+        """, (username, passwords.hash_password(password), role, email, 1 if is_active else 0, store_id))
+        if not saved:
+            return None
+        user = self.get_user(username=username)
+        return user['id'] if user else None
+    
+    def update_user(self, user_id, role=None, email=None, is_active=None, password=None):
+        """Change the given fields of a user; refuses to remove the last active admin. Returns True on success"""
+        user = self.get_user(user_id)
+        if user is None:
+            print(f"Unknown user: {user_id}")
+            return False
+        if user['role'] == 'admin' and user['is_active'] and (is_active is False or role not in (None, 'admin')):
+            others = self.execute_query("SELECT COUNT(*) AS n FROM users WHERE role = 'admin' AND is_active = 1 AND id != ?",
+                                        (user_id,))
+            if not others or not others[0]['n']:
+                print("Refusing to remove the last active administrator")
+                return False
+        
+        changes = {'role': role, 'email': email,
+                   'is_active': None if is_active is None else (1 if is_active else 0),
+                   'password': None if password is None else passwords.hash_password(password)}
+        changes = {column: value for column, value in changes.items() if value is not None}
+        if not changes:
+            return True
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        return bool(self.execute_query(f"UPDATE users SET {assignments} WHERE id = ?",
+                                       list(changes.values()) + [user_id]))
+    
+    def set_user_store(self, user_id, store_id):
+        """Tie a user to one store, or with None let them work at every store"""
+        return bool(self.execute_query("UPDATE users SET store_id = ? WHERE id = ?", (store_id, user_id)))
+    
+    def deactivate_user(self, user_id):
+        """Disable a user's login; the row stays, since sales and logs refer to it"""
+        return self.update_user(user_id, is_active=False)
+    
+    def record_last_logins(self, logins):
+        """Write (user_id, timestamp) login times in one transaction, never moving a time backwards"""
+        return self.execute_many("""
+            UPDATE users SET last_login_at = ?2
+            WHERE id = ?1 AND (last_login_at IS NULL OR last_login_at < ?2)
+        """, list(logins))
     
     def get_sample_data(self):
         """Return sample data for demo purposes"""
@@ -172,6 +566,10 @@ class Database:
             {'id': 9, 'name': 'Ice Cream', 'category': 'Dessert', 'price': 200.0, 'stock_quantity': 35, 'min_stock_level': 20},
             {'id': 10, 'name': 'Cake Slice', 'category': 'Dessert', 'price': 250.0, 'stock_quantity': 22, 'min_stock_level': 10},
         ]
+        # Same fields as get_products rows, so the pages work on this fallback catalogue too
+        for p in products:
+            p.update(price_cents=amount_to_cents(p['price']), max_stock_level=100, description=None,
+                     sku=default_sku(p['id']), barcode=in_store_barcode(p['id']))
         
         users = [
             {'id': 1, 'username': 'admin', 'role': 'admin', 'email': 'admin@system.com'},
@@ -187,6 +585,7 @@ class Database:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_path = f"sales_system_backup_{timestamp}.db"
         
+        start = time.perf_counter()
         try:
             source = self.get_connection()
             if source:
@@ -194,9 +593,12 @@ class Database:
                 backup_conn = sqlite3.connect(backup_path)
                 source.backup(backup_conn)
                 backup_conn.close()
+                metrics.BACKUP_SECONDS.labels("success").observe(time.perf_counter() - start)
+                metrics.LAST_BACKUP.set(time.time())
                 print(f"Database backup created: {backup_path}")
                 return backup_path
         except Exception as e:
+            metrics.BACKUP_SECONDS.labels("error").observe(time.perf_counter() - start)
             print(f"Backup error: {e}")
             return None
     
@@ -209,8 +611,10 @@ class Database:
         try:
             data = self.execute_query(f"SELECT * FROM {table_name}")
             if data:
-                df = pd.DataFrame(data)
-                df.to_csv(export_path, index=False)
+                import pandas as pd  # only needed for exports; keeps app start-up light
+                with timings.timed('export', f"{table_name}_csv"):
+                    df = pd.DataFrame(data)
+                    df.to_csv(export_path, index=False)
                 print(f"Exported {table_name} to {export_path}")
                 return export_path
         except Exception as e:
@@ -0,0 +1,87 @@
+import numpy as np
+
+# Bucket sizes in hours, finest first
+GRANULARITIES = (
+    ('hour', 1),
+    ('day', 24),
+    ('week', 24 * 7),
+    ('month', 24 * 30),
+)
+
+MAX_POINTS = 2000
+
+
+def choose_granularity(start, end, max_points=MAX_POINTS):
+    """Finest of hour/day/week/month that keeps [start, end) under max_points buckets"""
+    span_hours = max((end - start).total_seconds() / 3600, 1)
+    for name, hours in GRANULARITIES:
+        if span_hours / hours <= max_points:
+            return name
+    return GRANULARITIES[-1][0]
+
+
+def lttb(x, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of `threshold - 2` equal
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Preserves the
+    visual shape of a line far better than plain decimation.
+    Returns the indexes of the kept points.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area for every candidate in the bucket at once
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+
+    return kept
+
+
+def minmax_buckets(y, n_buckets):
+    """Keep the min and max of each of n_buckets buckets (spikes survive); returns indexes"""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    kept = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end > start:
+            bucket = y[start:end]
+            kept.extend(sorted({start + int(np.argmin(bucket)), start + int(np.argmax(bucket))}))
+    return np.array(kept, dtype=np.int64)
+
+
+def downsample(df, x_col, y_col, max_points=MAX_POINTS, method='lttb'):
+    """Return df reduced to at most max_points rows along x_col (sorted)"""
+    if len(df) <= max_points:
+        return df
+
+    df = df.sort_values(x_col)
+    if method == 'minmax':
+        index = minmax_buckets(df[y_col].to_numpy(), max_points // 2)
+    else:
+        x = df[x_col]
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype('int64')
+        index = lttb(np.asarray(x, dtype=float), df[y_col].to_numpy(), max_points)
+    return df.iloc[index]
@@ -0,0 +1,71 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+from instrumentation import timed
+
+
+class FigureCache:
+    """LRU cache of serialized Plotly figures keyed by (chart id, data version, params).
+
+    Building a figure with plotly.express and serializing it is a large part
+    of a rerun; when the data version and filters are unchanged the stored
+    JSON spec is turned back into a figure instead. Entries for an old data
+    version are simply never asked for again and age out of the LRU.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._specs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(chart_id, data_version, params=None):
+        return (chart_id, str(data_version), json.dumps(params or {}, sort_keys=True, default=str))
+
+    def get_or_build(self, chart_id, data_version, build, params=None):
+        """Return the cached figure, or call build() and cache its spec"""
+        key = self.make_key(chart_id, data_version, params)
+
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+                self.hits += 1
+
+        if spec is None:
+            with timed('chart', chart_id):
+                figure = build()
+                spec = pio.to_json(figure, validate=False)
+            with self._lock:
+                self.misses += 1
+                self._specs[key] = spec
+                while len(self._specs) > self.max_entries:
+                    self._specs.popitem(last=False)
+            return figure
+
+        # The spec came from a validated figure, so skip plotly's (slow) re-validation
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def invalidate(self, chart_id=None):
+        """Drop every entry, or only those of one chart"""
+        with self._lock:
+            if chart_id is None:
+                self._specs.clear()
+            else:
+                for key in [k for k in self._specs if k[0] == chart_id]:
+                    del self._specs[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._specs),
+                'bytes': sum(len(spec) for spec in self._specs.values()),
+                'hits': self.hits,
+                'misses': self.misses
+            }
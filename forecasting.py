@@ -0,0 +1,231 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import date, datetime, time, timedelta
+from statistics import NormalDist
+
+from sales_reports import TIMESTAMP_FORMAT, query_sales
+
+
+def load_daily_demand(db, start_date=None, end_date=None, store_id=None, archive=None):
+    """Load units sold per product per day from `sales` as a dense matrix.
+
+    Returns (product_ids, first_date, demand) where demand has shape
+    (len(product_ids), n_days) and column j is first_date + j days; with
+    `store_id`, only that store's sales count, and with `archive` (a
+    SalesArchive) archived months count too.
+    The aggregation happens in SQLite; only one row per product-day
+    comes back to Python.
+    """
+    query = """
+        SELECT product_id, date(sale_date) AS day, SUM(quantity) AS units
+        FROM {sales}
+        WHERE product_id IS NOT NULL
+    """
+    params = []
+    if store_id is not None:
+        query += " AND store_id = ?"
+        params.append(store_id)
+    # Bare timestamp bounds (not date(sale_date)) so the sale_date indexes can serve the range
+    start, end = datetime(1970, 1, 1), datetime(9999, 1, 1)
+    if start_date is not None:
+        start = datetime.combine(date.fromisoformat(str(start_date)), time.min)
+        query += " AND sale_date >= ?"
+        params.append(start.strftime(TIMESTAMP_FORMAT))
+    if end_date is not None:
+        end = datetime.combine(date.fromisoformat(str(end_date)) + timedelta(days=1), time.min)
+        query += " AND sale_date < ?"
+        params.append(end.strftime(TIMESTAMP_FORMAT))
+    query += " GROUP BY product_id, day"
+
+    rows = query_sales(db, start, end, query, tuple(params), archive)
+    # Each archive partition returns its own sums; np.add.at below adds up repeated product-days
+    df = pd.DataFrame(rows or [], columns=['product_id', 'day', 'units'])
+    if df.empty:
+        return np.array([], dtype=np.int64), None, np.zeros((0, 0))
+
+    days = pd.to_datetime(df['day'])
+    first_date = date.fromisoformat(str(start_date)) if start_date is not None else days.min().date()
+    last_date = date.fromisoformat(str(end_date)) if end_date is not None else days.max().date()
+    n_days = (last_date - first_date).days + 1
+
+    product_ids, rows = np.unique(df['product_id'].to_numpy(dtype=np.int64), return_inverse=True)
+    cols = (days - pd.Timestamp(first_date)).dt.days.to_numpy(dtype=np.int64)
+
+    demand = np.zeros((len(product_ids), n_days))
+    np.add.at(demand, (rows, cols), df['units'].to_numpy(dtype=float))
+    return product_ids, first_date, demand
+
+
+class DemandForecaster:
+    """Per-SKU daily demand models fitted for all products at once.
+
+    Each product keeps a moving average over the last `window` days, an
+    exponentially smoothed level, day-of-week seasonal factors and a
+    smoothed forecast-error variance. All state lives in NumPy arrays with
+    one row per product, so a day of new sales updates every SKU with a few
+    vector operations, and retraining is incremental: `update` only
+    consumes days after the last one seen.
+
+    One instance is shared by every session (see resources.py), so updates
+    and reads hold the instance lock.
+    """
+
+    def __init__(self, alpha=0.2, gamma=0.1, window=28):
+        self.alpha = alpha      # level smoothing
+        self.gamma = gamma      # day-of-week seasonality smoothing
+        self.window = window    # moving-average window in days
+
+        self.product_ids = np.array([], dtype=np.int64)
+        self._index = {}
+        self.level = np.zeros(0)
+        self.seasonal = np.ones((0, 7))
+        self.variance = np.zeros(0)
+        self.days_seen = np.zeros(0, dtype=np.int64)
+        self._ring = np.zeros((0, window))
+        self.last_date = None
+        self._lock = threading.RLock()
+
+    def _ensure_products(self, product_ids):
+        """Add state rows for unseen products; returns their row indexes"""
+        new_ids = [pid for pid in product_ids.tolist() if pid not in self._index]
+        if new_ids:
+            n_new = len(new_ids)
+            for offset, pid in enumerate(new_ids):
+                self._index[pid] = len(self.product_ids) + offset
+            self.product_ids = np.concatenate([self.product_ids, np.array(new_ids, dtype=np.int64)])
+            self.level = np.concatenate([self.level, np.zeros(n_new)])
+            self.seasonal = np.vstack([self.seasonal, np.ones((n_new, 7))])
+            self.variance = np.concatenate([self.variance, np.zeros(n_new)])
+            self.days_seen = np.concatenate([self.days_seen, np.zeros(n_new, dtype=np.int64)])
+            self._ring = np.vstack([self._ring, np.zeros((n_new, self.window))])
+        return np.array([self._index[pid] for pid in product_ids.tolist()], dtype=np.int64)
+
+    def update(self, product_ids, first_date, demand):
+        """Consume a (products x days) demand matrix starting at first_date.
+
+        Days on or before the last day already seen are skipped, so the same
+        history can be passed again safely. Products missing from
+        `product_ids` are treated as having sold nothing on those days.
+        """
+        if first_date is None or demand.size == 0:
+            return self
+
+        with self._lock:
+            product_ids = np.asarray(product_ids, dtype=np.int64)
+            rows = self._ensure_products(product_ids)
+
+            start_col = 0
+            if self.last_date is not None:
+                start_col = max(0, (self.last_date - first_date).days + 1)
+
+            full_day = np.zeros(len(self.product_ids))
+            for col in range(start_col, demand.shape[1]):
+                full_day[:] = 0.0
+                full_day[rows] = demand[:, col]
+                day = first_date + timedelta(days=col)
+                self._step(full_day, day)
+                self.last_date = day
+
+        return self
+
+    def _step(self, x, day):
+        """Update every product's model with one day of observed demand"""
+        dow = day.weekday()
+        fresh = self.days_seen == 0
+        season = self.seasonal[:, dow]
+
+        # Forecast error against yesterday's model, for safety stock
+        error = x - self.level * season
+        self.variance = np.where(fresh, 0.0,
+                                 (1 - self.alpha) * self.variance + self.alpha * error ** 2)
+
+        deseasonalized = x / np.where(season > 0, season, 1.0)
+        self.level = np.where(fresh, x,
+                              self.alpha * deseasonalized + (1 - self.alpha) * self.level)
+
+        ratio = np.divide(x, self.level, out=np.ones_like(x), where=self.level > 0)
+        self.seasonal[:, dow] = self.gamma * ratio + (1 - self.gamma) * season
+        # Keep the seven factors averaging 1 so they only redistribute demand
+        means = self.seasonal.mean(axis=1, keepdims=True)
+        np.divide(self.seasonal, means, out=self.seasonal, where=means > 0)
+
+        self._ring[:, (day.toordinal() % self.window)] = x
+        self.days_seen += 1
+
+    def update_from_db(self, db, until=None, store_id=None, archive=None):
+        """Pull complete days of sales after the last day seen and update.
+
+        `store_id` limits them to one store; with `archive`, sales in archived months count too.
+        """
+        until = until or (date.today() - timedelta(days=1))
+        # Held across the load so concurrent reruns do not both fetch and step the same days
+        with self._lock:
+            start = self.last_date + timedelta(days=1) if self.last_date else None
+            if start is not None and start > until:
+                return self
+            product_ids, first_date, demand = load_daily_demand(db, start, until, store_id, archive)
+            return self.update(product_ids, first_date, demand)
+
+    def moving_average(self):
+        """Average daily demand over the last `window` days"""
+        return self._ring.sum(axis=1) / np.maximum(np.minimum(self.days_seen, self.window), 1)
+
+    def forecast(self, horizon_days=7, start_date=None):
+        """Expected demand per product for each of the next `horizon_days` days"""
+        start_date = start_date or ((self.last_date or date.today()) + timedelta(days=1))
+        dows = [(start_date + timedelta(days=d)).weekday() for d in range(horizon_days)]
+        return self.level[:, None] * self.seasonal[:, dows]
+
+    def recommend(self, stock=None, lead_time_days=7, review_period_days=7, service_level=0.95):
+        """Reorder point and quantity per product.
+
+        reorder point = expected demand over the lead time + safety stock,
+        order-up-to  = expected demand over lead time + review period + safety stock,
+        safety stock = z(service_level) * sigma * sqrt(lead time).
+        `stock` maps product_id -> units on hand.
+        """
+        with self._lock:
+            z = NormalDist().inv_cdf(service_level)
+            daily = self.forecast(lead_time_days + review_period_days)
+            lead_demand = daily[:, :lead_time_days].sum(axis=1)
+            cycle_demand = daily.sum(axis=1)
+            safety = z * np.sqrt(self.variance) * np.sqrt(lead_time_days)
+
+            reorder_point = np.ceil(lead_demand + safety)
+            order_up_to = np.ceil(cycle_demand + safety)
+
+            on_hand = np.zeros(len(self.product_ids))
+            if stock:
+                on_hand = np.array([stock.get(pid, 0) for pid in self.product_ids.tolist()], dtype=float)
+            reorder_qty = np.where(on_hand <= reorder_point, np.maximum(order_up_to - on_hand, 0), 0)
+
+            return pd.DataFrame({
+                'product_id': self.product_ids,
+                'avg_daily_demand': np.round(self.level, 2),
+                'moving_average': np.round(self.moving_average(), 2),
+                'safety_stock': np.ceil(safety).astype(int),
+                'reorder_point': reorder_point.astype(int),
+                'order_up_to': order_up_to.astype(int),
+                'stock_on_hand': on_hand.astype(int),
+                'reorder_quantity': reorder_qty.astype(int)
+            })
+
+    def apply_stock_levels(self, db, recommendations):
+        """Write reorder points / order-up-to levels into products min/max stock levels"""
+        rows = [
+            (int(r.reorder_point), int(max(r.order_up_to, r.reorder_point + 1)), int(r.product_id))
+            for r in recommendations.itertuples(index=False)
+        ]
+        return db.execute_many(
+            "UPDATE products SET min_stock_level = ?, max_stock_level = ? WHERE id = ?", rows
+        )
+
+
+def current_stock(db, store_id=None):
+    """Return {product_id: stock_quantity} for all products (of one store, if given)"""
+    if store_id is None:
+        rows = db.execute_query("SELECT id, stock_quantity FROM products") or []
+    else:
+        rows = db.execute_query("SELECT id, stock_quantity FROM products WHERE store_id = ?", (store_id,)) or []
+    return {row['id']: row['stock_quantity'] for row in rows}
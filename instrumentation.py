@@ -0,0 +1,124 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Categories recorded by the app: rerun, page, sql, chart, export
+WINDOW = 500          # samples kept per (category, name) for the rolling percentiles
+MAX_NAME_LENGTH = 160
+MAX_KEYS = 500        # (category, name) pairs tracked; later ones are counted under OVERFLOW_NAME
+OVERFLOW_NAME = "(other)"
+
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_SQL_ROWS = re.compile(r"\(\?(?:, \.\.\.)?\)(?:\s*,\s*\(\?(?:, \.\.\.)?\))+")
+
+
+def normalize_sql(query):
+    """Fingerprint of a statement: whitespace collapsed, literals as ?, and ?-lists of any length as one,
+    so statements built with variable IN (...) lists or inlined values share a key"""
+    statement = _SQL_LITERAL.sub("?", re.sub(r"\s+", " ", query).strip())
+    statement = _SQL_ROWS.sub("(?, ...), ...", _SQL_LIST.sub("?, ...", statement))
+    return statement[:MAX_NAME_LENGTH]
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+class Timings:
+    """In-memory rolling wall-time samples with p50/p95/p99 per category and name.
+
+    Each (category, name) keeps only its last `window` samples, and at most
+    `max_keys` pairs are tracked (the rest share an OVERFLOW_NAME entry per
+    category), so memory stays bounded however long the process runs. SQL
+    statements slower than `slow_query_ms` are also appended to
+    `slow_query_log` (JSON lines) when a path is configured.
+    """
+
+    def __init__(self, window=WINDOW, slow_query_log=None, slow_query_ms=200, max_keys=MAX_KEYS):
+        self.window = window
+        self.max_keys = max_keys
+        self.slow_query_log = slow_query_log
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._samples = {}   # (category, name) -> deque of milliseconds
+        self._counts = {}    # (category, name) -> total calls since reset
+        self.slow_queries = deque(maxlen=50)
+
+    def record(self, category, name, ms, rows=None):
+        key = (category, name[:MAX_NAME_LENGTH])
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None and len(self._samples) >= self.max_keys:
+                key = (category, OVERFLOW_NAME)
+                samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(ms)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+        if category == 'sql' and ms >= self.slow_query_ms:
+            entry = {
+                'at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'ms': round(ms, 2),
+                'rows': rows,
+                'sql': name
+            }
+            self.slow_queries.append(entry)
+            if self.slow_query_log:
+                try:
+                    with open(self.slow_query_log, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except OSError as e:
+                    print(f"Slow query log error: {e}")
+
+    @contextmanager
+    def timed(self, category, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, (time.perf_counter() - start) * 1000)
+
+    def summary(self, category=None):
+        """Rows of {category, name, calls, p50_ms, p95_ms, p99_ms, max_ms}, slowest p95 first"""
+        with self._lock:
+            items = [(key, sorted(samples), self._counts[key]) for key, samples in self._samples.items()
+                     if category is None or key[0] == category]
+
+        rows = []
+        for (cat, name), values, calls in items:
+            rows.append({
+                'category': cat,
+                'name': name,
+                'calls': calls,
+                'p50_ms': round(percentile(values, 0.50), 2),
+                'p95_ms': round(percentile(values, 0.95), 2),
+                'p99_ms': round(percentile(values, 0.99), 2),
+                'max_ms': round(values[-1], 2)
+            })
+        return sorted(rows, key=lambda r: r['p95_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self.slow_queries.clear()
+
+
+# Process-wide recorder; the slow-query log is off unless SLOW_QUERY_LOG is set
+timings = Timings(
+    slow_query_log=os.environ.get("SLOW_QUERY_LOG"),
+    slow_query_ms=float(os.environ.get("SLOW_QUERY_MS", 200))
+)
+timed = timings.timed
@@ -0,0 +1,258 @@
+from datetime import datetime, date, time
+
+# Movement types written to inventory_log.action
+MOVEMENT_ACTIONS = ('sale', 'restock', 'adjustment')
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Products per stock_at query when specific ids are asked for
+STOCK_AT_BATCH = 500
+
+
+def to_timestamp(value):
+    """Convert a datetime/date/string to the TIMESTAMP text format SQLite stores"""
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    if isinstance(value, date):
+        # A plain date means "as of the end of that day"
+        return datetime.combine(value, time.max).strftime(TIMESTAMP_FORMAT)
+    return str(value)
+
+
+class InventoryLedger:
+    """Stock movement ledger with periodic per-product snapshots.
+
+    Every movement updates products.stock_quantity and appends a row to
+    inventory_log. Every `snapshot_interval` movements of a product a
+    checkpoint is written to inventory_snapshots, so answering "stock of X
+    at date D" is one snapshot lookup plus a replay of at most
+    `snapshot_interval` log rows, however long the log gets. `stock_at`
+    does this for all products in a single query.
+
+    Opening stock should be recorded as an 'adjustment' movement so that it
+    is part of the ledger.
+    """
+
+    def __init__(self, db, snapshot_interval=200):
+        self.db = db
+        self.snapshot_interval = snapshot_interval
+        # product_id -> movements logged since that product's last snapshot, committed rows only
+        self._since_snapshot = {}
+
+    def record_movement(self, product_id, action, quantity_change, user_id=None, notes=None):
+        """Apply a single stock movement and log it"""
+        results = self.record_movements([{
+            'product_id': product_id,
+            'action': action,
+            'quantity_change': quantity_change,
+            'notes': notes
+        }], user_id=user_id)
+        return results[0] if results else None
+
+    def record_movements(self, movements, user_id=None, created_at=None):
+        """Apply several movements in one transaction (e.g. every line of a sale).
+
+        Returns a list of {'product_id', 'log_id', 'new_quantity'} dicts, or
+        None if nothing was written.
+        """
+        for movement in movements:
+            if movement['action'] not in MOVEMENT_ACTIONS:
+                raise ValueError(f"Unknown inventory action: {movement['action']}")
+
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        counts = {}
+        with self.db.lock:
+            try:
+                with conn:
+                    results = self.apply_movements(conn, movements, user_id, created_at, counts)
+            except Exception as e:
+                print(f"Inventory ledger error: {e}")
+                return None
+            self.committed(counts)
+        return results
+
+    def apply_movements(self, conn, movements, user_id=None, created_at=None, counts=None):
+        """Write movements on `conn` without committing.
+
+        For callers that need stock changes in the same transaction as their
+        own writes (e.g. checkout). Raises on unknown products or bad actions;
+        the caller's transaction should then be rolled back.
+
+        `counts` is a dict the caller keeps for the whole transaction and
+        hands to `committed` once it has committed, so the snapshot cadence
+        only ever counts rows that were actually written.
+        """
+        if counts is None:
+            counts = {}
+
+        for movement in movements:
+            if movement['action'] not in MOVEMENT_ACTIONS:
+                raise ValueError(f"Unknown inventory action: {movement['action']}")
+
+        timestamp = to_timestamp(created_at or datetime.now())
+        results = []
+
+        for movement in movements:
+            product_id = movement['product_id']
+            change = int(movement['quantity_change'])
+
+            conn.execute(
+                "UPDATE products SET stock_quantity = stock_quantity + ? WHERE id = ?",
+                (change, product_id)
+            )
+            row = conn.execute(
+                "SELECT stock_quantity FROM products WHERE id = ?", (product_id,)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown product id: {product_id}")
+            new_quantity = row[0]
+
+            cursor = conn.execute("""
+                INSERT INTO inventory_log
+                    (product_id, action, quantity_change, new_quantity, user_id, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (product_id, movement['action'], change, new_quantity,
+                  user_id, movement.get('notes'), timestamp))
+            log_id = cursor.lastrowid
+
+            counts[product_id] = self._count_movement(conn, product_id, counts)
+            if counts[product_id] >= self.snapshot_interval:
+                conn.execute("""
+                    INSERT INTO inventory_snapshots (product_id, log_id, quantity, snapshot_at)
+                    VALUES (?, ?, ?, ?)
+                """, (product_id, log_id, new_quantity, timestamp))
+                counts[product_id] = 0
+
+            results.append({
+                'product_id': product_id,
+                'log_id': log_id,
+                'new_quantity': new_quantity
+            })
+
+        return results
+
+    def committed(self, counts):
+        """Adopt the snapshot counters of a transaction that has committed"""
+        self._since_snapshot.update(counts)
+
+    def _count_movement(self, conn, product_id, counts):
+        """Movements of the product since its last checkpoint, including the one just logged"""
+        count = counts.get(product_id)
+        if count is None:
+            count = self._since_snapshot.get(product_id)
+
+        if count is None:
+            last = conn.execute(
+                "SELECT MAX(log_id) FROM inventory_snapshots WHERE product_id = ?", (product_id,)
+            ).fetchone()[0]
+            if last is None:
+                # First movement of this product always gets a checkpoint
+                count = self.snapshot_interval
+            else:
+                count = conn.execute(
+                    "SELECT COUNT(*) FROM inventory_log WHERE product_id = ? AND id > ?",
+                    (product_id, last)
+                ).fetchone()[0]
+        else:
+            count += 1
+        return count
+
+    def stock_at(self, at, product_ids=None):
+        """Return {product_id: quantity} as of `at` (datetime, date or timestamp text)"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+
+        timestamp = to_timestamp(at)
+        if product_ids is None:
+            return self._stock_at(conn, timestamp)
+
+        stock = {}
+        product_ids = list(product_ids)
+        # Keep each IN list well under SQLite's bound-parameter limit
+        for i in range(0, len(product_ids), STOCK_AT_BATCH):
+            stock.update(self._stock_at(conn, timestamp, product_ids[i:i + STOCK_AT_BATCH]))
+        return stock
+
+    def _stock_at(self, conn, timestamp, product_ids=None):
+        """Latest checkpoint per product at `timestamp` plus the bounded replay after it, in one query"""
+        snapshot_filter = product_filter = ""
+        params = []
+        if product_ids is not None:
+            placeholders = ", ".join("?" * len(product_ids))
+            snapshot_filter = f"AND product_id IN ({placeholders})"
+            product_filter = f"WHERE p.id IN ({placeholders})"
+            params = list(product_ids)
+
+        rows = conn.execute(f"""
+            WITH latest AS (
+                SELECT product_id, log_id, quantity, snapshot_at
+                FROM (
+                    SELECT product_id, log_id, quantity, snapshot_at,
+                           ROW_NUMBER() OVER (PARTITION BY product_id
+                                              ORDER BY snapshot_at DESC, log_id DESC) AS rn
+                    FROM inventory_snapshots
+                    WHERE snapshot_at <= ? {snapshot_filter}
+                )
+                WHERE rn = 1
+            )
+            SELECT p.id, COALESCE(s.quantity, 0) + COALESCE(SUM(l.quantity_change), 0)
+            FROM products p
+            LEFT JOIN latest s ON s.product_id = p.id
+            LEFT JOIN inventory_log l
+                   ON l.product_id = p.id
+                  AND l.id > COALESCE(s.log_id, 0)
+                  AND l.created_at >= COALESCE(s.snapshot_at, '')
+                  AND l.created_at <= ?
+            {product_filter}
+            GROUP BY p.id
+        """, [timestamp] + params + [timestamp] + params).fetchall()
+
+        stock = dict(rows)
+        # Ids that are not in the catalogue have no stock
+        for product_id in product_ids or []:
+            stock.setdefault(product_id, 0)
+        return stock
+
+    def get_movements(self, product_id, start=None, end=None, limit=100):
+        """Return the most recent movements of a product, newest first"""
+        query = "SELECT * FROM inventory_log WHERE product_id = ?"
+        params = [product_id]
+        if start is not None:
+            query += " AND created_at >= ?"
+            params.append(to_timestamp(start))
+        if end is not None:
+            query += " AND created_at <= ?"
+            params.append(to_timestamp(end))
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return self.db.execute_query(query, tuple(params))
+
+    def take_snapshots(self):
+        """Checkpoint the latest logged quantity of every product (e.g. nightly)"""
+        self._since_snapshot.clear()
+        return self.db.execute_query("""
+            INSERT INTO inventory_snapshots (product_id, log_id, quantity, snapshot_at)
+            SELECT l.product_id, l.id, l.new_quantity, l.created_at
+            FROM inventory_log l
+            WHERE l.id IN (SELECT MAX(id) FROM inventory_log GROUP BY product_id)
+              AND NOT EXISTS (SELECT 1 FROM inventory_snapshots s WHERE s.log_id = l.id)
+        """)
+
+    def rebuild_snapshots(self):
+        """Rebuild checkpoints from the whole log (backfills logs written before the ledger)"""
+        self._since_snapshot.clear()
+        self.db.execute_query("DELETE FROM inventory_snapshots")
+        return self.db.execute_query("""
+            INSERT INTO inventory_snapshots (product_id, log_id, quantity, snapshot_at)
+            SELECT product_id, id, new_quantity, created_at
+            FROM (
+                SELECT id, product_id, new_quantity, created_at,
+                       ROW_NUMBER() OVER (PARTITION BY product_id ORDER BY id) AS rn
+                FROM inventory_log
+            )
+            WHERE (rn - 1) % ? = 0
+        """, (self.snapshot_interval,))
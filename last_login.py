@@ -0,0 +1,71 @@
+import threading
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class LastLoginTracker:
+    """Keeps users' latest login times in memory and writes them to users.last_login_at in batches.
+
+    Only the newest time per user is kept, so a burst of logins at shift
+    change becomes one executemany every `flush_interval` seconds instead
+    of one UPDATE per login. A failed write is kept and retried (unless a
+    newer login replaced it meanwhile).
+    """
+
+    def __init__(self, db, flush_interval=30.0):
+        self.db = db
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = {}   # user_id -> timestamp
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def record(self, user_id, when=None):
+        """Note a login; returns immediately"""
+        if user_id is None:
+            return
+        when = (when or datetime.now()).strftime(TIMESTAMP_FORMAT)
+        with self._lock:
+            self._pending[user_id] = max(when, self._pending.get(user_id, when))
+
+    def pending(self, user_id):
+        """The login time of `user_id` not yet written, if any"""
+        with self._lock:
+            return self._pending.get(user_id)
+
+    def flush(self):
+        """Write pending login times in one transaction; returns how many users were updated"""
+        with self._lock:
+            batch = self._pending
+            self._pending = {}
+        if not batch:
+            return 0
+
+        if not self.db.record_last_logins(batch.items()):
+            with self._lock:
+                for user_id, when in batch.items():
+                    self._pending[user_id] = max(when, self._pending.get(user_id, when))
+            return 0
+        return len(batch)
+
+    def start(self):
+        """Flush in the background until stop()"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Last login flush error: {e}")
@@ -0,0 +1,388 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus' default latency buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Label value every further series of a metric with `max_series` is folded into
+OVERFLOW_LABEL = "other"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + list(extra or [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation, labelnames=(), max_series=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series   # cap on label combinations; later ones share an OVERFLOW_LABEL series
+        self._lock = threading.Lock()
+        self._children = {}
+
+    def labels(self, *values):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        values = tuple(str(v) for v in values)
+        with self._lock:
+            child = self._children.get(values)
+            if child is None:
+                if self.max_series is not None and len(self._children) >= self.max_series:
+                    values = (OVERFLOW_LABEL,) * len(values)
+                    child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self._new_child()
+        return child
+
+    def _default(self):
+        """The child used when a metric has no labels"""
+        return self.labels()
+
+    def expose(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for values, child in children:
+            lines.extend(self._sample_lines(values, child))
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count (exposed with a _total suffix)"""
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def _sample_lines(self, values, child):
+        return [f"{self.name}_total{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down; optionally computed on scrape by `function`"""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value):
+        self._default().set(value)
+
+    def expose(self):
+        if self.function is not None:
+            self.set(self.function())
+        return super().expose()
+
+    def _sample_lines(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"]
+
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        with self._lock:
+            self.sum += value
+            self.count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets (seconds by convention)"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS, max_series=None):
+        super().__init__(name, documentation, labelnames, max_series)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def time(self, *labels):
+        """Context manager observing the wall time of its block"""
+        return _Timer(self.labels(*labels) if labels else self._default())
+
+    def _sample_lines(self, values, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            le = _format_labels(self.labelnames, values, [("le", _format_value(bound))])
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class _Timer:
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+class Registry:
+    """Set of metrics rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def exposition(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.expose())
+        return "\n".join(lines) + "\n"
+
+
+class RateWindow:
+    """Events in the last `seconds` (e.g. sales per minute) from their timestamps"""
+
+    def __init__(self, seconds=60):
+        self.seconds = seconds
+        self._lock = threading.Lock()
+        self._events = deque()
+
+    def add(self, now=None):
+        with self._lock:
+            self._events.append(now or time.time())
+
+    def count(self, now=None):
+        cutoff = (now or time.time()) - self.seconds
+        with self._lock:
+            while self._events and self._events[0] < cutoff:
+                self._events.popleft()
+            return len(self._events)
+
+
+class SessionTracker:
+    """Sessions seen within the last `idle_seconds`"""
+
+    def __init__(self, idle_seconds=900):
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._last_seen = {}
+
+    def touch(self, session_id):
+        with self._lock:
+            self._last_seen[session_id] = time.time()
+
+    def active(self):
+        cutoff = time.time() - self.idle_seconds
+        with self._lock:
+            for session_id in [s for s, seen in self._last_seen.items() if seen < cutoff]:
+                del self._last_seen[session_id]
+            return len(self._last_seen)
+
+
+# Process-wide registry and the metrics the app records
+registry = Registry()
+sales_window = RateWindow(60)
+sessions = SessionTracker()
+
+SALES = registry.register(Counter(
+    "sales", "Completed sales by checkout outcome (committed or queued offline)", ["outcome"]))
+SALES_PER_MINUTE = registry.register(Gauge(
+    "sales_per_minute", "Sales completed in the last 60 seconds", function=sales_window.count))
+CHECKOUT_SECONDS = registry.register(Histogram(
+    "checkout_latency_seconds", "Time to commit or queue a sale at the till", ["outcome"]))
+DB_QUERY_SECONDS = registry.register(Histogram(
+    "db_query_duration_seconds", "Database.execute_query / execute_many time by statement", ["statement"],
+    max_series=200))
+CATALOGUE_CACHE = registry.register(Counter(
+    "catalogue_cache_requests", "Product catalogue loads served from cache (hit) or the database (miss)", ["result"]))
+BACKUP_SECONDS = registry.register(Histogram(
+    "backup_duration_seconds", "Database backup duration", ["status"],
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)))
+LAST_BACKUP = registry.register(Gauge(
+    "backup_last_success_timestamp_seconds", "Unix time of the last successful backup"))
+ACTIVE_SESSIONS = registry.register(Gauge(
+    "active_sessions", "Browser sessions active in the last 15 minutes", function=sessions.active))
+LOGIN_ATTEMPTS = registry.register(Counter(
+    "login_attempts", "Login attempts by outcome (success, failed or rate_limited)", ["outcome"]))
+LOGIN_SECONDS = registry.register(Histogram(
+    "login_duration_seconds", "Time to check credentials, password hashing included"))
+
+
+def record_sale(outcome, seconds):
+    """Count a completed checkout and observe its latency"""
+    SALES.labels(outcome).inc()
+    CHECKOUT_SECONDS.labels(outcome).observe(seconds)
+    sales_window.add()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # scrapes every few seconds would flood the app log
+
+
+class MetricsExporter:
+    """Expose a registry on a side HTTP port (/metrics) and/or rewrite it to a file periodically.
+
+    The file is replaced atomically, which suits node_exporter's textfile
+    collector. Use port=0 to bind a free port (see `.port`).
+    """
+
+    def __init__(self, registry=registry, port=None, host="127.0.0.1", path=None, interval_seconds=15):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.path = path
+        self.interval_seconds = interval_seconds
+        self._server = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        if self.port is not None and self._server is None:
+            try:
+                self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            except OSError as e:
+                print(f"Metrics endpoint unavailable on port {self.port}: {e}")
+            else:
+                self._server.registry = self.registry
+                self._server.daemon_threads = True
+                self.port = self._server.server_address[1]
+                threading.Thread(target=self._server.serve_forever, daemon=True).start()
+                print(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+        if self.path and not (self._thread and self._thread.is_alive()):
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def write_file(self):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.registry.exposition())
+        os.replace(tmp_path, self.path)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.write_file()
+            except OSError as e:
+                print(f"Metrics file error: {e}")
+            self._stop_event.wait(self.interval_seconds)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+SAMPLE_LINE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{.*\})?\s+(\S+)$')
+LABEL_PAIR = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def parse_exposition(text):
+    """Parse text exposition into {(name, ((label, value), ...)): float}.
+
+    A minimal scraper stand-in for checking what a Prometheus server would
+    collect; raises ValueError on malformed lines.
+    """
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE_LINE.match(line)
+        if not match:
+            raise ValueError(f"Malformed metrics line: {line!r}")
+        name, labels, value = match.groups()
+        pairs = tuple(sorted(LABEL_PAIR.findall(labels or "")))
+        samples[(name, pairs)] = float(value.replace("+Inf", "inf"))
+    return samples
+
+
+def scrape(url, timeout=5):
+    """Fetch and parse a /metrics endpoint like a Prometheus server would"""
+    import urllib.request
+    
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        if not response.headers.get("Content-Type", "").startswith("text/plain"):
+            raise ValueError(f"Unexpected content type: {response.headers.get('Content-Type')}")
+        return parse_exposition(response.read().decode("utf-8"))
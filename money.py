@@ -0,0 +1,130 @@
+from collections import namedtuple
+
+import numpy as np
+
+from cents import CENTS
+
+# Money is held as integer cents (int64 arrays for carts and reports) so that
+# sums and tax never drift; floats only appear when a value is displayed.
+
+# Tax rounding rules (the 'tax_rounding' setting)
+PER_INVOICE = "Per invoice"   # tax on the cart subtotal, rounded once, then shared out over the lines
+PER_LINE = "Per line"         # tax rounded on every line; the invoice tax is the sum of the lines
+ROUNDING_RULES = [PER_INVOICE, PER_LINE]
+
+# lines, line_tax: int64 arrays per cart line; subtotal, tax, total: int
+CartTotals = namedtuple('CartTotals', ['lines', 'line_tax', 'subtotal', 'tax', 'total'])
+
+
+def _round_half_up(values):
+    return np.sign(values) * np.floor(np.abs(values) + 0.5)
+
+
+def to_cents(amount):
+    """Amount(s) in currency units as integer cents, rounding half away from zero.
+
+    Accepts a number (returns an int) or anything array-like, such as a
+    DataFrame column (returns an int64 array).
+    """
+    # Rounded to 6 places first, so 1.005 (stored as 1.00499999...) still counts as a half cent
+    values = _round_half_up(np.round(np.asarray(amount, dtype=np.float64) * CENTS, 6)).astype(np.int64)
+    return int(values) if values.ndim == 0 else values
+
+
+def from_cents(cents):
+    """Integer cents as currency units for display and charts (a float, or a float array)"""
+    values = np.asarray(cents, dtype=np.int64) / CENTS
+    return float(values) if values.ndim == 0 else values
+
+
+def format_cents(cents):
+    """'1,234.50' for 123450 -- formatted from the integer, never through a float"""
+    cents = int(cents)
+    units, rest = divmod(abs(cents), CENTS)
+    return f"{'-' if cents < 0 else ''}{units:,}.{rest:02d}"
+
+
+def rate_basis_points(rate_percent):
+    """A percentage rate (16.0) as integer basis points (1600), so tax is computed in integers"""
+    return int(_round_half_up(np.float64(rate_percent) * 100))
+
+
+def apply_rate(cents, basis_points):
+    """cents * rate, rounded half away from zero to whole cents (int64 arithmetic, vectorized)"""
+    values = np.asarray(cents, dtype=np.int64) * np.int64(basis_points)
+    result = (values + 5000) // 10000
+    negative = values < 0
+    if negative.any():
+        # Floor division rounds negatives towards -inf; mirror them instead
+        result = np.where(negative, -((-values + 5000) // 10000), result)
+    return int(result) if result.ndim == 0 else result
+
+
+def allocate(total, weights):
+    """Split integer `total` over `weights` in proportion, summing exactly to `total` (largest remainder)"""
+    weights = np.asarray(weights, dtype=np.int64)
+    weight_sum = int(weights.sum())
+    if weight_sum == 0 or len(weights) == 0:
+        return np.zeros(len(weights), dtype=np.int64)
+    shares, remainders = np.divmod(weights * np.int64(total), weight_sum)
+    # The cents lost to flooring go to the lines with the largest remainders
+    short = int(total - shares.sum())
+    if short:
+        shares[np.argsort(-remainders, kind='stable')[:short]] += 1
+    return shares
+
+
+def line_taxes(lines, basis_points, rounding=PER_INVOICE):
+    """Tax in cents for each line amount, at each line's rate in basis points.
+
+    With PER_INVOICE the tax of each rate is computed once on the lines
+    taxed at that rate and allocated back to them; with PER_LINE every
+    line's tax is rounded on its own.
+    """
+    lines = np.asarray(lines, dtype=np.int64)
+    basis_points = np.broadcast_to(np.asarray(basis_points, dtype=np.int64), lines.shape)
+    if rounding == PER_LINE:
+        return np.asarray(apply_rate(lines, basis_points), dtype=np.int64)
+    taxes = np.zeros(len(lines), dtype=np.int64)
+    for rate in np.unique(basis_points):
+        at_rate = basis_points == rate
+        taxes[at_rate] = allocate(apply_rate(int(lines[at_rate].sum()), rate), lines[at_rate])
+    return taxes
+
+
+def cart_totals(unit_cents, quantities, tax_rate, rounding=PER_INVOICE):
+    """Line totals, tax and invoice totals of a cart, all in integer cents.
+
+    `unit_cents` and `quantities` are per line; `tax_rate` is a percentage.
+    With PER_INVOICE the tax is computed once on the subtotal and allocated
+    to the lines; with PER_LINE each line's tax is rounded and summed.
+    Either way the line taxes add up to the invoice tax exactly.
+    """
+    lines = np.asarray(unit_cents, dtype=np.int64) * np.asarray(quantities, dtype=np.int64)
+    line_tax = line_taxes(lines, rate_basis_points(tax_rate), rounding)
+    subtotal, tax = int(lines.sum()), int(line_tax.sum())
+    return CartTotals(lines, line_tax, subtotal, tax, subtotal + tax)
+
+
+def with_cents(receipt_data):
+    """A receipt with the integer-cents fields, converting the float fields of sales queued before them"""
+    if 'total_cents' in receipt_data:
+        return receipt_data
+    items = [dict(item, price_cents=to_cents(item['price']), total_cents=to_cents(item['total']))
+             for item in receipt_data['items']]
+    subtotal = sum(item['total_cents'] for item in items)
+    # Keep the tax the customer was shown, shared out over the lines
+    tax = to_cents(receipt_data.get('tax_amount', 0))
+    for item, line_tax in zip(items, allocate(tax, [item['total_cents'] for item in items])):
+        item['tax_cents'] = int(line_tax)
+    return dict(receipt_data, items=items, subtotal_cents=subtotal, tax_cents=tax,
+                total_cents=subtotal + tax, tax_rounding=PER_INVOICE)
+
+
+def as_amounts(df):
+    """A copy of DataFrame `df` for display or export: each `<name>_cents` column becomes `<name>` in currency units"""
+    cents = [column for column in df.columns if column.endswith('_cents')]
+    out = df.rename(columns={column: column[:-len('_cents')] for column in cents})
+    for column in cents:
+        out[column[:-len('_cents')]] = from_cents(df[column].astype('int64'))
+    return out
@@ -0,0 +1,135 @@
+import smtplib
+import socketserver
+import threading
+from email.message import EmailMessage
+
+
+class ConsoleNotifier:
+    """Notifier that just prints messages (default when email is not configured)"""
+
+    def send(self, subject, body):
+        print(f"[notification] {subject}\n{body}")
+        return True
+
+
+class SMTPNotifier:
+    """Send notifications by email through an SMTP server"""
+
+    def __init__(self, host="localhost", port=25, sender="alerts@system.com",
+                 recipients=None, username=None, password=None, use_tls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients or [])
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send(self, subject, body):
+        """Email `subject`/`body` to all recipients; returns True on success"""
+        if not self.recipients:
+            return False
+
+        message = EmailMessage()
+        message['Subject'] = subject
+        message['From'] = self.sender
+        message['To'] = ", ".join(self.recipients)
+        message.set_content(body)
+
+        try:
+            with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as server:
+                if self.use_tls:
+                    server.starttls()
+                if self.username:
+                    server.login(self.username, self.password)
+                server.send_message(message)
+            return True
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"Email notification error: {e}")
+            return False
+
+
+class _SMTPSinkHandler(socketserver.StreamRequestHandler):
+    """Speak just enough SMTP to accept and store messages"""
+
+    def reply(self, line):
+        self.wfile.write((line + "\r\n").encode())
+
+    def handle(self):
+        self.reply("220 localhost SMTP sink ready")
+        mail_from, rcpt_to = None, []
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                break
+            command = line.decode(errors="replace").strip()
+            verb = command[:4].upper()
+
+            if verb in ("HELO", "EHLO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = command[10:].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command[8:].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line.decode(errors="replace"))
+                self.server.messages.append({
+                    'from': mail_from,
+                    'to': rcpt_to,
+                    'data': "".join(data)
+                })
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                break
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            else:
+                self.reply("502 Command not implemented")
+
+
+class LocalSMTPServer:
+    """In-process SMTP stand-in for tests: collects messages instead of sending them.
+
+    Usage:
+        with LocalSMTPServer() as smtp:
+            notifier = SMTPNotifier(port=smtp.port, recipients=["a@b.c"])
+            ...
+            smtp.messages  # list of {'from', 'to', 'data'}
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self._server = socketserver.ThreadingTCPServer((host, port), _SMTPSinkHandler)
+        self._server.daemon_threads = True
+        self._server.messages = []
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @property
+    def messages(self):
+        return self._server.messages
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,99 @@
+import base64
+import hashlib
+import hmac
+import os
+
+# Cost parameters for new hashes. scrypt memory is 128 * n * r bytes (16 MB here);
+# see benchmarks/password_hash_benchmark.py to pick values that keep login p95 on target.
+SCRYPT_N = int(os.environ.get("PASSWORD_SCRYPT_N", 2 ** 14))
+SCRYPT_R = int(os.environ.get("PASSWORD_SCRYPT_R", 8))
+SCRYPT_P = int(os.environ.get("PASSWORD_SCRYPT_P", 1))
+PBKDF2_ITERATIONS = int(os.environ.get("PASSWORD_PBKDF2_ITERATIONS", 600000))
+DEFAULT_SCHEME = os.environ.get("PASSWORD_SCHEME", "scrypt")
+
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem must cover 128 * n * r plus headroom, or OpenSSL refuses large n
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r + 2 ** 20, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=KEY_BYTES)
+
+
+def hash_password(password, scheme=None, n=None, r=None, p=None, iterations=None):
+    """Salted hash in a self-describing format: scrypt$n$r$p$salt$key or pbkdf2_sha256$iterations$salt$key"""
+    salt = os.urandom(SALT_BYTES)
+    if (scheme or DEFAULT_SCHEME) == "pbkdf2_sha256":
+        iterations = iterations or PBKDF2_ITERATIONS
+        return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+    n, r, p = n or SCRYPT_N, r or SCRYPT_R, p or SCRYPT_P
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+
+def verify_password(password, stored):
+    """True if `password` matches the stored hash (or a legacy sha256/plaintext value)"""
+    if not stored:
+        return False
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            return hmac.compare_digest(_scrypt(password, _unb64(parts[4]), n, r, p), _unb64(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            return hmac.compare_digest(_pbkdf2(password, _unb64(parts[2]), int(parts[1])), _unb64(parts[3]))
+    except (ValueError, TypeError) as e:
+        print(f"Unreadable password hash: {e}")
+        return False
+
+    # Accounts created before salted hashing: unsalted sha256 hex digests or plaintext
+    legacy = hashlib.sha256(password.encode()).hexdigest() if len(stored) == 64 else password
+    return hmac.compare_digest(legacy.encode(), stored.encode())
+
+
+def needs_rehash(stored):
+    """True if the stored hash is legacy or weaker than the current default parameters"""
+    parts = (stored or "").split("$")
+    if DEFAULT_SCHEME == "pbkdf2_sha256":
+        return not (parts[0] == "pbkdf2_sha256" and len(parts) == 4 and int(parts[1]) >= PBKDF2_ITERATIONS)
+    return not (parts[0] == "scrypt" and len(parts) == 6
+                and (int(parts[1]), int(parts[2]), int(parts[3])) >= (SCRYPT_N, SCRYPT_R, SCRYPT_P))
+
+
+# Verified against unknown usernames so they take as long as real ones
+_DUMMY_HASH = None
+
+
+def dummy_verify(password):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("not-a-real-password")
+    verify_password(password, _DUMMY_HASH)
+
+
+def policy_problems(password, policy):
+    """Ways `password` breaks the password policy settings in `policy` (empty if it complies)"""
+    problems = []
+    if len(password) < policy['password_min_length']:
+        problems.append(f"at least {policy['password_min_length']} characters")
+    if policy['password_require_upper'] and not any(c.isupper() for c in password):
+        problems.append("an uppercase letter")
+    if policy['password_require_lower'] and not any(c.islower() for c in password):
+        problems.append("a lowercase letter")
+    if policy['password_require_digit'] and not any(c.isdigit() for c in password):
+        problems.append("a number")
+    if policy['password_require_special'] and all(c.isalnum() for c in password):
+        problems.append("a special character")
+    return problems
@@ -0,0 +1,114 @@
+import sqlite3
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+ROLES = ('admin', 'manager', 'clerk')
+
+# (permission, label, module) -- the order is the order of the Access Control checkboxes
+PERMISSIONS = (
+    ('process_sales', "Process Sales", "Sales"),
+    ('view_sales', "View Sales", "Sales"),
+    ('refund_sales', "Process Refunds", "Sales"),
+    ('view_inventory', "View Inventory", "Inventory"),
+    ('edit_inventory', "Edit Inventory", "Inventory"),
+    ('delete_inventory', "Delete Items", "Inventory"),
+    ('view_reports', "View Reports", "Reports"),
+    ('export_reports', "Export Reports", "Reports"),
+    ('view_analytics', "View Analytics", "Reports"),
+    ('manage_users', "Manage Users", "Administration"),
+    ('manage_settings', "Manage Settings", "Administration"),
+    ('view_logs', "View System Logs", "Administration"),
+    ('backup_data', "Backup Data", "Administration"),
+)
+PERMISSION_LABELS = {key: label for key, label, _ in PERMISSIONS}
+ALL_PERMISSIONS = frozenset(PERMISSION_LABELS)
+
+# Seeded into role_permissions on a fresh database
+DEFAULT_ROLE_PERMISSIONS = {
+    'manager': frozenset({'process_sales', 'view_sales', 'refund_sales', 'view_inventory', 'edit_inventory',
+                          'view_reports', 'export_reports', 'view_analytics', 'view_logs'}),
+    'clerk': frozenset({'process_sales', 'view_sales', 'view_inventory', 'view_reports'}),
+}
+
+_NONE = frozenset()
+
+# version: data version of role_permissions the roles were read at; roles: role -> frozenset
+PermissionSnapshot = namedtuple('PermissionSnapshot', ['version', 'roles', 'checked_at'])
+
+
+class PermissionCache:
+    """Role -> permission sets from the role_permissions table, held as an immutable snapshot.
+
+    A check is a frozenset membership test on the current snapshot, with
+    no query and no lock. Changes are picked up by comparing the table's
+    data version at most every `revalidate_seconds`, and immediately
+    after `set_role_permissions` in this process. Admins always hold
+    every permission, so nobody can lock the last administrator out.
+    """
+
+    def __init__(self, db, revalidate_seconds=30):
+        self.db = db
+        self.revalidate_seconds = revalidate_seconds
+        self._snapshot = None
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def allowed(self, role, permission):
+        """True if `role` holds `permission`"""
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.checked_at >= self.revalidate_seconds:
+            snapshot = self.refresh()
+        return permission in snapshot.roles.get(role, _NONE)
+
+    def permissions_for(self, role):
+        return self._snapshot.roles.get(role, _NONE)
+
+    def refresh(self, force=False):
+        """Reload the snapshot if role_permissions changed (or always, with force)"""
+        current = self._snapshot
+        version = self.db.get_data_version('role_permissions')
+        if current is not None and (version is None or (version == current.version and not force)):
+            # Unchanged, or the database is unreachable: keep serving the last good snapshot
+            self._snapshot = current._replace(checked_at=time.monotonic())
+            return self._snapshot
+
+        rows = self.db.execute_query("SELECT role, permission FROM role_permissions") if version else None
+        if rows is None:
+            roles = dict(DEFAULT_ROLE_PERMISSIONS)
+        else:
+            grouped = {}
+            for row in rows:
+                grouped.setdefault(row['role'], set()).add(row['permission'])
+            roles = {role: frozenset(perms) for role, perms in grouped.items()}
+        roles['admin'] = ALL_PERMISSIONS
+
+        self._snapshot = PermissionSnapshot(version, MappingProxyType(roles), time.monotonic())
+        return self._snapshot
+
+    def set_role_permissions(self, role, permissions):
+        """Replace a role's permission set in one transaction; returns False on failure"""
+        if role == 'admin':
+            print("Administrators always hold every permission")
+            return False
+        if role not in ROLES:
+            print(f"Unknown role: {role}")
+            return False
+
+        rows = [(role, p) for p in sorted(set(permissions) & ALL_PERMISSIONS)]
+        conn = self.db.get_connection()
+        if conn is None:
+            return False
+        try:
+            with self.db.lock, conn:
+                conn.execute("DELETE FROM role_permissions WHERE role = ?", (role,))
+                conn.executemany("INSERT INTO role_permissions (role, permission) VALUES (?, ?)", rows)
+        except sqlite3.Error as e:
+            print(f"Error saving permissions for {role}: {e}")
+            return False
+
+        self.refresh(force=True)
+        return True
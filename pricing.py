@@ -0,0 +1,267 @@
+import json
+import sqlite3
+import threading
+import time
+from bisect import bisect_right
+from collections import Counter, OrderedDict, namedtuple
+from datetime import datetime
+
+from money import PER_INVOICE, allocate, apply_rate, line_taxes, rate_basis_points
+
+# Rule kind -> label. 'tax' sets a category's VAT rate; 'promotion' takes a percentage off products or a
+# category; 'quantity' does the same from `min_quantity` units on a line; 'bundle' takes a fixed amount
+# off every complete set of its products
+RULE_KINDS = {'tax': "Category VAT", 'promotion': "Promotion", 'quantity': "Quantity Discount", 'bundle': "Bundle"}
+
+RULE_COLUMNS = ("id, name, kind, category, product_ids, rate, min_quantity, discount_cents, store_id, "
+                "starts_at, ends_at, is_active")
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# A rule with its numbers in the integer form evaluation uses (rate as basis points, window as datetimes)
+Rule = namedtuple('Rule', ['id', 'name', 'kind', 'category', 'product_ids', 'basis_points', 'min_quantity',
+                           'discount_cents', 'starts', 'ends'])
+
+# Lookup tables for one store: tax rules by category, percentage discounts by product id and by category,
+# bundles by member product id, and the sorted times at which a time-boxed rule starts or ends
+CompiledRules = namedtuple('CompiledRules', ['tax', 'discounts_by_product', 'discounts_by_category',
+                                             'bundles_by_product', 'boundaries'])
+
+# Amounts in integer cents; basis_points is the line's tax rate, rules the names of the rules applied
+PricedLine = namedtuple('PricedLine', ['id', 'gross', 'discount', 'net', 'tax', 'basis_points', 'rules'])
+PricedCart = namedtuple('PricedCart', ['lines', 'gross', 'discount', 'subtotal', 'tax', 'total', 'rules'])
+
+PricingSnapshot = namedtuple('PricingSnapshot', ['version', 'rows', 'compiled', 'checked_at'])
+
+
+def _parse_time(value):
+    return datetime.strptime(value, TIMESTAMP_FORMAT) if value else None
+
+
+def to_rule(row):
+    """A pricing_rules row as a Rule"""
+    return Rule(row['id'], row['name'], row['kind'], row['category'],
+                tuple(json.loads(row['product_ids'] or "[]")), rate_basis_points(row['rate'] or 0),
+                row['min_quantity'] or 1, row['discount_cents'] or 0,
+                _parse_time(row['starts_at']), _parse_time(row['ends_at']))
+
+
+def compile_rules(rules):
+    """Build the lookup tables for a list of Rules (those of one store, active only)"""
+    tax, by_product, by_category, bundles = {}, {}, {}, {}
+    boundaries = set()
+    for rule in rules:
+        boundaries.update(t for t in (rule.starts, rule.ends) if t is not None)
+        if rule.kind == 'tax':
+            tax.setdefault(rule.category, []).append(rule)
+        elif rule.kind == 'bundle':
+            for product_id in set(rule.product_ids):
+                bundles.setdefault(product_id, []).append(rule)
+        else:
+            for product_id in rule.product_ids:
+                by_product.setdefault(product_id, []).append(rule)
+            if rule.category:
+                by_category.setdefault(rule.category, []).append(rule)
+    freeze = lambda table: {key: tuple(value) for key, value in table.items()}
+    return CompiledRules(freeze(tax), freeze(by_product), freeze(by_category), freeze(bundles),
+                         tuple(sorted(boundaries)))
+
+
+def _live(rule, now):
+    return (rule.starts is None or rule.starts <= now) and (rule.ends is None or now < rule.ends)
+
+
+def _tax_basis_points(compiled, category, default_basis_points, now):
+    """The category's VAT rate at `now` (the newest live rule wins), else the default"""
+    for rule in reversed(compiled.tax.get(category, ())):
+        if _live(rule, now):
+            return rule.basis_points
+    return default_basis_points
+
+
+def evaluate(compiled, items, default_basis_points, rounding=PER_INVOICE, now=None):
+    """Price cart `items` (dicts with id, category, price_cents, quantity) against compiled rules.
+
+    Each line gets the best live percentage discount for its product or
+    category (promotions and quantity tiers do not stack); bundle
+    discounts then come off the lines of every complete bundle, largest
+    first, each unit counting towards one bundle only. Tax is charged on
+    the discounted amounts at the category's live VAT rate, or the default.
+    """
+    now = now or datetime.now()
+    gross, discounts, applied = [], [], []
+    for item in items:
+        amount = item['price_cents'] * item['quantity']
+        best = None
+        for rule in (compiled.discounts_by_product.get(item['id'], ())
+                     + compiled.discounts_by_category.get(item.get('category'), ())):
+            if item['quantity'] >= rule.min_quantity and _live(rule, now) \
+                    and (best is None or rule.basis_points > best.basis_points):
+                best = rule
+        gross.append(amount)
+        discounts.append(apply_rate(amount, best.basis_points) if best else 0)
+        applied.append([best.name] if best else [])
+
+    # Bundles, using up the quantities they cover
+    line_of = {item['id']: n for n, item in enumerate(items)}
+    left = Counter({item['id']: item['quantity'] for item in items})
+    candidates = {rule for product_id in line_of for rule in compiled.bundles_by_product.get(product_id, ())}
+    for rule in sorted(candidates, key=lambda r: (-r.discount_cents, r.id)):
+        members = Counter(rule.product_ids)
+        if not _live(rule, now) or any(product_id not in line_of for product_id in members):
+            continue
+        count = min(left[product_id] // need for product_id, need in members.items())
+        if not count:
+            continue
+        lines = [line_of[product_id] for product_id in members]
+        room = [gross[n] - discounts[n] for n in lines]
+        amount = min(count * rule.discount_cents, sum(room))
+        if amount <= 0:
+            continue
+        for n, share in zip(lines, allocate(amount, room)):
+            discounts[n] += int(share)
+            applied[n].append(rule.name)
+        for product_id, need in members.items():
+            left[product_id] -= count * need
+
+    nets = [amount - discount for amount, discount in zip(gross, discounts)]
+    rates = [_tax_basis_points(compiled, item.get('category'), default_basis_points, now) for item in items]
+    taxes = [int(tax) for tax in line_taxes(nets, rates, rounding)] if items else []
+    lines = tuple(PricedLine(item['id'], g, d, n, t, r, tuple(a))
+                  for item, g, d, n, t, r, a in zip(items, gross, discounts, nets, taxes, rates, applied))
+    subtotal, tax = sum(nets), sum(taxes)
+    rules = tuple(dict.fromkeys(name for line in lines for name in line.rules))
+    return PricedCart(lines, sum(gross), sum(discounts), subtotal, tax, subtotal + tax, rules)
+
+
+def tax_label(tax_rate, line_rates=()):
+    """'Tax (16.0%)' when every line is taxed at the default rate (None: not recorded), else 'Tax'"""
+    return f"Tax ({tax_rate}%)" if {rate for rate in line_rates if rate is not None} <= {tax_rate} else "Tax"
+
+
+def receipt_tax_label(receipt_data):
+    """tax_label for a saved receipt (receipts from before category VAT have no per-line rates)"""
+    return tax_label(receipt_data['tax_rate'], [item.get('tax_rate') for item in receipt_data['items']])
+
+
+class PricingEngine:
+    """Tax and discount rules from the pricing_rules table, compiled once and evaluated per cart.
+
+    The rows are held as a snapshot revalidated by data version every
+    `revalidate_seconds`, like settings and stores; each store's active
+    rules are compiled into dictionaries on first use, so pricing a cart
+    is a few lookups per line. Priced carts are cached (LRU, `cache_size`)
+    by their content -- products, prices, quantities, tax rate and rounding
+    -- together with the rules version and the time window of the
+    time-boxed rules, so a rerun with an unchanged cart is one lookup.
+    """
+
+    def __init__(self, db, revalidate_seconds=30, cache_size=1024):
+        self.db = db
+        self.revalidate_seconds = revalidate_seconds
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # cart key -> PricedCart
+        self.hits = 0
+        self.misses = 0
+        self._snapshot = None
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._current().version
+
+    def _current(self):
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.checked_at >= self.revalidate_seconds:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self, force=False):
+        """Reload the rules if pricing_rules changed (or always, with force)"""
+        current = self._snapshot
+        version = self.db.get_data_version('pricing_rules')
+        if current is not None and (version is None or (version == current.version and not force)):
+            # Unchanged, or the database is unreachable: keep serving the last good snapshot
+            self._snapshot = current._replace(checked_at=time.monotonic())
+            return self._snapshot
+
+        rows = (self.db.execute_query(f"SELECT {RULE_COLUMNS} FROM pricing_rules ORDER BY id") if version else None) or []
+        self._snapshot = PricingSnapshot(version, tuple(rows), {}, time.monotonic())
+        return self._snapshot
+
+    def rules(self):
+        """Every rule row (active or not), oldest first"""
+        return list(self._current().rows)
+
+    def _compiled(self, snapshot, store_id):
+        compiled = snapshot.compiled.get(store_id)
+        if compiled is None:
+            rules = []
+            for row in snapshot.rows:
+                if not row['is_active'] or row['store_id'] not in (None, store_id):
+                    continue
+                try:
+                    rules.append(to_rule(row))
+                except (ValueError, TypeError) as e:
+                    print(f"Ignoring unreadable pricing rule {row['id']}: {e}")
+            compiled = snapshot.compiled[store_id] = compile_rules(rules)
+        return compiled
+
+    def price_cart(self, items, tax_rate, rounding=PER_INVOICE, store_id=None, now=None):
+        """PricedCart for cart `items` at `store_id`; `tax_rate` (percent) applies where no category VAT rule does"""
+        now = now or datetime.now()
+        snapshot = self._current()
+        compiled = self._compiled(snapshot, store_id)
+        default_basis_points = rate_basis_points(tax_rate)
+        key = (snapshot.version, store_id, bisect_right(compiled.boundaries, now), default_basis_points, rounding,
+               tuple((item['id'], item.get('category'), item['price_cents'], item['quantity']) for item in items))
+
+        with self._lock:
+            priced = self._cache.get(key)
+            if priced is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return priced
+
+        priced = evaluate(compiled, items, default_basis_points, rounding, now)
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = priced
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return priced
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'hits': self.hits, 'misses': self.misses}
+
+    def add_rule(self, name, kind, category=None, product_ids=(), rate=None, min_quantity=None,
+                 discount_cents=None, store_id=None, starts_at=None, ends_at=None):
+        """Save a rule; returns its id, or None"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+        try:
+            with self.db.lock, conn:
+                cursor = conn.execute("""
+                    INSERT INTO pricing_rules (name, kind, category, product_ids, rate, min_quantity, discount_cents,
+                                               store_id, starts_at, ends_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (name, kind, category or None, json.dumps(list(product_ids)) if product_ids else None, rate,
+                      min_quantity, discount_cents, store_id,
+                      starts_at.strftime(TIMESTAMP_FORMAT) if starts_at else None,
+                      ends_at.strftime(TIMESTAMP_FORMAT) if ends_at else None))
+        except sqlite3.Error as e:
+            print(f"Error adding pricing rule {name}: {e}")
+            return None
+        self.refresh(force=True)
+        return cursor.lastrowid
+
+    def set_active(self, rule_id, active):
+        """Switch a rule on or off; returns True on success"""
+        if not self.db.execute_query("UPDATE pricing_rules SET is_active = ? WHERE id = ?",
+                                     (1 if active else 0, rule_id)):
+            return False
+        self.refresh(force=True)
+        return True
@@ -0,0 +1,80 @@
+import threading
+import time
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets held in memory: `capacity` requests in a burst, refilled at `rate` per second.
+
+    Buckets that have refilled completely carry no state, so they are dropped
+    when the table grows past `max_keys`; a flood of distinct keys cannot
+    grow it without bound.
+    """
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = {}   # key -> (tokens, last update)
+
+    def _tokens(self, key, now):
+        tokens, updated = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - updated) * self.rate)
+
+    def acquire(self, key, now=None):
+        """Take a token for `key`; returns 0 if allowed, else the seconds until one is available"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._tokens(key, now)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate
+            self._buckets[key] = (tokens - 1, now)
+            if len(self._buckets) > self.max_keys:
+                self._prune(now)
+            return 0
+
+    def _prune(self, now):
+        full = [k for k in self._buckets if self._tokens(k, now) >= self.capacity]
+        for key in full:
+            del self._buckets[key]
+        # Still over: forget the oldest buckets (granting them a fresh burst)
+        if len(self._buckets) > self.max_keys:
+            for key in sorted(self._buckets, key=lambda k: self._buckets[k][1])[:len(self._buckets) - self.max_keys]:
+                del self._buckets[key]
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class LoginRateLimiter:
+    """Login attempts limited per username (password guessing) and per client IP (credential stuffing).
+
+    Checked before any database query or password hash, so a burst of
+    attempts costs a dictionary lookup instead of a scrypt run and a
+    SQLite read.
+    """
+
+    def __init__(self, user_capacity=5, user_per_minute=2, ip_capacity=20, ip_per_minute=30):
+        self.by_user = TokenBucketLimiter(user_capacity, user_per_minute / 60.0)
+        self.by_ip = TokenBucketLimiter(ip_capacity, ip_per_minute / 60.0)
+        self.rejected = 0
+
+    def configure_user(self, capacity, per_minute):
+        """Change the per-username limits (buckets start full again if they differ)"""
+        if (float(capacity), per_minute / 60.0) != (self.by_user.capacity, self.by_user.rate):
+            self.by_user = TokenBucketLimiter(capacity, per_minute / 60.0)
+
+    def check(self, username, ip_address=None):
+        """0 if the attempt may go ahead, else the seconds to wait"""
+        wait = self.by_ip.acquire(ip_address) if ip_address else 0
+        if not wait:
+            wait = self.by_user.acquire(username.strip().lower())
+        if wait:
+            self.rejected += 1
+        return wait
+
+    def succeeded(self, username):
+        """A correct password restores the user's burst, so typos earlier do not lock them out later"""
+        self.by_user.reset(username.strip().lower())
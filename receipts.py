@@ -0,0 +1,125 @@
+import io
+
+import pandas as pd
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+
+from instrumentation import timed
+from money import format_cents, from_cents
+from pricing import receipt_tax_label
+from stores import receipt_business
+
+# Receipt renderers, kept out of app.py so reportlab only loads when a receipt is produced
+
+
+@timed('export', "receipt_pdf")
+def build_pdf_receipt(receipt_data):
+    """Render a receipt to PDF bytes (runs on the checkout workers)"""
+    business = receipt_business(receipt_data)
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    
+    # Add content to PDF
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(200, 750, business['business_name'].upper())
+    
+    c.setFont("Helvetica", 10)
+    c.drawString(150, 730, business['address'])
+    c.drawString(180, 715, "Tel: " + " | ".join(business['phones']))
+    c.drawString(200, 700, f"Email: {business['email']}")
+    
+    c.line(50, 690, 550, 690)
+    
+    y_position = 670
+    c.drawString(50, y_position, f"Transaction ID: {receipt_data['transaction_id']}")
+    c.drawString(50, y_position-20, f"Date: {receipt_data['date']}")
+    c.drawString(50, y_position-40, f"Customer: {receipt_data['customer_name']}")
+    c.drawString(50, y_position-60, f"Cashier: {receipt_data['user']}")
+    if business['store_name']:
+        c.drawString(350, y_position-60, f"Store: {business['store_name']}")
+    
+    c.line(50, y_position-80, 550, y_position-80)
+    
+    # Items table
+    y_position -= 100
+    c.drawString(50, y_position, "Item")
+    c.drawString(350, y_position, "Qty")
+    c.drawString(400, y_position, "Price")
+    c.drawString(500, y_position, "Total")
+    
+    y_position -= 20
+    for item in receipt_data['items']:
+        c.drawString(50, y_position, item['name'][:40])
+        c.drawString(350, y_position, str(item['quantity']))
+        c.drawString(400, y_position, f"KES {format_cents(item['price_cents'])}")
+        c.drawString(500, y_position, f"KES {format_cents(item['total_cents'])}")
+        y_position -= 20
+    
+    c.line(50, y_position, 550, y_position)
+    y_position -= 20
+    
+    c.drawString(400, y_position, f"Subtotal: KES {format_cents(receipt_data['subtotal_cents'])}")
+    y_position -= 20
+    if receipt_data.get('discount_cents'):
+        # Line totals are already net of discounts; this is what the customer saved
+        c.drawString(400, y_position, f"You saved: KES {format_cents(receipt_data['discount_cents'])}")
+        y_position -= 20
+    c.drawString(400, y_position, f"{receipt_tax_label(receipt_data)}: KES {format_cents(receipt_data['tax_cents'])}")
+    y_position -= 20
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(400, y_position, f"TOTAL: KES {format_cents(receipt_data['total_cents'])}")
+    
+    y_position -= 40
+    c.setFont("Helvetica", 10)
+    c.drawString(50, y_position, f"Payment Method: {receipt_data['payment_method']}")
+    
+    y_position -= 40
+    if business['footer']:
+        c.drawString(200, y_position, business['footer'])
+    c.drawString(200, y_position-20, f"Visit us: {business['website']}")
+    
+    c.save()
+    
+    return buffer.getvalue()
+
+
+@timed('export', "receipt_excel")
+def build_excel_receipt(receipt_data):
+    """Render a receipt to an Excel workbook (bytes) with Items and Summary sheets"""
+    # Create items dataframe
+    items_data = []
+    for item in receipt_data['items']:
+        items_data.append({
+            'Item Name': item['name'],
+            'Quantity': item['quantity'],
+            'Unit Price (KES)': from_cents(item['price_cents']),
+            'Discount (KES)': from_cents(item.get('discount_cents', 0)),
+            'Tax Rate (%)': item.get('tax_rate', receipt_data['tax_rate']),
+            'Total (KES)': from_cents(item['total_cents'])
+        })
+    
+    df_items = pd.DataFrame(items_data)
+    
+    # Create summary dataframe
+    summary_data = {
+        'Store': [receipt_business(receipt_data)['store_name']],
+        'Transaction ID': [receipt_data['transaction_id']],
+        'Date': [receipt_data['date']],
+        'Customer': [receipt_data['customer_name']],
+        'Cashier': [receipt_data['user']],
+        'Subtotal (KES)': [from_cents(receipt_data['subtotal_cents'])],
+        'Discounts (KES)': [from_cents(receipt_data.get('discount_cents', 0))],
+        'Promotions': [", ".join(receipt_data.get('promotions', []))],
+        'Tax Rate (%)': [receipt_data['tax_rate']],
+        'Tax Amount (KES)': [from_cents(receipt_data['tax_cents'])],
+        'Total (KES)': [from_cents(receipt_data['total_cents'])],
+        'Payment Method': [receipt_data['payment_method']]
+    }
+    df_summary = pd.DataFrame(summary_data)
+    
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df_items.to_excel(writer, sheet_name='Items', index=False)
+        df_summary.to_excel(writer, sheet_name='Summary', index=False)
+    
+    return buffer.getvalue()
@@ -0,0 +1,433 @@
+import functools
+import os
+import streamlit as st
+from database import Database
+import metrics
+from stores import DEFAULT_STORE_ID
+
+# Process-wide resources and per-session data loaders shared by the pages in views/.
+# Engines import their modules lazily so that only the pages using them pay for it.
+
+# One database connection per process, shared by every session and by Authentication
+@st.cache_resource(show_spinner=False)
+def get_database():
+    """Create the process-wide database connection and make sure the schema exists"""
+    db = Database()
+    db.create_tables()
+    return db
+
+def _connect(db_path=None):
+    """A new connection to the main database, or to a store's own database file"""
+    return Database(db_path) if db_path else Database()
+
+# Stores (outlets) and the database each keeps its products and sales in
+@st.cache_resource(show_spinner=False)
+def get_stores():
+    """Create the process-wide store directory and per-store database factory"""
+    from stores import StoreDirectory
+    return StoreDirectory(get_database(), connect=Database)
+
+def current_store_id():
+    """The store this session sells from: the user's own store, or the one picked in the sidebar"""
+    return st.session_state.get('store_id') or DEFAULT_STORE_ID
+
+def current_store():
+    stores = get_stores()
+    return stores.get(current_store_id()) or stores.get(DEFAULT_STORE_ID)
+
+def store_database():
+    """Shared connection to the database holding the current store's products and sales"""
+    return get_stores().database(current_store_id())
+
+def store_db_path():
+    """The current store's own database file (None: the main database); keys the per-database resources"""
+    return get_stores().db_path(current_store_id())
+
+# Low-stock alert engine per database, shared by all sessions, polling inventory_log in the background
+@st.cache_resource(show_spinner=False)
+def get_alert_engine(db_path=None):
+    """Create the low-stock alert engine of the main database or of a store's own database"""
+    from alerts import LowStockAlertEngine
+    from notifications import SMTPNotifier
+    
+    notifier = SMTPNotifier(
+        host=os.environ.get("SMTP_HOST", "localhost"),
+        port=int(os.environ.get("SMTP_PORT", 25)),
+        sender=os.environ.get("ALERT_SENDER", "alerts@system.com")
+    )
+    engine = LowStockAlertEngine(_connect(db_path), notifier=notifier)
+    
+    # Email stays off until enabled under Settings > Notifications
+    def apply_settings(values):
+        engine.notifications_enabled = values['email_notifications'] and values['low_stock_email']
+        engine.notifier.recipients = [r.strip() for r in values['email_recipients'].split(",") if r.strip()]
+    
+    get_settings().subscribe(apply_settings)
+    engine.start()
+    return engine
+
+# Demand models are kept in memory per store and retrained incrementally as new sales days close
+@st.cache_resource(show_spinner=False)
+def get_demand_forecaster(store_id=DEFAULT_STORE_ID):
+    """Create a store's demand forecaster"""
+    from forecasting import DemandForecaster
+    return DemandForecaster()
+
+# Sales are committed synchronously; receipts, alerts and audit logging run on background workers.
+# One pipeline (connection and write lock) per database, so stores with their own file never wait on each other.
+@st.cache_resource(show_spinner=False)
+def get_checkout_pipeline(db_path=None):
+    """Create the checkout pipeline of the main database or of a store's own database"""
+    from checkout import CheckoutPipeline
+    from money import format_cents
+    from receipts import build_pdf_receipt
+    
+    alert_engine = get_alert_engine(db_path)
+    
+    def check_stock_alerts(receipt_data):
+        alert_engine.process_inventory_log()
+        alert_engine.flush()
+    
+    audit_log = get_audit_log()
+    
+    def audit_sale(receipt_data):
+        audit_log.record("Sale", user=receipt_data['user'],
+                         details=f"{receipt_data['transaction_id']}: KES {format_cents(receipt_data['total_cents'])} "
+                                 f"({receipt_data['payment_method']})")
+    
+    pipeline = CheckoutPipeline(_connect(db_path))
+    pipeline.add_task("receipt_pdf", build_pdf_receipt)
+    pipeline.add_task("low_stock_alerts", check_stock_alerts)
+    pipeline.add_task("audit", audit_sale)
+    return pipeline
+
+# Audit entries are buffered in memory and written in batches by a background thread
+@st.cache_resource(show_spinner=False)
+def get_audit_log():
+    """Create the process-wide audit log and its flusher"""
+    from audit_log import AuditLog
+    audit_log = AuditLog(Database())
+    audit_log.start()
+    return audit_log
+
+# Application settings, cached in memory; process-wide components subscribe to changes
+@st.cache_resource(show_spinner=False)
+def get_settings():
+    """Create the process-wide settings service"""
+    from settings_service import SettingsService
+    return SettingsService(Database())
+
+def save_settings(changes, description):
+    """Persist settings edited on a page and audit what changed; returns False if they could not be saved"""
+    service = get_settings()
+    current_user = st.session_state.get('current_user') or {}
+    changed = service.update(changes, user=current_user.get('username'))
+    if changed is None:
+        return False
+    # This session made the change, so it needs no notice about it
+    st.session_state.settings_version = service.version
+    if changed:
+        audit("Settings Changed", f"{description}: {', '.join(changed)}")
+    return True
+
+def notify_settings_change():
+    """Let a running session know, once, that settings were changed elsewhere since its last rerun"""
+    version = get_settings().version
+    seen = st.session_state.get('settings_version')
+    st.session_state.settings_version = version
+    if seen is not None and seen != version and st.session_state.get('authenticated'):
+        st.toast("⚙️ Settings were updated by an administrator.")
+
+# Tax and discount rules, compiled in memory; priced carts are cached by content
+@st.cache_resource(show_spinner=False)
+def get_pricing_engine():
+    """Create the process-wide pricing rules engine"""
+    from pricing import PricingEngine
+    return PricingEngine(get_database())
+
+def client_ip():
+    """The browser's IP address, if this Streamlit version exposes it (st.context, >= 1.45)"""
+    ip_address = getattr(getattr(st, 'context', None), 'ip_address', None)
+    return ip_address if isinstance(ip_address, str) else None
+
+def audit(event, details=None, status='SUCCESS', user=None):
+    """Record an audit entry for the current session's user (never blocks on the database)"""
+    if user is None:
+        current_user = st.session_state.get('current_user') or {}
+        user = current_user.get('username')
+    get_audit_log().record(event, user=user, details=details, status=status, ip_address=client_ip())
+
+# Login attempts are throttled per username and per IP in memory, before the database is touched
+@st.cache_resource(show_spinner=False)
+def get_login_limiter():
+    """Create the process-wide login rate limiter (per-user limits follow the password policy)"""
+    from rate_limiter import LoginRateLimiter
+    limiter = LoginRateLimiter(
+        ip_capacity=int(os.environ.get("LOGIN_IP_BURST", 20)),
+        ip_per_minute=float(os.environ.get("LOGIN_IP_PER_MINUTE", 30))
+    )
+    
+    # Max failed attempts is the burst; after that one attempt comes back per lockout period
+    def apply_settings(values):
+        limiter.configure_user(values['max_login_attempts'], 1.0 / max(values['lockout_minutes'], 1))
+    
+    get_settings().subscribe(apply_settings)
+    return limiter
+
+# Login sessions live server-side (SQLite + LRU); the browser only holds the token, in a cookie.
+# Tokens were once carried in the URL (?session=...); such links are stripped and no longer honoured.
+SESSION_COOKIE = "pos_session"
+SESSION_PARAM = "session"
+
+@st.cache_resource(show_spinner=False)
+def get_session_store():
+    """Create the process-wide session store, configured from the security settings"""
+    from session_store import SessionStore
+    store = SessionStore(Database())
+    get_settings().subscribe(lambda values: store.configure(timeout_minutes=values['session_timeout_minutes'],
+                                                            single_session=values['single_session']))
+    return store
+
+def _cookie_session_token():
+    """The session cookie the browser sent when this connection opened, if any"""
+    if hasattr(st, 'context'):
+        token = st.context.cookies.get(SESSION_COOKIE)
+        return token if isinstance(token, str) else None   # no real browser connection (e.g. AppTest)
+    from http.cookies import SimpleCookie
+    from streamlit.web.server.websocket_headers import _get_websocket_headers
+    cookies = SimpleCookie((_get_websocket_headers() or {}).get('Cookie', ''))
+    return cookies[SESSION_COOKIE].value if SESSION_COOKIE in cookies else None
+
+def _write_session_cookie(token):
+    """Set (or with None, clear) the session cookie from a zero-height script component.
+
+    Written by script, so it cannot be HttpOnly; it is SameSite=Strict, and
+    Secure when the app is served over HTTPS.
+    """
+    import streamlit.components.v1 as components
+    value = f"{SESSION_COOKIE}={token}" if token else f"{SESSION_COOKIE}=; Max-Age=0"
+    components.html(f"""<script>
+        parent.document.cookie = "{value}; Path=/; SameSite=Strict" + (location.protocol === "https:" ? "; Secure" : "");
+    </script>""", height=0)
+
+def _drop_url_session_token():
+    if hasattr(st, 'query_params'):
+        if SESSION_PARAM in st.query_params:
+            del st.query_params[SESSION_PARAM]
+    elif SESSION_PARAM in st.experimental_get_query_params():
+        st.experimental_set_query_params()
+
+# users.last_login_at is written in batches by a background thread, not on every login
+@st.cache_resource(show_spinner=False)
+def get_last_login_tracker():
+    """Create the process-wide last-login tracker and its flusher"""
+    from last_login import LastLoginTracker
+    tracker = LastLoginTracker(Database())
+    tracker.start()
+    return tracker
+
+def current_session():
+    """The signed-in user's server-side session ({user_id, username, role, expires_at...}) or None"""
+    return get_session_store().get(st.session_state.get('session_token'))
+
+def start_session(user_id, username, role):
+    """Open a server-side session after a successful login; returns False if it could not be stored"""
+    token = get_session_store().create(user_id, username, role)
+    if not token:
+        return False
+    st.session_state.session_token = token
+    get_last_login_tracker().record(user_id)
+    return True
+
+def end_session():
+    """Revoke the session (logout)"""
+    token = st.session_state.get('session_token')
+    if token:
+        get_session_store().revoke(token)
+    st.session_state.session_token = None
+
+def restore_session():
+    """Align the login state of this browser session with the session store, once per rerun.
+
+    A reload or server restart keeps the user signed in (the token comes back
+    in the session cookie); an expired or revoked session signs the user out.
+    """
+    _drop_url_session_token()
+    token = st.session_state.get('session_token')
+    if 'browser_token' not in st.session_state:
+        # The cookie is only sent when the browser connects, so it is read once per browser session
+        st.session_state.browser_token = _cookie_session_token()
+        token = token or st.session_state.browser_token
+    session = get_session_store().get(token) if token else None
+    
+    if session:
+        st.session_state.session_token = token
+        st.session_state.authenticated = True
+        st.session_state.user_id = session['user_id']
+        st.session_state.role = session['role']
+        if st.session_state.get('store_user') != session['username']:
+            # Once per sign-in: users tied to a store work there, others start at the default store
+            user = get_database().get_user(user_id=session['user_id'])
+            st.session_state.home_store_id = user['store_id'] if user else None
+            st.session_state.store_id = st.session_state.home_store_id or DEFAULT_STORE_ID
+            st.session_state.store_user = session['username']
+        current_user = st.session_state.current_user
+        if not current_user or current_user.get('username') != session['username']:
+            st.session_state.current_user = {'username': session['username'], 'role': session['role'],
+                                             'full_name': '', 'email': ''}
+        else:
+            current_user['role'] = session['role']
+    elif token or st.session_state.authenticated:
+        st.session_state.session_expired = bool(st.session_state.authenticated)
+        st.session_state.authenticated = False
+        st.session_state.current_user = None
+        st.session_state.session_token = None
+        st.session_state.store_user = None
+    
+    # Sign-ins and sign-outs reach the browser's cookie on the next run, which is not cut short by a rerun
+    if st.session_state.browser_token != st.session_state.get('session_token'):
+        st.session_state.browser_token = st.session_state.get('session_token')
+        _write_session_cookie(st.session_state.browser_token)
+
+# Role -> permission sets, cached in memory as an immutable snapshot with a version stamp
+@st.cache_resource(show_spinner=False)
+def get_permissions():
+    """Create the process-wide permission cache"""
+    from permissions import PermissionCache
+    return PermissionCache(Database())
+
+def has_permission(permission):
+    """True if the signed-in user's role grants `permission` (no database access)"""
+    if not st.session_state.get('authenticated'):
+        return False
+    return get_permissions().allowed(st.session_state.get('role'), permission)
+
+def authorize(permission):
+    """Guard for pages and write actions: False (with an error shown and audited) if not permitted"""
+    if has_permission(permission):
+        return True
+    from permissions import PERMISSION_LABELS
+    audit("Access Denied", permission, status='FAILED')
+    st.error(f"⛔ Your role does not have the '{PERMISSION_LABELS.get(permission, permission)}' permission.")
+    return False
+
+def requires(permission):
+    """Decorator: run the wrapped view or action only if the user holds `permission`"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not authorize(permission):
+                return None
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Till-local queue so sales are never lost when the database is slow or unreachable (one per database)
+@st.cache_resource(show_spinner=False)
+def get_till(db_path=None):
+    """Create the offline-tolerant till of the main database or of a store's own database"""
+    from till_queue import TillQueue, OfflineTill
+    queue_path = os.environ.get("TILL_QUEUE_PATH", "till_queue.jsonl")
+    if db_path:
+        queue_path = f"{os.path.splitext(db_path)[0]}.{os.path.basename(queue_path)}"
+    till = OfflineTill(get_checkout_pipeline(db_path), TillQueue(queue_path))
+    till.start()
+    return till
+
+# Closed months are moved out of the hot sales table into compressed monthly archives
+@st.cache_resource(show_spinner=False)
+def get_sales_archive():
+    """Create the process-wide sales archive and its daily archival job"""
+    from sales_archive import SalesArchive
+    archive = SalesArchive(Database(), archive_dir=os.environ.get("SALES_ARCHIVE_DIR", "sales_archive"))
+    archive.start()
+    return archive
+
+# Hourly Parquet copy of sales and inventory_log for analytics that should not hit the live database
+@st.cache_resource(show_spinner=False)
+def get_analytics_snapshot():
+    """Create the process-wide analytics snapshot and its export job"""
+    from analytics_snapshot import AnalyticsSnapshot
+    snapshot = AnalyticsSnapshot(Database(), root=os.environ.get("ANALYTICS_DIR", "analytics"),
+                                 archive=get_sales_archive())
+    if snapshot.available:
+        snapshot.start()
+    return snapshot
+
+# Serialized chart specs shared by all sessions, keyed by data version
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Create the process-wide Plotly figure cache"""
+    from figure_cache import FigureCache
+    return FigureCache()
+
+# Metrics endpoint / textfile, enabled with METRICS_PORT and/or METRICS_FILE
+@st.cache_resource(show_spinner=False)
+def get_metrics_exporter():
+    """Start the process-wide Prometheus metrics exporter"""
+    port = os.environ.get("METRICS_PORT")
+    exporter = metrics.MetricsExporter(
+        port=int(port) if port else None,
+        host=os.environ.get("METRICS_HOST", "127.0.0.1"),
+        path=os.environ.get("METRICS_FILE")
+    )
+    return exporter.start()
+
+# Number of times the catalogue was actually read from the database (cache misses)
+_catalogue_loads = [0]
+
+# Cache database data to prevent multiple connections; keyed by store and products data version
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_cached_data(store_id, products_version):
+    """Cache database data to prevent multiple connections"""
+    _catalogue_loads[0] += 1
+    db = get_stores().database(store_id)
+    sample_products, users = db.get_sample_data()
+    try:
+        products = db.get_products(store_id)
+    except Exception as e:
+        st.error(f"Error loading data: {e}")
+        products = None
+    # Sample rows only stand in when the catalogue cannot be read; a new store's empty catalogue stays empty
+    return (sample_products if products is None else products), users
+
+def load_app_data():
+    """Refresh the session's catalogue only when the store or its products data version changed"""
+    store_id = current_store_id()
+    # The store is part of the version, so charts cached by products version are per store too
+    version = f"{store_id}/{store_database().get_data_version('products')}"
+    if st.session_state.products_data is None or version != st.session_state.products_version:
+        loads_before = _catalogue_loads[0]
+        st.session_state.products_data, st.session_state.users_data = get_cached_data(store_id, version)
+        st.session_state.products_version = version
+        # get_cached_data's body only runs on a cache miss
+        hit = _catalogue_loads[0] == loads_before
+    else:
+        hit = True
+    metrics.CATALOGUE_CACHE.labels("hit" if hit else "miss").inc()
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_barcode_index(store_id, products_version):
+    """Barcode/SKU index of a store's catalogue version, shared by all sessions (rebuilt when products change)"""
+    from barcodes import BarcodeIndex
+    
+    return BarcodeIndex(get_cached_data(store_id, products_version)[0])
+
+def scan_lookup(code):
+    """The session's product for a scanned barcode or SKU (one dictionary lookup), or None"""
+    return get_barcode_index(current_store_id(), st.session_state.products_version).lookup(code)
+
+def load_stock_alerts():
+    """Re-evaluate low-stock alerts for the session's catalogue (only changed products)"""
+    get_alert_engine(store_db_path()).evaluate_products(st.session_state.products_data)
+
+# Data a page can declare as a dependency, prefetched before the page renders
+DATA_LOADERS = {
+    'products': load_app_data,
+    'stock_alerts': load_stock_alerts,
+}
+
+def prefetch(data):
+    """Load a page's declared data dependencies, in order"""
+    for name in data:
+        DATA_LOADERS[name]()
@@ -0,0 +1,274 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+from datetime import date, datetime
+
+from cents import SALES_CENTS_COLUMNS, cents_sql
+
+# SQLite refuses more than 10 attached databases by default; keep one slot spare
+MAX_ATTACHED = 9
+
+
+def month_start(value):
+    """First day of the month containing a date/datetime"""
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+class SalesArchive:
+    """Monthly partitions of the sales table, with closed months moved to compressed files.
+
+    Recent months stay in the main `sales` table where the tills write.
+    `archive_closed_months` moves every month older than `keep_months` into
+    its own SQLite file, gzips it and makes it read-only, so backups of the
+    main database stop copying cold data. `query` routes a report query to
+    the hot table plus only the archived months that overlap its date range.
+    """
+
+    def __init__(self, db, archive_dir="sales_archive", keep_months=3):
+        self.db = db
+        self.archive_dir = archive_dir
+        self.cache_dir = os.path.join(archive_dir, ".cache")
+        self.keep_months = keep_months
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def archive_path(self, month):
+        return os.path.join(self.archive_dir, f"sales_{month}.db.gz")
+
+    def archived_months(self, start=None, end=None):
+        """Archived months (YYYY-MM), optionally only those overlapping [start, end)"""
+        rows = self.db.execute_query("SELECT month FROM sales_archive_months ORDER BY month") or []
+        months = [row['month'] for row in rows]
+        if start is not None:
+            months = [m for m in months if m >= start.strftime("%Y-%m")]
+        if end is not None:
+            months = [m for m in months if datetime.strptime(m, "%Y-%m") < end]
+        return months
+
+    def closed_months(self, today=None):
+        """Months still in the hot table that are older than keep_months"""
+        cutoff = add_months(month_start(today or date.today()), 1 - self.keep_months)
+        rows = self.db.execute_query("""
+            SELECT DISTINCT strftime('%Y-%m', sale_date) AS month
+            FROM sales WHERE sale_date < ? ORDER BY month
+        """, (cutoff.strftime("%Y-%m-%d %H:%M:%S"),)) or []
+        return [row['month'] for row in rows]
+
+    def archive_closed_months(self, today=None):
+        """Move every closed month out of the hot table; returns the months archived"""
+        archived = []
+        for month in self.closed_months(today):
+            if self.archive_month(month):
+                archived.append(month)
+        return archived
+
+    def archive_month(self, month):
+        """Copy one month of sales into its compressed archive, then delete it from `sales`.
+
+        The archive is written and fsync'd before anything is deleted, and
+        rows are copied with INSERT OR IGNORE on the unique transaction ID,
+        so an interrupted run can simply be repeated. Sales that arrive late
+        for an already archived month are merged into the existing file.
+        """
+        conn = self.db.get_connection()
+        if conn is None:
+            return False
+
+        start = datetime.strptime(month, "%Y-%m")
+        bounds = (start.strftime("%Y-%m-%d %H:%M:%S"), add_months(start, 1).strftime("%Y-%m-%d %H:%M:%S"))
+        path = self.archive_path(month)
+        work_path = os.path.join(self.archive_dir, f"sales_{month}.db")
+
+        with self._lock:
+            try:
+                os.makedirs(self.archive_dir, exist_ok=True)
+                max_id = conn.execute(
+                    "SELECT MAX(id) FROM sales WHERE sale_date >= ? AND sale_date < ?", bounds
+                ).fetchone()[0]
+                if max_id is None:
+                    return False
+
+                if os.path.exists(path):
+                    self._decompress(path, work_path)
+                part = sqlite3.connect(work_path)
+                try:
+                    schema = conn.execute(
+                        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'sales'"
+                    ).fetchone()[0]
+                    part.execute(schema.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1))
+                    part.execute("CREATE INDEX IF NOT EXISTS idx_sales_date ON sales (sale_date)")
+                    self._add_missing_columns(conn, part)
+
+                    columns = [row[1] for row in conn.execute("PRAGMA table_info(sales)")]
+                    column_list = ", ".join(columns)
+                    rows = conn.execute(f"""
+                        SELECT {column_list} FROM sales
+                        WHERE sale_date >= ? AND sale_date < ? AND id <= ?
+                    """, bounds + (max_id,))
+                    part.executemany(
+                        f"INSERT OR IGNORE INTO sales ({column_list}) VALUES ({', '.join('?' * len(columns))})",
+                        rows
+                    )
+                    part.commit()
+                    summary = part.execute("SELECT COUNT(*), COALESCE(SUM(total_cents), 0) / 100.0 FROM sales").fetchone()
+                finally:
+                    part.close()
+
+                self._compress(work_path, path)
+                os.remove(work_path)
+                self._drop_cached(month)
+
+                with self.db.lock, conn:
+                    conn.execute("""
+                        INSERT OR REPLACE INTO sales_archive_months (month, path, row_count, total_sales, archived_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (month, path, summary[0], summary[1], datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                    conn.execute(
+                        "DELETE FROM sales WHERE sale_date >= ? AND sale_date < ? AND id <= ?",
+                        bounds + (max_id,)
+                    )
+                print(f"Archived sales for {month}: {summary[0]} rows -> {path}")
+                return True
+            except Exception as e:
+                print(f"Archive error for {month}: {e}")
+                if os.path.exists(work_path):
+                    os.remove(work_path)
+                return False
+
+    def _compress(self, source, target):
+        tmp_path = target + ".tmp"
+        with open(source, "rb") as src, open(tmp_path, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as dst:
+                shutil.copyfileobj(src, dst)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, target)
+
+    def _decompress(self, source, target):
+        tmp_path = target + ".tmp"
+        with gzip.open(source, "rb") as src, open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, target)
+
+    def _drop_cached(self, month):
+        cached = os.path.join(self.cache_dir, f"sales_{month}.db")
+        if os.path.exists(cached):
+            os.remove(cached)
+
+    def _partition_file(self, month):
+        """Decompressed, read-only copy of an archived month (kept in the cache dir)"""
+        cached = os.path.join(self.cache_dir, f"sales_{month}.db")
+        with self._lock:
+            if not os.path.exists(cached):
+                os.makedirs(self.cache_dir, exist_ok=True)
+                self._decompress(self.archive_path(month), cached)
+                os.chmod(cached, 0o444)
+        return cached
+
+    @staticmethod
+    def _legacy_value(column, default, available):
+        """SQL value of a column missing from an older archive: cents derived from the REAL amount, else the default"""
+        amount_column = SALES_CENTS_COLUMNS.get(column)
+        if amount_column in available:
+            return cents_sql(amount_column)
+        return default or 'NULL'
+
+    @staticmethod
+    def _add_missing_columns(conn, part):
+        """Bring a month file archived earlier up to the live sales schema before more rows go in"""
+        existing = {row[1] for row in part.execute("PRAGMA table_info(sales)")}
+        for _, name, declared, _, default, _ in conn.execute("PRAGMA table_info(sales)").fetchall():
+            if name in existing:
+                continue
+            part.execute(f"ALTER TABLE sales ADD COLUMN {name} {declared}" + (f" DEFAULT {default}" if default else ""))
+            if SALES_CENTS_COLUMNS.get(name) in existing:
+                part.execute(f"UPDATE sales SET {name} = {cents_sql(SALES_CENTS_COLUMNS[name])}")
+
+    def clear_cache(self):
+        """Remove decompressed partitions; they are recreated on demand"""
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def query(self, start, end, query, params=()):
+        """Run a report query over the sales in [start, end), wherever they are stored.
+
+        `query` refers to the sales rows as `{sales}`. It runs against the
+        hot table and the overlapping archived months, attached read-only at
+        most MAX_ATTACHED at a time, and the rows of every run are returned
+        together -- so aggregates must be re-combined by the caller (SUM and
+        COUNT per group can simply be summed again).
+        """
+        months = self.archived_months(start, end)
+        chunks = [months[i:i + MAX_ATTACHED] for i in range(0, len(months), MAX_ATTACHED)] or [[]]
+
+        results = []
+        for n, chunk in enumerate(chunks):
+            conn = sqlite3.connect(f"file:{self.db.db_path}?mode=ro", uri=True, timeout=self.db.timeout)
+            conn.row_factory = sqlite3.Row
+            try:
+                # name -> declared default, the value rows archived before a column existed are read with
+                columns = {row[1]: row[4] for row in conn.execute("PRAGMA table_info(sales)")}
+                schemas = []
+                for month in chunk:
+                    schema = "p_" + month.replace("-", "_")
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}",
+                                 (f"file:{os.path.abspath(self._partition_file(month))}?mode=ro",))
+                    schemas.append(schema)
+                # The hot table goes with the last chunk, so rows come back roughly oldest first
+                if n == len(chunks) - 1:
+                    schemas.append("main")
+
+                selects = []
+                for schema in schemas:
+                    source = f"{schema}.sales"
+                    available = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_info(sales)")}
+                    # Older archives may predate columns added to the sales table since (e.g. store_id)
+                    fields = ", ".join(c if c in available else f"{self._legacy_value(c, default, available)} AS {c}"
+                                       for c, default in columns.items())
+                    selects.append(f"SELECT {fields} FROM {source}")
+
+                union = "(" + " UNION ALL ".join(selects) + ")"
+                results.extend(dict(row) for row in conn.execute(query.format(sales=union), params))
+            except Exception as e:
+                print(f"Sales query error: {e}")
+                return None
+            finally:
+                conn.close()
+        return results
+
+    def has_sales(self):
+        """True if the hot table or the archive holds any sale"""
+        result = self.db.execute_query("""
+            SELECT EXISTS (SELECT 1 FROM sales) OR EXISTS (SELECT 1 FROM sales_archive_months) AS found
+        """)
+        return bool(result and result[0]['found'])
+
+    def start(self, interval_seconds=24 * 3600):
+        """Archive closed months in a background thread (once a day by default)"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, interval_seconds):
+        while not self._stop_event.is_set():
+            try:
+                self.archive_closed_months()
+            except Exception as e:
+                print(f"Sales archive error: {e}")
+            self._stop_event.wait(interval_seconds)
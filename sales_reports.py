@@ -0,0 +1,196 @@
+import pandas as pd
+from datetime import datetime, date, timedelta
+
+from downsampling import choose_granularity, downsample, MAX_POINTS
+from money import from_cents, to_cents
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# SQLite expression that truncates sale_date to the start of its bucket
+BUCKET_SQL = {
+    'hour': "strftime('%Y-%m-%d %H:00:00', sale_date)",
+    'day': "date(sale_date)",
+    'week': "date(sale_date, 'weekday 0', '-6 days')",
+    'month': "strftime('%Y-%m-01', sale_date)",
+}
+
+# pandas offsets for the same buckets (used for in-memory data)
+BUCKET_FREQ = {
+    'hour': 'h',
+    'day': 'D',
+    'week': 'W-MON',
+    'month': 'MS',
+}
+
+GRANULARITY_LABELS = {'hour': 'Hourly', 'day': 'Daily', 'week': 'Weekly', 'month': 'Monthly'}
+
+# Columns of the DataFrame returned by load_sales (amounts in integer cents, see money.py)
+SALES_COLUMNS = ['sale_date', 'date', 'product', 'category', 'quantity', 'price_cents', 'total_cents',
+                 'payment_method', 'store_id']
+
+
+def period_range(time_period, start_date=None, end_date=None, today=None):
+    """Map a report time period to a [start, end) pair of datetimes"""
+    today = today or date.today()
+    midnight = datetime.combine(today, datetime.min.time())
+    tomorrow = midnight + timedelta(days=1)
+    month_start = midnight.replace(day=1)
+
+    if time_period == "Today":
+        return midnight, tomorrow
+    if time_period == "Yesterday":
+        return midnight - timedelta(days=1), midnight
+    if time_period == "Last 7 Days":
+        return midnight - timedelta(days=6), tomorrow
+    if time_period == "This Month":
+        return month_start, tomorrow
+    if time_period == "Last Month":
+        return (month_start - timedelta(days=1)).replace(day=1), month_start
+    if time_period == "Custom Range" and start_date and end_date:
+        return (datetime.combine(start_date, datetime.min.time()),
+                datetime.combine(end_date, datetime.min.time()) + timedelta(days=1))
+    return midnight - timedelta(days=29), tomorrow
+
+
+def store_filter(store_ids, column="store_id"):
+    """SQL condition (with a leading AND) and params limiting sales to `store_ids`; nothing if None"""
+    if store_ids is None:
+        return "", ()
+    return f" AND {column} IN ({','.join('?' * len(store_ids))})", tuple(store_ids)
+
+
+def query_sales(db, start, end, query, params=(), archive=None):
+    """Run a query whose sales rows are written `{sales}`, through the archive router if given"""
+    if archive is None:
+        return db.execute_query(query.format(sales="sales"), params)
+    return archive.query(start, end, query, params)
+
+
+def has_sales(db, archive=None, store_ids=None):
+    """True once at least one sale has been recorded (at one of `store_ids`, if given)"""
+    if archive is not None and store_ids is None:
+        return archive.has_sales()
+    condition, params = store_filter(store_ids)
+    result = db.execute_query(f"SELECT EXISTS (SELECT 1 FROM sales WHERE 1 = 1{condition}) AS found", params)
+    if result and result[0]['found']:
+        return True
+    # Archived months are not split by store; any archive means there is history to report on
+    return archive is not None and archive.has_sales()
+
+
+def load_sales(db, start, end, archive=None, store_ids=None):
+    """Sales lines in [start, end) joined with product names, shaped for the reports page"""
+    condition, store_params = store_filter(store_ids, "s.store_id")
+    rows = query_sales(db, start, end, f"""
+        SELECT s.sale_date, date(s.sale_date) AS date, p.name AS product, p.category,
+               s.quantity, s.unit_price_cents AS price_cents, s.total_cents, s.payment_method, s.store_id
+        FROM {{sales}} s
+        LEFT JOIN products p ON p.id = s.product_id
+        WHERE s.sale_date >= ? AND s.sale_date < ?{condition}
+        ORDER BY s.sale_date
+    """, (start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)) + store_params, archive)
+    df = pd.DataFrame(rows or [], columns=SALES_COLUMNS)
+    if archive is not None:
+        df = df.sort_values('sale_date', kind='stable', ignore_index=True)
+    return df
+
+
+def _trend_cents(db, start, end, granularity, archive=None, store_ids=None):
+    """DataFrame[period, total_cents]: integer sales sums per bucket, straight from SQLite"""
+    condition, store_params = store_filter(store_ids)
+    rows = query_sales(db, start, end, f"""
+        SELECT {BUCKET_SQL[granularity]} AS period, SUM(total_cents) AS total_cents
+        FROM {{sales}}
+        WHERE sale_date >= ? AND sale_date < ?{condition}
+        GROUP BY period
+        ORDER BY period
+    """, (start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)) + store_params, archive)
+
+    df = pd.DataFrame(rows or [], columns=['period', 'total_cents'])
+    if archive is not None:
+        # Each partition run returns its own sums; a month may span the hot table and an archive
+        df = df.groupby('period', as_index=False)['total_cents'].sum()
+    return df
+
+
+def _trend_frame(cents, max_points):
+    """The chart frame (period, total in currency units) of integer bucket sums, downsampled"""
+    df = pd.DataFrame({'period': pd.to_datetime(cents['period']),
+                       'total': from_cents(cents['total_cents'].astype('int64'))})
+    return downsample(df, 'period', 'total', max_points)
+
+
+def sales_over_time(db, start, end, max_points=MAX_POINTS, archive=None, store_ids=None):
+    """Sales totals over [start, end) bucketed in SQLite at an automatic granularity.
+
+    The bucket size is chosen from the range length so at most max_points
+    rows come back, whatever the range; LTTB is applied on top as a guard.
+    Sums are taken in integer cents. Returns (DataFrame[period, total], granularity).
+    """
+    granularity = choose_granularity(start, end, max_points)
+    cents = _trend_cents(db, start, end, granularity, archive, store_ids)
+    return _trend_frame(cents, max_points), granularity
+
+
+def consolidated_sales(stores, store_ids, start, end, archive=None, max_points=MAX_POINTS):
+    """load_sales and sales_over_time across several stores, merged.
+
+    Each database holding some of the stores is queried once, all of
+    them in parallel (see StoreDirectory.map); the archive only belongs
+    to the main database. Returns (sales DataFrame, (trend, granularity)).
+    """
+    granularity = choose_granularity(start, end, max_points)
+
+    def run(db, ids):
+        part_archive = archive if archive is not None and archive.db.db_path == db.db_path else None
+        return (load_sales(db, start, end, archive=part_archive, store_ids=ids),
+                _trend_cents(db, start, end, granularity, archive=part_archive, store_ids=ids))
+
+    parts = stores.map(run, store_ids)
+    if not parts:
+        return (pd.DataFrame(columns=SALES_COLUMNS),
+                (_trend_frame(pd.DataFrame(columns=['period', 'total_cents']), max_points), granularity))
+
+    df = pd.concat([sales for sales, _ in parts], ignore_index=True)
+    df = df.sort_values('sale_date', kind='stable', ignore_index=True)
+    # Bucket sums are merged as integers before anything is converted or downsampled
+    trend = pd.concat([trend for _, trend in parts], ignore_index=True)
+    trend = trend.groupby('period', as_index=False)['total_cents'].sum()
+    return df, (_trend_frame(trend, max_points), granularity)
+
+
+def resample_sales(df, time_col, cents_col, start, end, max_points=MAX_POINTS):
+    """In-memory equivalent of sales_over_time for an already loaded DataFrame (amounts in integer cents)"""
+    granularity = choose_granularity(start, end, max_points)
+    series = (df.assign(period=pd.to_datetime(df[time_col]))
+                .set_index('period')[cents_col]
+                .resample(BUCKET_FREQ[granularity], label='left', closed='left').sum())
+    out = series.reset_index().rename(columns={cents_col: 'total_cents'})
+    return _trend_frame(out, max_points), granularity
+
+
+def load_sales_snapshot(snapshot, products, start, end):
+    """load_sales from the Parquet analytics snapshot instead of the live database.
+
+    Only the columns the reports use are read, and only the monthly
+    partitions in range; product names come from the in-memory catalogue.
+    Returns None when there is no usable snapshot.
+    """
+    df = snapshot.read('sales', columns=['sale_date', 'product_id', 'quantity', 'unit_price',
+                                         'total_price', 'payment_method'], start=start, end=end)
+    if df is None:
+        return None
+
+    catalogue = {p['id']: p for p in products}
+    df = df.sort_values('sale_date', kind='stable', ignore_index=True)
+    return pd.DataFrame({
+        'sale_date': df['sale_date'].dt.strftime(TIMESTAMP_FORMAT),
+        'date': df['sale_date'].dt.strftime('%Y-%m-%d'),
+        'product': df['product_id'].map(lambda i: catalogue.get(i, {}).get('name')),
+        'category': df['product_id'].map(lambda i: catalogue.get(i, {}).get('category')),
+        'quantity': df['quantity'],
+        # The snapshot keeps the REAL columns; they hold whole cents, so this conversion is exact
+        'price_cents': to_cents(df['unit_price']),
+        'total_cents': to_cents(df['total_price']),
+        'payment_method': df['payment_method'],
+    })
@@ -0,0 +1,169 @@
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _token_key(token):
+    """Sessions are stored under a hash of their token, so the table alone cannot be replayed"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class SessionStore:
+    """Server-side login sessions in SQLite with an in-memory LRU in front.
+
+    Each session holds the user, role and a sliding expiry of
+    `timeout_minutes`. Lookups are served from the LRU; an entry is
+    re-read from the database once it is older than `revalidate_seconds`,
+    so a logout or single-session eviction on another app replica is seen
+    within that delay. Sliding the expiry is written back at most every
+    `touch_seconds`, so reruns do not turn into writes.
+    """
+
+    def __init__(self, db, timeout_minutes=30, single_session=True, capacity=1024,
+                 revalidate_seconds=30, touch_seconds=60):
+        self.db = db
+        self.timeout_minutes = timeout_minutes
+        self.single_session = single_session
+        self.capacity = capacity
+        self.revalidate_seconds = revalidate_seconds
+        self.touch_seconds = touch_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()   # token hash -> session dict
+
+    def configure(self, timeout_minutes=None, single_session=None):
+        """Apply the Security settings; the new timeout counts from each session's last activity"""
+        with self._lock:
+            if timeout_minutes is not None:
+                self.timeout_minutes = timeout_minutes
+            if single_session is not None:
+                self.single_session = single_session
+            for session in self._cache.values():
+                session['expires_at'] = session['last_seen'] + timedelta(minutes=self.timeout_minutes)
+
+    def create(self, user_id, username, role):
+        """Start a session for a freshly authenticated user; returns its token (None on failure)"""
+        token = secrets.token_urlsafe(32)
+        now = datetime.now()
+        session = {
+            'key': _token_key(token),
+            'user_id': user_id,
+            'username': username,
+            'role': role,
+            'last_seen': now,
+            'expires_at': now + timedelta(minutes=self.timeout_minutes),
+            'touched_at': now,
+            'checked_at': now
+        }
+
+        if self.single_session:
+            # Logging in elsewhere ends the user's other sessions
+            self.revoke_user(username)
+        self.purge_expired()
+        saved = self.db.execute_query("""
+            INSERT INTO sessions (token_hash, user_id, username, role, created_at, last_seen, expires_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (session['key'], user_id, username, role, now.strftime(TIMESTAMP_FORMAT),
+              now.strftime(TIMESTAMP_FORMAT), session['expires_at'].strftime(TIMESTAMP_FORMAT)))
+        if not saved:
+            return None
+
+        self._remember(session)
+        return token
+
+    def get(self, token):
+        """The live session for `token` (sliding its expiry), or None if unknown, expired or revoked"""
+        if not token:
+            return None
+        key = _token_key(token)
+        now = datetime.now()
+
+        with self._lock:
+            session = self._cache.get(key)
+            if session is not None and (now - session['checked_at']).total_seconds() < self.revalidate_seconds:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            else:
+                session = None
+                self.misses += 1
+
+        if session is None:
+            session = self._load(key, now)
+            if session is None:
+                return None
+
+        if now >= session['expires_at']:
+            self.revoke(token)
+            return None
+
+        session['last_seen'] = now
+        session['expires_at'] = now + timedelta(minutes=self.timeout_minutes)
+        if (now - session['touched_at']).total_seconds() >= self.touch_seconds:
+            session['touched_at'] = now
+            self.db.execute_query("UPDATE sessions SET last_seen = ?, expires_at = ? WHERE token_hash = ?",
+                                  (now.strftime(TIMESTAMP_FORMAT),
+                                   session['expires_at'].strftime(TIMESTAMP_FORMAT), key))
+        return session
+
+    def _load(self, key, now):
+        rows = self.db.execute_query("""
+            SELECT user_id, username, role, last_seen, expires_at FROM sessions WHERE token_hash = ?
+        """, (key,))
+        if not rows:
+            with self._lock:
+                self._cache.pop(key, None)
+            return None
+
+        row = rows[0]
+        last_seen = datetime.strptime(row['last_seen'], TIMESTAMP_FORMAT)
+        session = {
+            'key': key,
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'role': row['role'],
+            'last_seen': last_seen,
+            # Another replica may have slid the expiry; the current timeout applies from last activity
+            'expires_at': max(datetime.strptime(row['expires_at'], TIMESTAMP_FORMAT),
+                              last_seen + timedelta(minutes=self.timeout_minutes)),
+            'touched_at': last_seen,
+            'checked_at': now
+        }
+        self._remember(session)
+        return session
+
+    def _remember(self, session):
+        with self._lock:
+            self._cache[session['key']] = session
+            self._cache.move_to_end(session['key'])
+            while len(self._cache) > self.capacity:
+                self._cache.popitem(last=False)
+
+    def revoke(self, token):
+        """End one session (logout)"""
+        key = _token_key(token)
+        with self._lock:
+            self._cache.pop(key, None)
+        return self.db.execute_query("DELETE FROM sessions WHERE token_hash = ?", (key,))
+
+    def revoke_user(self, username):
+        """End every session of a user (single-session logins, deactivated accounts)"""
+        with self._lock:
+            for key in [k for k, s in self._cache.items() if s['username'] == username]:
+                del self._cache[key]
+        return self.db.execute_query("DELETE FROM sessions WHERE username = ?", (username,))
+
+    def purge_expired(self):
+        """Delete sessions past their expiry"""
+        return self.db.execute_query("DELETE FROM sessions WHERE expires_at <= ?",
+                                     (datetime.now().strftime(TIMESTAMP_FORMAT),))
+
+    def active_sessions(self):
+        rows = self.db.execute_query("SELECT COUNT(*) AS n FROM sessions WHERE expires_at > ?",
+                                     (datetime.now().strftime(TIMESTAMP_FORMAT),))
+        return rows[0]['n'] if rows else 0
@@ -0,0 +1,205 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+# Setting -> (type, default). Values are stored as JSON in app_settings; anything
+# missing or unreadable falls back to the default here.
+SETTINGS = {
+    # Business profile
+    'business_name': (str, "Salphine Chemos Getaway Resort"),
+    'tax_id': (str, "P123456789"),
+    'currency': (str, "KES"),
+    'tax_rate': (float, 16.0),
+    'tax_rounding': (str, "Per invoice"),
+    'address': (str, "P.O. Box 19938 - 00202 KNH Nairobi"),
+    'phone1': (str, "+254 727 680 468"),
+    'phone2': (str, "+254 736 880 488"),
+    'email': (str, "info@lukenyagetaway.com"),
+    'website': (str, "www.salphinechemos.com"),
+    # Receipt template
+    'receipt_header_size': (int, 16),
+    'receipt_show_logo': (bool, True),
+    'receipt_show_footer': (bool, True),
+    'receipt_footer': (str, "Thank you for your business!"),
+    'receipt_style': (str, "Modern"),
+    # Notifications
+    'email_notifications': (bool, False),
+    'low_stock_email': (bool, True),
+    'sales_report_email': (bool, True),
+    'system_alerts': (bool, True),
+    'email_frequency': (str, "Real-time"),
+    'email_recipients': (str, "admin@system.com, manager@system.com"),
+    'inapp_notifications': (bool, True),
+    'show_sales_popup': (bool, True),
+    'show_stock_alerts': (bool, True),
+    'show_system_messages': (bool, True),
+    'notification_sound': (bool, True),
+    'sound_type': (str, "Default"),
+    # System preferences
+    'default_view': (str, "Sales Overview"),
+    'auto_logout': (bool, True),
+    'logout_minutes': (int, 30),
+    'data_retention_days': (int, 365),
+    'backup_frequency': (str, "Daily"),
+    'theme': (str, "Light"),
+    'language': (str, "English"),
+    'date_format': (str, "YYYY-MM-DD"),
+    'decimal_places': (int, 2),
+    'number_format': (str, "1,000.00"),
+    # Password policy
+    'password_min_length': (int, 8),
+    'password_require_upper': (bool, True),
+    'password_require_lower': (bool, True),
+    'password_require_digit': (bool, True),
+    'password_require_special': (bool, True),
+    'password_expiry_days': (int, 90),
+    'max_login_attempts': (int, 3),
+    'lockout_minutes': (int, 15),
+    # Security features
+    'two_factor': (bool, False),
+    'two_factor_method': (str, "SMS"),
+    'require_2fa_admins': (bool, True),
+    'require_2fa_all': (bool, False),
+    'biometric_auth': (bool, False),
+    'single_session': (bool, True),
+    'session_timeout_minutes': (int, 30),
+    'secure_cookies': (bool, True),
+    'http_only': (bool, True),
+    'data_encryption': (bool, True),
+    'encryption_level': (str, "AES-128"),
+    'backup_encryption': (bool, True),
+    'mask_sensitive': (bool, True),
+    'mask_fields': (list, []),
+    'auto_logout_sensitive': (bool, True),
+    'intrusion_detection': (bool, True),
+    'alert_on_many_failures': (bool, True),
+    'monitor_privileged': (bool, True),
+    'log_all_access': (bool, True),
+}
+
+DEFAULTS = {key: default for key, (_, default) in SETTINGS.items()}
+
+SettingsSnapshot = namedtuple('SettingsSnapshot', ['version', 'values', 'checked_at'])
+
+
+def coerce(key, value):
+    """`value` as the declared type of setting `key` (ValueError/TypeError if it cannot be)"""
+    kind = SETTINGS[key][0]
+    if kind is bool and isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    if kind is list:
+        return list(value)
+    return kind(value)
+
+
+class SettingsService:
+    """Typed application settings from the app_settings table, cached in process as one immutable snapshot.
+
+    Reads (`get`, `values`) are dictionary lookups on the snapshot with no
+    query; the table's data version is compared at most every
+    `revalidate_seconds`, so changes saved by another app process show
+    up within that delay. `update` writes all changed keys in a single
+    transaction and refreshes at once. Listeners added with `subscribe`
+    are called with the new values whenever the snapshot changes, so
+    process-wide components (session store, login limiter, alerts) can
+    apply them.
+    """
+
+    def __init__(self, db, revalidate_seconds=10):
+        self.db = db
+        self.revalidate_seconds = revalidate_seconds
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._current().version
+
+    def _current(self):
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.checked_at >= self.revalidate_seconds:
+            snapshot = self.refresh()
+        return snapshot
+
+    def get(self, key):
+        return self._current().values[key]
+
+    def values(self):
+        """All settings as a read-only mapping"""
+        return self._current().values
+
+    def refresh(self, force=False):
+        """Reload the snapshot if app_settings changed (or always, with force)"""
+        with self._lock:
+            current = self._snapshot
+            version = self.db.get_data_version('app_settings')
+            if current is not None and (version is None or (version == current.version and not force)):
+                # Unchanged, or the database is unreachable: keep serving the last good snapshot
+                self._snapshot = current._replace(checked_at=time.monotonic())
+                return self._snapshot
+
+            values = dict(DEFAULTS)
+            for row in (self.db.execute_query("SELECT key, value FROM app_settings") if version else None) or []:
+                if row['key'] not in SETTINGS:
+                    continue
+                try:
+                    values[row['key']] = coerce(row['key'], json.loads(row['value']))
+                except (ValueError, TypeError) as e:
+                    print(f"Ignoring unreadable setting {row['key']}: {e}")
+
+            self._snapshot = SettingsSnapshot(version, MappingProxyType(values), time.monotonic())
+            changed = current is None or current.values != self._snapshot.values
+        if changed:
+            self._notify(self._snapshot.values)
+        return self._snapshot
+
+    def update(self, changes, user=None):
+        """Validate and save `changes` ({key: value}) atomically; returns the keys that changed, or None on failure"""
+        try:
+            changes = {key: coerce(key, value) for key, value in changes.items()}
+        except KeyError as e:
+            print(f"Unknown setting: {e}")
+            return None
+        except (ValueError, TypeError) as e:
+            print(f"Invalid setting value: {e}")
+            return None
+
+        current = self.values()
+        changed = {key: value for key, value in changes.items() if current[key] != value}
+        if not changed:
+            return []
+
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+        try:
+            with self.db.lock, conn:
+                conn.executemany("""
+                    INSERT INTO app_settings (key, value, updated_at, updated_by)
+                    VALUES (?, ?, CURRENT_TIMESTAMP, ?)
+                    ON CONFLICT (key) DO UPDATE SET
+                        value = excluded.value, updated_at = excluded.updated_at, updated_by = excluded.updated_by
+                """, [(key, json.dumps(value), user) for key, value in changed.items()])
+        except sqlite3.Error as e:
+            print(f"Error saving settings: {e}")
+            return None
+
+        self.refresh(force=True)
+        return sorted(changed)
+
+    def subscribe(self, listener):
+        """Call `listener(values)` now and after every change"""
+        self._listeners.append(listener)
+        listener(self._snapshot.values)
+
+    def _notify(self, values):
+        for listener in self._listeners:
+            try:
+                listener(values)
+            except Exception as e:
+                print(f"Settings listener error: {e}")
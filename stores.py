@@ -0,0 +1,170 @@
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+from settings_service import DEFAULTS
+
+# Every product, sale and user belonged to this store before stores existed
+DEFAULT_STORE_ID = 1
+
+STORE_COLUMNS = "id, code, name, address, phone, email, db_path, is_active"
+
+# version: data version of the stores table; stores: store_id -> store dict (ordered by id)
+StoreSnapshot = namedtuple('StoreSnapshot', ['version', 'stores', 'checked_at'])
+
+
+def business_details(store, settings):
+    """Name, contacts and footer printed on a store's receipts: the business profile, with the store's own
+    address, phone and email where it has them"""
+    store = store or {}
+    return {
+        'business_name': settings['business_name'],
+        'store_name': store.get('name'),
+        'address': store.get('address') or settings['address'],
+        'phones': [p for p in ([store['phone']] if store.get('phone') else [settings['phone1'], settings['phone2']]) if p],
+        'email': store.get('email') or settings['email'],
+        'website': settings['website'],
+        'footer': settings['receipt_footer'] if settings['receipt_show_footer'] else None,
+    }
+
+
+def receipt_business(receipt_data):
+    """Business details of a receipt (sales queued before they were attached get the default profile)"""
+    return receipt_data.get('business') or business_details(None, DEFAULTS)
+
+
+class StoreDirectory:
+    """The stores (outlets) from the stores table, and the database each one keeps its data in.
+
+    Stores are held as an immutable snapshot revalidated by data version
+    every `revalidate_seconds`, like role permissions. A store without a
+    db_path keeps its products and sales in the main database, told apart
+    by store_id; a store with a db_path has its own SQLite file, and so
+    its own connection and write lock: a busy outlet does not make the
+    others wait. `database` is the store-aware factory (one connection per
+    file, opened on first use) and `map` runs a query once per database
+    in parallel for consolidated reports.
+    """
+
+    def __init__(self, db, connect, revalidate_seconds=30, workers=4):
+        self.db = db
+        self.connect = connect   # db_path -> Database
+        self.revalidate_seconds = revalidate_seconds
+        self._lock = threading.Lock()
+        self._databases = {}     # db_path -> Database
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stores")
+        self._snapshot = None
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._current().version
+
+    def _current(self):
+        snapshot = self._snapshot
+        if time.monotonic() - snapshot.checked_at >= self.revalidate_seconds:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self, force=False):
+        """Reload the snapshot if the stores table changed (or always, with force)"""
+        current = self._snapshot
+        version = self.db.get_data_version('stores')
+        if current is not None and (version is None or (version == current.version and not force)):
+            # Unchanged, or the database is unreachable: keep serving the last good snapshot
+            self._snapshot = current._replace(checked_at=time.monotonic())
+            return self._snapshot
+
+        rows = (self.db.execute_query(f"SELECT {STORE_COLUMNS} FROM stores ORDER BY id") if version else None) or []
+        stores = {row['id']: MappingProxyType(row) for row in rows}
+        self._snapshot = StoreSnapshot(version, MappingProxyType(stores), time.monotonic())
+        return self._snapshot
+
+    def get(self, store_id):
+        """The store with this id (a read-only dict), or None"""
+        return self._current().stores.get(store_id)
+
+    def stores(self, active_only=True):
+        return [store for store in self._current().stores.values() if store['is_active'] or not active_only]
+
+    def db_path(self, store_id):
+        """The store's own database file, or None if it lives in the main database"""
+        store = self.get(store_id)
+        return store['db_path'] if store else None
+
+    def database(self, store_id):
+        """Shared connection to the database holding this store's products and sales"""
+        path = self.db_path(store_id)
+        if not path:
+            return self.db
+        with self._lock:
+            db = self._databases.get(path)
+            if db is None:
+                db = self._databases[path] = self.connect(path)
+                db.create_tables(store_id, seed_demo=False)
+            return db
+
+    def partitions(self, store_ids):
+        """[(database, store ids kept in it)] -- one entry per database"""
+        groups = {}
+        for store_id in store_ids:
+            groups.setdefault(self.db_path(store_id), []).append(store_id)
+        return [(self.database(ids[0]), ids) for ids in groups.values()]
+
+    def map(self, func, store_ids):
+        """Call func(db, store_ids) for every database holding some of the stores, in parallel.
+
+        Returns the results in partition order; a partition whose query
+        raised is reported and left out.
+        """
+        futures = [self._executor.submit(func, db, ids) for db, ids in self.partitions(store_ids)]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                print(f"Store query error: {e}")
+        return results
+
+    def add_store(self, code, name, address=None, phone=None, email=None, db_path=None, seed_demo=False):
+        """Create a store (with the demo catalogue and its opening stock if seed_demo); returns its id, or None"""
+        conn = self.db.get_connection()
+        if conn is None:
+            return None
+        try:
+            with self.db.lock, conn:
+                cursor = conn.execute("""
+                    INSERT INTO stores (code, name, address, phone, email, db_path)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (code, name, address, phone, email, db_path or None))
+        except sqlite3.Error as e:
+            print(f"Error adding store {code}: {e}")
+            return None
+
+        store_id = cursor.lastrowid
+        self.refresh(force=True)
+        # A separate file gets its schema from create_tables when first opened
+        db = self.database(store_id)
+        if seed_demo:
+            db.seed_sample_products(store_id)
+        return store_id
+
+    def update_store(self, store_id, name=None, address=None, phone=None, email=None, is_active=None):
+        """Change the given fields of a store; the default store cannot be deactivated. Returns True on success"""
+        if store_id == DEFAULT_STORE_ID and is_active is False:
+            print("The default store cannot be deactivated")
+            return False
+        changes = {'name': name, 'address': address, 'phone': phone, 'email': email,
+                   'is_active': None if is_active is None else (1 if is_active else 0)}
+        changes = {column: value for column, value in changes.items() if value is not None}
+        if not changes:
+            return True
+        assignments = ", ".join(f"{column} = ?" for column in changes)
+        if not self.db.execute_query(f"UPDATE stores SET {assignments} WHERE id = ?",
+                                     list(changes.values()) + [store_id]):
+            return False
+        self.refresh(force=True)
+        return True
@@ -0,0 +1,44 @@
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pricing import Rule, compile_rules, evaluate
+
+NOW = datetime(2026, 6, 15, 12, 0, 0)
+DEFAULT = 1600  # 16% in basis points
+
+CART = [{'id': 1, 'category': 'Food', 'price_cents': 10000, 'quantity': 1}]
+
+
+def tax_rule(rule_id, basis_points, starts=None, ends=None):
+    return Rule(rule_id, f"VAT {rule_id}", 'tax', 'Food', (), basis_points, 1, 0, starts, ends)
+
+
+def line_rate(rules, now=NOW):
+    return evaluate(compile_rules(rules), CART, DEFAULT, now=now).lines[0].basis_points
+
+
+def test_future_tax_rule_does_not_apply_yet():
+    assert line_rate([tax_rule(1, 800, starts=datetime(2030, 1, 1))]) == DEFAULT
+
+
+def test_expired_tax_rule_no_longer_applies():
+    assert line_rate([tax_rule(1, 800, starts=datetime(2025, 1, 1), ends=datetime(2026, 1, 1))]) == DEFAULT
+
+
+def test_live_tax_rule_applies_within_its_window():
+    rule = tax_rule(1, 800, starts=datetime(2026, 6, 1), ends=datetime(2026, 7, 1))
+    assert line_rate([rule]) == 800
+    assert line_rate([rule], now=datetime(2026, 7, 1)) == DEFAULT
+
+
+def test_live_rule_is_chosen_among_time_boxed_ones():
+    rules = [
+        tax_rule(1, 0),
+        tax_rule(2, 800, starts=datetime(2025, 1, 1), ends=datetime(2026, 1, 1)),
+        tax_rule(3, 1200, starts=datetime(2030, 1, 1)),
+    ]
+    assert line_rate(rules) == 0
+    assert line_rate(rules, now=datetime(2030, 2, 1)) == 1200
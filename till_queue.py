@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import metrics
+
+
+class TillQueue:
+    """Append-only, fsync'd JSON-lines file of sales waiting for the main database.
+
+    Entries are never rewritten in place: the number of bytes already synced
+    is kept in a small sidecar file (`<path>.offset`, replaced atomically),
+    and the queue is truncated once everything in it has been synced.
+    """
+
+    def __init__(self, path="till_queue.jsonl"):
+        self.path = path
+        self.offset_path = path + ".offset"
+        self.failed_path = path + ".failed"
+        self._lock = threading.Lock()
+
+    def append(self, receipt_data, user_id=None):
+        """Durably record a sale; returns once it is on disk"""
+        entry = {
+            'transaction_id': receipt_data['transaction_id'],
+            'receipt': receipt_data,
+            'user_id': user_id,
+            'queued_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._drop_torn_tail()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _drop_torn_tail(self):
+        """Cut a partial last line left by a crash mid-append (that sale was never acknowledged); call with the lock held"""
+        try:
+            with open(self.path, "r+b") as f:
+                end = f.seek(0, os.SEEK_END)
+                position = end
+                while position > 0:
+                    start = max(0, position - 4096)
+                    f.seek(start)
+                    newline = f.read(position - start).rfind(b"\n")
+                    if newline >= 0:
+                        position = start + newline + 1
+                        break
+                    position = start
+                if position < end:
+                    print(f"Till queue: dropping {end - position} bytes of a torn write")
+                    f.truncate(position)
+                    f.flush()
+                    os.fsync(f.fileno())
+        except FileNotFoundError:
+            pass
+
+    def _read_offset(self):
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset):
+        tmp_path = self.offset_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.offset_path)
+
+    def pending(self, limit=None):
+        """Return [(end_offset, entry)] for unsynced entries, oldest first.
+
+        Lines that are not valid JSON are moved to the dead-letter file
+        instead of blocking the queue.
+        """
+        entries = []
+        with self._lock:
+            if not os.path.exists(self.path):
+                return entries
+            self._drop_torn_tail()
+            offset = self._read_offset()
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    try:
+                        entry = json.loads(raw)
+                    except ValueError as e:
+                        if entries:
+                            break  # set aside on the next call, once the entries before it are synced
+                        offset += len(raw)
+                        self.dead_letter({'raw': raw.decode("utf-8", "replace").rstrip("\n")}, e)
+                        self._write_offset(offset)
+                        continue
+                    offset += len(raw)
+                    entries.append((offset, entry))
+                    if limit and len(entries) >= limit:
+                        break
+        return entries
+
+    def has_pending(self):
+        with self._lock:
+            return os.path.exists(self.path) and os.path.getsize(self.path) > self._read_offset()
+
+    def mark_synced(self, end_offset):
+        """Record that everything up to `end_offset` reached the main database"""
+        with self._lock:
+            if end_offset >= os.path.getsize(self.path):
+                # Fully drained: start a fresh file instead of growing forever
+                os.remove(self.path)
+                if os.path.exists(self.offset_path):
+                    os.remove(self.offset_path)
+            else:
+                self._write_offset(end_offset)
+
+    def dead_letter(self, entry, error):
+        """Set aside an entry that can never be written (e.g. unknown product)"""
+        entry = dict(entry, error=str(error))
+        with open(self.failed_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class OfflineTill:
+    """Checkout front-end that falls back to a local queue when the main DB is unavailable.
+
+    Sales go straight to the checkout pipeline when the database answers
+    within `busy_timeout`; otherwise (or while older queued sales are still
+    waiting, to keep ordering) they are appended to the till queue. `sync`
+    replays the queue in batches; replay is idempotent because the pipeline
+    skips transaction IDs that are already in `sales`.
+    """
+
+    def __init__(self, pipeline, queue, batch_size=50, busy_timeout=0.5):
+        self.pipeline = pipeline
+        self.queue = queue
+        self.batch_size = batch_size
+        self.pipeline.db.set_timeout(busy_timeout)
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def checkout(self, receipt_data, user_id=None):
+        """Commit or queue a sale; returns 'committed' or 'queued'"""
+        start = time.perf_counter()
+        if not self.queue.has_pending():
+            try:
+                self.pipeline.write_sales([(receipt_data, user_id)])
+                metrics.record_sale('committed', time.perf_counter() - start)
+                return 'committed'
+            except sqlite3.OperationalError as e:
+                # Locked, unreachable or read-only storage: take the sale offline
+                print(f"Main database unavailable, queueing sale: {e}")
+
+        self.queue.append(receipt_data, user_id)
+        metrics.record_sale('queued', time.perf_counter() - start)
+        return 'queued'
+
+    def sync(self):
+        """Replay queued sales in batches; returns how many entries were synced"""
+        synced = 0
+        while True:
+            try:
+                batch = self.queue.pending(limit=self.batch_size)
+            except OSError as e:
+                print(f"Till sync postponed, queue unreadable: {e}")
+                return synced
+            if not batch:
+                return synced
+
+            try:
+                self.pipeline.write_sales([(e['receipt'], e['user_id']) for _, e in batch])
+            except sqlite3.OperationalError as e:
+                print(f"Till sync postponed: {e}")
+                return synced
+            except Exception:
+                # A bad entry poisons the batch; fall back to one-by-one to isolate it
+                for end_offset, entry in batch:
+                    try:
+                        self.pipeline.write_sales([(entry['receipt'], entry['user_id'])])
+                    except sqlite3.OperationalError as e:
+                        print(f"Till sync postponed: {e}")
+                        return synced
+                    except Exception as e:
+                        print(f"Till sync dropped {entry['transaction_id']}: {e}")
+                        self.queue.dead_letter(entry, e)
+                    self.queue.mark_synced(end_offset)
+                    synced += 1
+                continue
+
+            self.queue.mark_synced(batch[-1][0])
+            synced += len(batch)
+
+    def start(self, interval_seconds=15):
+        """Sync in a background thread whenever the main database is reachable"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval_seconds,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self, interval_seconds):
+        while not self._stop_event.is_set():
+            try:
+                if self.queue.has_pending():
+                    self.sync()
+            except Exception as e:
+                print(f"Till sync error: {e}")
+            self._stop_event.wait(interval_seconds)
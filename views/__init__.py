@@ -0,0 +1,84 @@
+import cProfile
+import importlib
+import os
+
+from instrumentation import timed
+
+# Page name -> module that renders it. Modules are imported on the first visit
+# to their page only; each registers itself with @register when imported.
+PAGE_MODULES = {
+    "Login": "views.login",
+    "Dashboard": "views.dashboard",
+    "Sales Processing": "views.sales",
+    "Inventory": "views.inventory",
+    "Reports": "views.reports",
+    "User Management": "views.users",
+    "Settings": "views.settings",
+    "Security": "views.security",
+    "Logout": "views.logout",
+}
+
+# Page name -> permission needed to open it (see permissions.py); pages not listed are open to any signed-in user.
+# Kept here rather than on @register so the navigation can hide pages without importing them.
+PAGE_PERMISSIONS = {
+    "Sales Processing": "process_sales",
+    "Inventory": "view_inventory",
+    "Reports": "view_reports",
+    "User Management": "manage_users",
+    "Settings": "manage_settings",
+    "Security": "manage_settings",
+}
+
+# Page name -> (render function, data dependencies)
+_registry = {}
+
+
+def register(name, data=()):
+    """Register a page's render function and the data it needs (keys of resources.DATA_LOADERS)"""
+    def decorator(render):
+        _registry[name] = (render, tuple(data))
+        return render
+    return decorator
+
+
+def can_open(name):
+    """True if the signed-in user may open the page"""
+    from resources import has_permission
+
+    permission = PAGE_PERMISSIONS.get(name)
+    return permission is None or has_permission(permission)
+
+
+def get_page(name):
+    """Return (render, data) for a page, importing its module on first use"""
+    if name not in _registry:
+        importlib.import_module(PAGE_MODULES[name])
+    return _registry[name]
+
+
+def render_page(name):
+    """Check the page's permission, prefetch its data dependencies and render it.
+
+    With PAGE_PROFILE_DIR set, every render is run under cProfile and the
+    stats are written to `<dir>/<page module>.prof` (latest render wins).
+    """
+    from resources import authorize, prefetch
+
+    permission = PAGE_PERMISSIONS.get(name)
+    if permission and not authorize(permission):
+        return
+    render, data = get_page(name)
+    profile_dir = os.environ.get("PAGE_PROFILE_DIR")
+    profiler = cProfile.Profile() if profile_dir else None
+
+    if profiler:
+        profiler.enable()
+    try:
+        with timed('page', name):
+            prefetch(data)
+            render()
+    finally:
+        if profiler:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            profiler.dump_stats(os.path.join(profile_dir, PAGE_MODULES[name].split(".")[-1] + ".prof"))
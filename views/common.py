@@ -0,0 +1,64 @@
+import pandas as pd
+import streamlit as st
+from resources import get_audit_log
+
+AUDIT_COLUMNS = {
+    'created_at': 'Timestamp',
+    'user': 'User',
+    'event': 'Event',
+    'status': 'Status',
+    'details': 'Details',
+    'ip_address': 'IP Address'
+}
+
+# QuickSort Algorithm Implementation
+def quicksort_products(products, key='name'):
+    """QuickSort algorithm for product sorting"""
+    if len(products) <= 1:
+        return products
+    else:
+        pivot = products[len(products)//2][key]
+        left = [x for x in products if x[key] < pivot]
+        middle = [x for x in products if x[key] == pivot]
+        right = [x for x in products if x[key] > pivot]
+        return quicksort_products(left, key) + middle + quicksort_products(right, key)
+
+def option_index(options, value):
+    """Index of `value` in a selectbox's options (0 if it is not one of them)"""
+    return options.index(value) if value in options else 0
+
+def audit_frame(entries):
+    """Audit entries as a DataFrame with display column names"""
+    return pd.DataFrame(entries, columns=list(AUDIT_COLUMNS)).rename(columns=AUDIT_COLUMNS)
+
+def show_audit_page(key, users=None, events=None, statuses=None, page_size=50):
+    """Show one newest-first page of audit entries with Newer/Older buttons; returns the page as a DataFrame"""
+    # Keyset paging: the (created_at, id) cursor of every page visited so far, reset when the filters change
+    filters = (tuple(users or ()), tuple(events or ()), tuple(statuses or ()))
+    paging = st.session_state.get(key)
+    if not paging or paging['filters'] != filters:
+        paging = st.session_state[key] = {'filters': filters, 'cursors': [None]}
+    
+    rows = get_audit_log().query(users, events, statuses, limit=page_size + 1, before=paging['cursors'][-1])
+    has_older = len(rows) > page_size
+    rows = rows[:page_size]
+    
+    df = audit_frame(rows)
+    if df.empty:
+        st.info("No audit entries match these filters.")
+    else:
+        st.dataframe(df, width='stretch', hide_index=True)
+    
+    col_newer, col_page, col_older = st.columns([1, 2, 1])
+    with col_newer:
+        if st.button("⬅️ Newer", key=f"{key}_newer", disabled=len(paging['cursors']) == 1):
+            paging['cursors'].pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(paging['cursors'])} · {page_size} entries per page")
+    with col_older:
+        if st.button("Older ➡️", key=f"{key}_older", disabled=not has_older):
+            paging['cursors'].append((rows[-1]['created_at'], rows[-1]['id']))
+            st.rerun()
+    
+    return df
@@ -0,0 +1,119 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from money import format_cents, from_cents
+from resources import get_alert_engine, get_figure_cache, store_db_path
+from views import register
+
+# MODULE 2: Dashboard
+@register("Dashboard", data=("products", "stock_alerts"))
+def show_dashboard():
+    st.markdown("<h1 class='main-header'>📊 Dashboard Overview</h1>", unsafe_allow_html=True)
+    
+    products = st.session_state.products_data
+    
+    # Alerts were re-evaluated incrementally by the 'stock_alerts' prefetch; stores sharing a
+    # database share its engine, so only this store's products are counted
+    alert_engine = get_alert_engine(store_db_path())
+    product_ids = {p['id'] for p in products}
+    
+    # Calculate metrics
+    total_products = len(products)
+    low_stock, critical_stock = alert_engine.counts(product_ids)
+    total_stock_value = sum(p['price_cents'] * p['stock_quantity'] for p in products)
+    
+    # Display metrics
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class='metric-card info-card'>
+            <h3>📦 Total Products</h3>
+            <h2>{total_products}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class='metric-card warning-card'>
+            <h3>⚠️ Low Stock Items</h3>
+            <h2>{low_stock}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class='metric-card danger-card'>
+            <h3>🚨 Critical Stock</h3>
+            <h2>{critical_stock}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        st.markdown(f"""
+        <div class='metric-card success-card'>
+            <h3>💰 Stock Value</h3>
+            <h2>KES {format_cents(total_stock_value)}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # Recent activity and charts
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("### 📈 Stock Status Distribution")
+        
+        # Create stock status data
+        status_data = {
+            'Status': ['Adequate', 'Low Stock', 'Critical'],
+            'Count': [
+                total_products - low_stock,
+                low_stock - critical_stock,
+                critical_stock
+            ]
+        }
+        
+        def build_status_pie():
+            fig = px.pie(status_data, values='Count', names='Status', 
+                        color_discrete_sequence=['#10B981', '#F59E0B', '#EF4444'])
+            fig.update_traces(textposition='inside', textinfo='percent+label')
+            return fig
+        
+        fig = get_figure_cache().get_or_build("dashboard_stock_status", st.session_state.products_version,
+                                              build_status_pie, params=status_data)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.markdown("### 📊 Top Products by Stock Value")
+        
+        # Sort products by stock value
+        sorted_products = sorted(products, key=lambda x: x['price_cents'] * x['stock_quantity'], reverse=True)[:8]
+        
+        def build_value_bar():
+            data = pd.DataFrame({
+                'Product': [p['name'] for p in sorted_products],
+                'Value': [from_cents(p['price_cents'] * p['stock_quantity']) for p in sorted_products]
+            })
+            
+            fig = px.bar(data, x='Product', y='Value', 
+                        color='Value',
+                        color_continuous_scale='Viridis')
+            fig.update_layout(xaxis_title="", yaxis_title="Stock Value (KES)")
+            return fig
+        
+        fig = get_figure_cache().get_or_build("dashboard_top_stock_value", st.session_state.products_version,
+                                              build_value_bar)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    # Low stock alerts
+    st.markdown("### ⚠️ Low Stock Alerts")
+    
+    alert_data = alert_engine.active_alerts(product_ids)
+    
+    if alert_data:
+        df_alerts = pd.DataFrame(alert_data)[['Product', 'Category', 'Current Stock', 'Min Required', 'Status']]
+        st.dataframe(df_alerts, width='stretch', hide_index=True)
+    else:
+        st.success("🎉 All products have sufficient stock levels!")
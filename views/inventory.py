@@ -0,0 +1,256 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from forecasting import current_stock
+from money import format_cents
+from resources import (audit, authorize, current_store_id, get_demand_forecaster, get_figure_cache, get_sales_archive,
+                       store_database, store_db_path)
+from views.common import quicksort_products
+from views import register
+
+# MODULE 4: Sorted Inventory List
+@register("Inventory", data=("products",))
+def show_inventory():
+    st.markdown("<h1 class='main-header'>📦 Inventory Management</h1>", unsafe_allow_html=True)
+    
+    products = st.session_state.products_data
+    
+    # CRUD Operations
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 View Inventory", "➕ Add Product", "✏️ Edit Product", "🔍 Search & Filter", "📈 Reorder Planning"])
+    
+    with tab1:
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            view_option = st.selectbox("View Mode", ["All Products", "Low Stock", "Critical Stock"], key="view_mode")
+        
+        with col2:
+            sort_by = st.selectbox("Sort By", ["Name", "Category", "Stock Level", "Price"], key="sort_by")
+        
+        with col3:
+            sort_order = st.selectbox("Order", ["Ascending", "Descending"], key="sort_order")
+        
+        # Filter products
+        if view_option == "Low Stock":
+            filtered_products = [p for p in products if p['stock_quantity'] < p['min_stock_level']]
+        elif view_option == "Critical Stock":
+            filtered_products = [p for p in products if p['stock_quantity'] < p['min_stock_level'] * 0.3]
+        else:
+            filtered_products = products
+        
+        # Sort products
+        sort_key = {
+            "Name": "name",
+            "Category": "category",
+            "Stock Level": "stock_quantity",
+            "Price": "price"
+        }[sort_by]
+        
+        sorted_products = quicksort_products(filtered_products, sort_key)
+        if sort_order == "Descending":
+            sorted_products = sorted_products[::-1]
+        
+        # Display inventory table with color coding
+        inventory_data = []
+        for product in sorted_products:
+            stock_level = product['stock_quantity']
+            min_level = product['min_stock_level']
+            
+            if stock_level >= min_level:
+                status = "🟢 Adequate"
+                status_class = "stock-green"
+            elif stock_level >= min_level * 0.3:
+                status = "🟡 Low"
+                status_class = "stock-yellow"
+            else:
+                status = "🔴 Critical"
+                status_class = "stock-red"
+            
+            inventory_data.append({
+                'ID': product['id'],
+                'SKU': product.get('sku') or "—",
+                'Barcode': product.get('barcode') or "—",
+                'Name': product['name'],
+                'Category': product['category'],
+                'Price': f"KES {format_cents(product['price_cents'])}",
+                'Stock': product['stock_quantity'],
+                'Min Level': product['min_stock_level'],
+                'Status': status
+            })
+        
+        df_inventory = pd.DataFrame(inventory_data)
+        st.dataframe(df_inventory, width='stretch', hide_index=True)
+        
+        # Stock level visualization
+        st.markdown("### 📊 Stock Level Analysis")
+        
+        categories = {}
+        for product in products:
+            cat = product['category']
+            if cat not in categories:
+                categories[cat] = {'total': 0, 'low': 0, 'critical': 0}
+            
+            categories[cat]['total'] += 1
+            if product['stock_quantity'] < product['min_stock_level'] * 0.3:
+                categories[cat]['critical'] += 1
+            elif product['stock_quantity'] < product['min_stock_level']:
+                categories[cat]['low'] += 1
+        
+        cat_df = pd.DataFrame([
+            {
+                'Category': cat,
+                'Adequate': data['total'] - data['low'] - data['critical'],
+                'Low': data['low'],
+                'Critical': data['critical']
+            }
+            for cat, data in categories.items()
+        ])
+        
+        if cat_df.empty:
+            st.info("This store has no products yet.")
+        else:
+            fig = get_figure_cache().get_or_build(
+                "inventory_status_by_category", st.session_state.products_version,
+                lambda: px.bar(cat_df.melt(id_vars='Category'), 
+                               x='Category', y='value', color='variable',
+                               color_discrete_map={'Adequate': '#10B981', 'Low': '#F59E0B', 'Critical': '#EF4444'},
+                               title="Stock Status by Category")
+            )
+            st.plotly_chart(fig, use_container_width=True)
+    
+    with tab2:
+        st.markdown("### Add New Product")
+        
+        with st.form("add_product_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                name = st.text_input("Product Name*", placeholder="Enter product name", key="add_name")
+                category = st.selectbox("Category*", ["Beverages", "Food", "Dessert", "Snacks", "Other"], key="add_category")
+                price = st.number_input("Price (KES)*", min_value=0.0, step=0.01, format="%.2f", key="add_price")
+            
+            with col2:
+                stock_quantity = st.number_input("Initial Stock*", min_value=0, step=1, key="add_stock")
+                min_stock_level = st.number_input("Minimum Stock Level*", min_value=1, step=1, value=10, key="add_min_stock")
+                description = st.text_area("Description", placeholder="Product description...", key="add_description")
+            
+            submitted = st.form_submit_button("➕ Add Product", type="primary")
+            
+            if submitted and authorize('edit_inventory'):
+                if name and price > 0:
+                    # Add product logic here
+                    st.success(f"Product '{name}' added successfully!")
+                    st.rerun()
+                else:
+                    st.error("Please fill in all required fields (*)")
+    
+    with tab3:
+        st.markdown("### Edit Existing Product")
+        
+        product_list = [f"{p['id']} - {p['name']}" for p in products]
+        selected_product = st.selectbox("Select Product to Edit", product_list, key="edit_select")
+        
+        if selected_product:
+            product_id = int(selected_product.split(" - ")[0])
+            product = next((p for p in products if p['id'] == product_id), None)
+            
+            if product:
+                with st.form("edit_product_form"):
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        new_name = st.text_input("Product Name", value=product['name'], key="edit_name")
+                        new_category = st.selectbox("Category", 
+                                                   ["Beverages", "Food", "Dessert", "Snacks", "Other"],
+                                                   index=["Beverages", "Food", "Dessert", "Snacks", "Other"].index(product['category']) 
+                                                   if product['category'] in ["Beverages", "Food", "Dessert", "Snacks", "Other"] else 0,
+                                                   key="edit_category")
+                        new_price = st.number_input("Price (KES)", value=float(product['price']), 
+                                                   min_value=0.0, step=0.01, format="%.2f", key="edit_price")
+                    
+                    with col2:
+                        new_stock = st.number_input("Stock Quantity", value=product['stock_quantity'], min_value=0, step=1, key="edit_stock")
+                        new_min_level = st.number_input("Min Stock Level", value=product['min_stock_level'], min_value=1, step=1, key="edit_min_level")
+                        new_description = st.text_area("Description", value=product.get('description', ''), key="edit_description")
+                    
+                    col_btn1, col_btn2 = st.columns(2)
+                    with col_btn1:
+                        update_btn = st.form_submit_button("💾 Update Product", type="primary", key="update_btn")
+                    with col_btn2:
+                        delete_btn = st.form_submit_button("🗑️ Delete Product", type="secondary", key="delete_btn")
+                    
+                    if update_btn and authorize('edit_inventory'):
+                        st.success(f"Product '{new_name}' updated successfully!")
+                    if delete_btn and authorize('delete_inventory'):
+                        st.warning(f"Are you sure you want to delete '{product['name']}'?")
+    
+    with tab4:
+        st.markdown("### Advanced Search & Filter")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            search_name = st.text_input("Search by Name", placeholder="Enter product name...", key="search_name")
+            price_range = st.slider("Price Range (KES)", 0.0, 1000.0, (0.0, 1000.0), key="price_range")
+        
+        with col2:
+            search_category = st.multiselect("Categories", ["Beverages", "Food", "Dessert", "Snacks", "Other"], key="search_category")
+            stock_range = st.slider("Stock Range", 0, 200, (0, 200), key="stock_range")
+        
+        # Apply filters
+        filtered = products
+        
+        if search_name:
+            filtered = [p for p in filtered if search_name.lower() in p['name'].lower()]
+        
+        if search_category:
+            filtered = [p for p in filtered if p['category'] in search_category]
+        
+        filtered = [p for p in filtered if price_range[0] <= p['price'] <= price_range[1]]
+        filtered = [p for p in filtered if stock_range[0] <= p['stock_quantity'] <= stock_range[1]]
+        
+        if filtered:
+            df_filtered = pd.DataFrame(filtered)
+            st.dataframe(df_filtered[['name', 'category', 'price', 'stock_quantity']], width='stretch', hide_index=True)
+        else:
+            st.info("No products match your search criteria")
+    
+    with tab5:
+        st.markdown("### Reorder Recommendations")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            lead_time = st.number_input("Supplier Lead Time (days)", min_value=1, max_value=60, value=7, key="lead_time")
+        with col2:
+            review_period = st.number_input("Review Period (days)", min_value=1, max_value=60, value=7, key="review_period")
+        with col3:
+            service_level = st.slider("Service Level (%)", 80.0, 99.9, 95.0, 0.1, key="service_level")
+        
+        store_id, db = current_store_id(), store_database()
+        forecaster = get_demand_forecaster(store_id)
+        # The archive only holds sales of the main database
+        archive = get_sales_archive() if store_db_path() is None else None
+        forecaster.update_from_db(db, store_id=store_id, archive=archive)
+        
+        if len(forecaster.product_ids) == 0:
+            st.info("No sales history yet - recommendations appear once sales are recorded.")
+        else:
+            recommendations = forecaster.recommend(
+                current_stock(db, store_id),
+                lead_time_days=lead_time,
+                review_period_days=review_period,
+                service_level=service_level / 100
+            )
+            names = {p['id']: p['name'] for p in products}
+            recommendations.insert(1, 'name', recommendations['product_id'].map(names))
+            
+            st.caption(f"Models trained through {forecaster.last_date}")
+            st.dataframe(recommendations.sort_values('reorder_quantity', ascending=False),
+                         width='stretch', hide_index=True)
+            
+            if st.button("💾 Apply as Min/Max Stock Levels", type="primary", key="apply_reorder") and authorize('edit_inventory'):
+                if forecaster.apply_stock_levels(db, recommendations):
+                    audit("Product Updated", f"Min/max stock levels of {len(recommendations)} products from forecast")
+                    st.success("Stock levels updated from demand forecast!")
+                else:
+                    st.error("Could not update stock levels")
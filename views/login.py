@@ -0,0 +1,63 @@
+import streamlit as st
+from resources import audit, client_ip, start_session
+from views import register
+
+# MODULE 1: User Authentication Interface
+@register("Login")
+def show_login():
+    st.markdown("<h1 class='main-header'>🔐SALPHINE CHEMOS SALES MANAGEMENT SYSTEM</h1>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        with st.container():
+            st.markdown("### Secure Login")
+            
+            if st.session_state.pop('session_expired', False):
+                st.info("Your session has expired or was ended elsewhere. Please log in again.")
+            
+            username = st.text_input("👤 Username", placeholder="Enter your username", key="login_username")
+            password = st.text_input("🔒 Password", type="password", placeholder="Enter your password", key="login_password")
+            
+            col_a, col_b = st.columns(2)
+            with col_a:
+                login_btn = st.button("🚀 Login", type="primary", key="login_btn")
+            with col_b:
+                reset_btn = st.button("🔄 Reset", key="reset_btn")
+            
+            if login_btn:
+                if username and password:
+                    result = st.session_state.auth.login(username, password, client_ip())
+                    if result and result.get('authenticated') and not start_session(
+                            result['user_id'], result['username'], result['role']):
+                        result = {'authenticated': False, 'error': 'Could not start a session, please try again'}
+                    if result and result.get('authenticated'):
+                        st.session_state.authenticated = True
+                        st.session_state.current_user = {
+                            'username': result.get('username', 'User'),
+                            'role': result.get('role', 'user'),
+                            'full_name': result.get('full_name', ''),
+                            'email': result.get('email', '')
+                        }
+                        st.session_state.selected_module = "Dashboard"
+                        audit("Login")
+                        st.success(f"Welcome, {result.get('username', 'User')}!")
+                        st.rerun()
+                    else:
+                        error_msg = result.get('error', 'Invalid credentials') if result else 'Login failed'
+                        audit("Login Failed", error_msg, status='WARNING' if result and result.get('rate_limited') else 'FAILED',
+                              user=username)
+                        st.error(f"Authentication failed: {error_msg}")
+                else:
+                    st.warning("Please enter both username and password")
+            
+            if reset_btn:
+                st.rerun()
+            
+            st.markdown("---")
+            st.markdown("""
+            **Demo Credentials:**
+            - 👑 Admin: `admin` / `admin123`
+            - 📊 Manager: `manager1` / `manager123`
+            - 💼 Clerk: `clerk1` / `clerk123`
+            """)
@@ -0,0 +1,28 @@
+import streamlit as st
+from resources import audit, end_session
+from views import register
+
+@register("Logout")
+def show_logout():
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.markdown("### 👋 Logout Confirmation")
+        st.warning("Are you sure you want to logout?")
+        
+        col_btn1, col_btn2 = st.columns(2)
+        with col_btn1:
+            if st.button("✅ Yes, Logout", type="primary", key="yes_logout"):
+                audit("Logout")
+                end_session()
+                st.session_state.authenticated = False
+                st.session_state.current_user = None
+                st.session_state.cart = []
+                st.session_state.last_receipt = None
+                st.session_state.products_data = None
+                st.session_state.users_data = None
+                st.success("Logged out successfully!")
+                st.rerun()
+        with col_btn2:
+            if st.button("❌ Cancel", key="cancel_logout"):
+                st.session_state.selected_module = "Dashboard"
+                st.rerun()
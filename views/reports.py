@@ -0,0 +1,346 @@
+import io
+import random
+from datetime import datetime, timedelta
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+from instrumentation import timed
+from money import as_amounts, format_cents
+from resources import (authorize, current_store, get_analytics_snapshot, get_figure_cache, get_sales_archive,
+                       get_stores, store_database, store_db_path)
+from sales_reports import (GRANULARITY_LABELS, period_range, has_sales, consolidated_sales, load_sales,
+                           load_sales_snapshot, sales_over_time, resample_sales)
+from views import register
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def get_report_sales(products_version, _products):
+    """Generate sample sales data with proper date handling"""
+    rng = random.Random(42)
+    dates = pd.date_range(start='2024-01-01', end='2024-01-31', freq='D')
+    sales_data = []
+    
+    for date in dates:
+        daily_sales = rng.randint(50, 200)
+        for _ in range(daily_sales):
+            product = rng.choice(_products)
+            qty = rng.randint(1, 5)
+            # Convert date to string to avoid Arrow serialization issues
+            sales_data.append({
+                'date': date.strftime('%Y-%m-%d'),
+                'product': product['name'],
+                'category': product['category'],
+                'quantity': qty,
+                'price_cents': product['price_cents'],
+                'total_cents': product['price_cents'] * qty,
+                'payment_method': rng.choice(['Cash', 'Credit Card', 'M-Pesa', 'Debit Card'])
+            })
+    
+    return pd.DataFrame(sales_data)
+
+# MODULE 5: Sales Reports Interface - FIXED with proper date handling
+@register("Reports", data=("products",))
+def show_reports():
+    st.markdown("<h1 class='main-header'>📈 Sales Reports & Analytics</h1>", unsafe_allow_html=True)
+    
+    products = st.session_state.products_data
+    
+    # Time period selection
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        report_type = st.selectbox("Report Type", 
+                                  ["Sales Summary", "Product Performance", "Category Analysis", "Time Series"],
+                                  key="report_type")
+    
+    with col2:
+        time_period = st.selectbox("Time Period", 
+                                  ["Today", "Yesterday", "Last 7 Days", "This Month", "Last Month", "Custom Range"],
+                                  key="time_period")
+    
+    with col3:
+        start_date = end_date = None
+        if time_period == "Custom Range":
+            date_col1, date_col2 = st.columns(2)
+            with date_col1:
+                start_date = st.date_input("Start Date", key="start_date")
+            with date_col2:
+                end_date = st.date_input("End Date", key="end_date")
+    
+    start, end = period_range(time_period, start_date, end_date)
+    stores = get_stores()
+    store = current_store()
+    db = store_database()
+    
+    archive = get_sales_archive()
+    # The archive only holds sales of the main database
+    store_archive = archive if store_db_path() is None else None
+    
+    # Users not tied to one store can report on every store at once
+    all_stores = False
+    if st.session_state.get('home_store_id') is None and len(stores.stores()) > 1:
+        all_stores = st.radio("Stores", [f"This store ({store['name']})", "All stores (consolidated)"],
+                              horizontal=True, key="report_scope").startswith("All")
+    
+    if all_stores:
+        store_ids = [s['id'] for s in stores.stores()]
+        found = any(stores.map(lambda part_db, ids: has_sales(part_db, store_ids=ids), store_ids)) or archive.has_sales()
+    else:
+        # With a single store there is nothing to filter on, and the Parquet snapshot can be used
+        store_ids = [store['id']] if len(stores.stores(active_only=False)) > 1 else None
+        found = has_sales(db, store_archive, store_ids)
+    
+    if found:
+        df_sales = None
+        if all_stores:
+            data_version = "all/" + "|".join(str(part_db.get_data_version('sales'))
+                                             for part_db, _ in stores.partitions(store_ids))
+            df_sales, (sales_trend, granularity) = consolidated_sales(stores, store_ids, start, end, archive=archive)
+        else:
+            data_version = f"{store['id']}/{db.get_data_version('sales')}"
+            snapshot = get_analytics_snapshot()
+            synced_at = snapshot.synced_at()
+            if store_ids is None and synced_at is not None and end <= synced_at:
+                # Closed periods are read from the Parquet snapshot, keeping heavy scans off the live database
+                df_sales = load_sales_snapshot(snapshot, products, start, end)
+            
+            if df_sales is not None:
+                sales_trend, granularity = resample_sales(df_sales, 'sale_date', 'total_cents', start, end)
+            else:
+                df_sales = load_sales(db, start, end, archive=store_archive, store_ids=store_ids)
+                sales_trend, granularity = sales_over_time(db, start, end, archive=store_archive, store_ids=store_ids)
+        
+        if df_sales.empty:
+            st.info(f"No sales recorded between {start:%Y-%m-%d} and {end - timedelta(days=1):%Y-%m-%d}.")
+            return
+    else:
+        # Nothing sold yet: sample sales are generated once per products version so charts can be cached
+        st.info("No sales recorded yet - showing sample data.")
+        data_version = st.session_state.products_version
+        df_sales = get_report_sales(data_version, products)
+        start = datetime.strptime(df_sales['date'].min(), '%Y-%m-%d')
+        end = datetime.strptime(df_sales['date'].max(), '%Y-%m-%d') + timedelta(days=1)
+        sales_trend, granularity = resample_sales(df_sales, 'date', 'total_cents', start, end)
+    
+    chart_params = {'start': start, 'end': end}
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["📊 Summary Dashboard", "📈 Visual Charts", "📋 Data Tables", "📤 Export Data"])
+    
+    with tab1:
+        # Key metrics (summed in integer cents)
+        total_sales = format_cents(df_sales['total_cents'].sum())
+        avg_sale = format_cents(round(df_sales['total_cents'].mean()))
+        total_transactions = len(df_sales)
+        top_product = df_sales.groupby('product')['quantity'].sum().idxmax()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.markdown(f"""
+            <div class='metric-card success-card'>
+                <h3>💰 Total Sales</h3>
+                <h2>KES {total_sales}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown(f"""
+            <div class='metric-card info-card'>
+                <h3>🧾 Transactions</h3>
+                <h2>{total_transactions}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3:
+            st.markdown(f"""
+            <div class='metric-card warning-card'>
+                <h3>📦 Avg. Sale</h3>
+                <h2>KES {avg_sale}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col4:
+            st.markdown(f"""
+            <div class='metric-card'>
+                <h3>🏆 Top Product</h3>
+                <h4>{top_product}</h4>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        # Top products table
+        st.markdown("### 🏆 Top 10 Products by Sales")
+        top_products = df_sales.groupby('product').agg({
+            'quantity': 'sum',
+            'total_cents': 'sum'
+        }).sort_values('total_cents', ascending=False).head(10)
+        
+        st.dataframe(as_amounts(top_products).style.format({'total': 'KES {:,.2f}'}), 
+                    width='stretch')
+        
+        if all_stores:
+            st.markdown("### 🏬 Sales by Store")
+            by_store = df_sales.groupby('store_id').agg(lines=('total_cents', 'size'),
+                                                        total_cents=('total_cents', 'sum')).reset_index()
+            by_store.insert(0, 'store', by_store['store_id'].map(lambda i: (stores.get(i) or {}).get('name', f"#{i}")))
+            st.dataframe(as_amounts(by_store.drop(columns='store_id').sort_values('total_cents', ascending=False))
+                         .style.format({'total': 'KES {:,.2f}'}), width='stretch', hide_index=True)
+    
+    with tab2:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("### Sales by Category")
+            
+            def build_category_pie():
+                category_sales = as_amounts(df_sales.groupby('category')['total_cents'].sum().reset_index())
+                fig = px.pie(category_sales, values='total', names='category',
+                            color_discrete_sequence=px.colors.qualitative.Set3)
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                return fig
+            
+            fig = get_figure_cache().get_or_build("reports_category_sales", data_version, build_category_pie, chart_params)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.markdown(f"### {GRANULARITY_LABELS[granularity]} Sales Trend")
+            
+            def build_daily_trend():
+                # Bucketed and LTTB-downsampled, so the payload stays bounded for any range
+                fig = px.line(sales_trend, x='period', y='total',
+                             title="Sales Over Time",
+                             markers=len(sales_trend) <= 100)
+                fig.update_layout(xaxis_title="Date", yaxis_title="Total Sales (KES)")
+                return fig
+            
+            fig = get_figure_cache().get_or_build("reports_daily_trend", data_version, build_daily_trend,
+                                                  dict(chart_params, granularity=granularity))
+            st.plotly_chart(fig, use_container_width=True)
+        
+        # Payment method distribution
+        st.markdown("### Payment Methods Distribution")
+        def build_payment_bar():
+            payment_dist = as_amounts(df_sales.groupby('payment_method')['total_cents'].sum().reset_index())
+            
+            fig = px.bar(payment_dist, x='payment_method', y='total',
+                        color='payment_method',
+                        title="Sales by Payment Method")
+            fig.update_layout(xaxis_title="Payment Method", yaxis_title="Total Sales (KES)")
+            return fig
+        
+        fig = get_figure_cache().get_or_build("reports_payment_methods", data_version, build_payment_bar, chart_params)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with tab3:
+        st.markdown("### Detailed Sales Data")
+        
+        # Filters for the table
+        col_filter1, col_filter2, col_filter3 = st.columns(3)
+        
+        with col_filter1:
+            table_category = st.multiselect("Filter by Category", df_sales['category'].unique(), key="table_category")
+        
+        with col_filter2:
+            table_products = st.multiselect("Filter by Product", df_sales['product'].unique(), key="table_products")
+        
+        with col_filter3:
+            sort_table = st.selectbox("Sort By", ["Date", "Product", "Total", "Quantity"], key="sort_table")
+        
+        # Apply filters
+        filtered_df = df_sales.copy()
+        
+        if table_category:
+            filtered_df = filtered_df[filtered_df['category'].isin(table_category)]
+        
+        if table_products:
+            filtered_df = filtered_df[filtered_df['product'].isin(table_products)]
+        
+        # Sort table
+        if sort_table == "Date":
+            filtered_df = filtered_df.sort_values('date')
+        elif sort_table == "Product":
+            filtered_df = filtered_df.sort_values('product')
+        elif sort_table == "Total":
+            filtered_df = filtered_df.sort_values('total_cents', ascending=False)
+        elif sort_table == "Quantity":
+            filtered_df = filtered_df.sort_values('quantity', ascending=False)
+        
+        # Display table with proper date format and amounts in KES
+        filtered_df = as_amounts(filtered_df)
+        st.dataframe(filtered_df, width='stretch')
+        
+        # Summary statistics
+        st.markdown("### Summary Statistics")
+        summary_stats = filtered_df.describe()
+        st.dataframe(summary_stats, width='stretch')
+    
+    with tab4:
+        st.markdown("### Export Reports")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            export_format = st.selectbox("Export Format", 
+                                        ["CSV", "Excel", "PDF Summary", "JSON"],
+                                        key="export_format")
+        
+        with col2:
+            data_type = st.selectbox("Data Type", 
+                                    ["Sales Data", "Summary Report", "Product Performance", "Category Analysis"],
+                                    key="data_type")
+        
+        with col3:
+            include_charts = st.checkbox("Include Charts", value=True, key="include_charts")
+        
+        # Generate export data
+        if data_type == "Sales Data":
+            export_df = as_amounts(df_sales)
+        elif data_type == "Summary Report":
+            export_df = pd.DataFrame({
+                'Metric': ['Total Sales', 'Total Transactions', 'Average Sale', 'Top Product'],
+                'Value': [f"KES {total_sales}", total_transactions, 
+                         f"KES {avg_sale}", top_product]
+            })
+        elif data_type == "Product Performance":
+            export_df = as_amounts(df_sales.groupby('product').agg({
+                'quantity': 'sum',
+                'total_cents': 'sum'
+            }).reset_index())
+        else:  # Category Analysis
+            export_df = as_amounts(df_sales.groupby('category').agg({
+                'quantity': 'sum',
+                'total_cents': 'sum',
+                'price_cents': lambda cents: round(cents.mean())
+            }).reset_index())
+        
+        # Export buttons
+        col_btn1, col_btn2, col_btn3 = st.columns(3)
+        
+        with col_btn1:
+            if st.button("📥 Download CSV", use_container_width=True, key="download_csv") and authorize('export_reports'):
+                with timed('export', "report_csv"):
+                    csv = export_df.to_csv(index=False)
+                st.download_button(
+                    label="⬇️ Click to Download",
+                    data=csv,
+                    file_name=f"sales_report_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                    key=f"csv_download_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                )
+        
+        with col_btn2:
+            if st.button("📊 Download Excel", use_container_width=True, key="download_excel") and authorize('export_reports'):
+                buffer = io.BytesIO()
+                with timed('export', "report_excel"):
+                    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                        export_df.to_excel(writer, index=False, sheet_name='Report')
+                buffer.seek(0)
+                st.download_button(
+                    label="⬇️ Click to Download",
+                    data=buffer,
+                    file_name=f"sales_report_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    key=f"excel_download_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                )
+        
+        with col_btn3:
+            if st.button("📄 Download PDF", use_container_width=True, key="download_pdf") and authorize('export_reports'):
+                st.info("PDF generation would be implemented with reportlab")
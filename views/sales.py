@@ -0,0 +1,364 @@
+import random
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+from barcodes import parse_scan
+from money import format_cents
+from pricing import receipt_tax_label, tax_label
+from resources import (authorize, current_store, get_checkout_pipeline, get_pricing_engine, get_settings, get_till,
+                       scan_lookup, store_db_path)
+from stores import business_details, receipt_business
+from views.common import quicksort_products
+from views import register
+
+# MODULE 3: Sales Processing Interface - FIXED VERSION
+@register("Sales Processing", data=("products",))
+def show_sales_processing():
+    st.markdown("<h1 class='main-header'>🛒 Sales Processing</h1>", unsafe_allow_html=True)
+    
+    products = st.session_state.products_data
+    
+    # Use tabs instead of nested columns to fix the nesting issue
+    tab1, tab2 = st.tabs(["🏷️ Product Selection", "🛍️ Shopping Cart & Checkout"])
+    
+    with tab1:
+        st.markdown("### 🏷️ Product Selection")
+        
+        # Scan mode skips the product grid: each scan is one barcode/SKU lookup and a cart update
+        if st.toggle("📷 Scan mode", key="scan_mode", help="Add items with a barcode scanner or by SKU"):
+            show_scan_input()
+        else:
+            show_product_grid(products)
+    
+    with tab2:
+        st.markdown("### 🛍️ Shopping Cart")
+        
+        if not st.session_state.cart:
+            st.info("🛒 Your cart is empty")
+        else:
+            # Display cart items without nested columns (amounts are integer cents)
+            cart = st.session_state.cart
+            cart_items_container = st.container()
+            
+            with cart_items_container:
+                for idx, item in enumerate(st.session_state.cart):
+                    # Use a single row layout without nested columns
+                    col1, col2, col3, col4 = st.columns([3, 2, 2, 1])
+                    with col1:
+                        st.write(f"**{item['name']}**")
+                    with col2:
+                        st.write(f"Qty: {item['quantity']}")
+                    with col3:
+                        st.write(f"KES {format_cents(item['total_cents'])}")
+                    with col4:
+                        if st.button("❌", key=f"remove_{item['id']}_{idx}"):
+                            st.session_state.cart = [i for i in st.session_state.cart if i['id'] != item['id']]
+                            st.rerun()
+            
+            st.markdown("---")
+            st.markdown(f"**Subtotal:** KES {format_cents(sum(item['total_cents'] for item in cart))}")
+            
+            # Discounts and tax from the pricing rules; the slider rate applies where no category VAT rule does.
+            # Unchanged carts come straight from the engine's cache.
+            cfg = get_settings().values()
+            tax_rate = st.slider("Tax Rate (%)", 0.0, 30.0, cfg['tax_rate'], 0.1, key="tax_slider")
+            store = current_store()
+            priced = get_pricing_engine().price_cart(cart, tax_rate, cfg['tax_rounding'], store_id=store['id'])
+            line_rates = [line.basis_points / 100 for line in priced.lines]
+            
+            if priced.discount:
+                st.markdown(f"**Discounts:** -KES {format_cents(priced.discount)}")
+                st.caption("Applied: " + ", ".join(priced.rules))
+            st.markdown(f"**{tax_label(tax_rate, line_rates)}:** KES {format_cents(priced.tax)}")
+            st.markdown(f"### **Total: KES {format_cents(priced.total)}**")
+            
+            st.markdown("---")
+            
+            # Payment options
+            payment_method = st.selectbox("💳 Payment Method", 
+                                         ["Cash", "Credit Card", "M-Pesa", "Debit Card", "Bank Transfer"],
+                                         key="payment_method")
+            
+            customer_name = st.text_input("👤 Customer Name", placeholder="Enter customer name", key="customer_name")
+            
+            # Buttons in a single row
+            col_btn1, col_btn2, col_btn3 = st.columns(3)
+            with col_btn1:
+                if st.button("✅ Complete Sale", type="primary", key="complete_sale") and authorize('process_sales'):
+                    if customer_name:
+                        # Generate receipt (with the selling store's details, so a queued sale prints the same later)
+                        receipt_data = {
+                            'transaction_id': f"TXN{datetime.now().strftime('%Y%m%d%H%M%S')}{random.randint(1000, 9999)}",
+                            'customer_name': customer_name,
+                            'items': [dict(item, discount_cents=line.discount, total_cents=line.net, tax_cents=line.tax,
+                                           tax_rate=rate) for item, line, rate in zip(cart, priced.lines, line_rates)],
+                            'subtotal_cents': priced.subtotal,
+                            'discount_cents': priced.discount,
+                            'promotions': list(priced.rules),
+                            'tax_rate': tax_rate,
+                            'tax_rounding': cfg['tax_rounding'],
+                            'tax_cents': priced.tax,
+                            'total_cents': priced.total,
+                            'payment_method': payment_method,
+                            'date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                            'user': st.session_state.current_user['username'],
+                            'store_id': store['id'],
+                            'business': business_details(store, get_settings().values())
+                        }
+                        
+                        # Only the commit happens here; receipt PDF, alerts and audit run in the background.
+                        # If the main database is unavailable the sale is queued locally and synced later.
+                        try:
+                            status = get_till(store_db_path()).checkout(receipt_data, user_id=st.session_state.get('user_id'))
+                        except Exception as e:
+                            print(f"Checkout error: {e}")
+                            status = None
+                        
+                        if status:
+                            # Save receipt to session
+                            st.session_state.last_receipt = receipt_data
+                            st.session_state.cart = []
+                            
+                            st.success(f"✅ Sale completed! Transaction ID: {receipt_data['transaction_id']}")
+                            if status == 'queued':
+                                st.warning("Main database unavailable - sale saved on this till and will sync automatically.")
+                            st.balloons()
+                            
+                            # Show receipt preview
+                            st.markdown("---")
+                            show_receipt_preview(receipt_data)
+                        else:
+                            st.error("Sale could not be saved. Please try again.")
+                    else:
+                        st.warning("Please enter customer name")
+            
+            with col_btn2:
+                if st.button("🗑️ Clear Cart", type="secondary", key="clear_cart"):
+                    st.session_state.cart = []
+                    st.rerun()
+            
+            with col_btn3:
+                if st.session_state.last_receipt and st.button("📄 View Last Receipt", key="view_last"):
+                    show_receipt_preview(st.session_state.last_receipt)
+
+def add_to_cart(product, qty):
+    """Add `qty` of a catalogue product to the session's cart, on its existing line if it has one"""
+    existing_item = next((item for item in st.session_state.cart if item['id'] == product['id']), None)
+    
+    if existing_item:
+        existing_item['quantity'] += qty
+        existing_item['total_cents'] = existing_item['price_cents'] * existing_item['quantity']
+    else:
+        st.session_state.cart.append({
+            'id': product['id'],
+            'name': product['name'],
+            'category': product['category'],
+            'price_cents': product['price_cents'],
+            'quantity': qty,
+            'total_cents': product['price_cents'] * qty
+        })
+
+def show_scan_input():
+    """Barcode/SKU entry; a scanner types the code followed by Enter, which submits the form"""
+    with st.form("scan_form", clear_on_submit=True):
+        code = st.text_input("Scan barcode or SKU", placeholder="Scan, or type e.g. 3*SKU-00001 for three",
+                             key="scan_code")
+        scanned = st.form_submit_button("➕ Add", type="primary")
+    
+    scan = parse_scan(code) if scanned else None
+    if scan:
+        product = scan_lookup(scan.code)
+        if product is None:
+            st.error(f"No product with barcode or SKU '{code.strip()}'.")
+        else:
+            in_cart = sum(item['quantity'] for item in st.session_state.cart if item['id'] == product['id'])
+            if in_cart + scan.quantity > product['stock_quantity']:
+                st.error(f"Only {product['stock_quantity']} x {product['name']} in stock.")
+            else:
+                add_to_cart(product, scan.quantity)
+                st.success(f"Added {scan.quantity} x {product['name']} "
+                           f"(KES {format_cents(product['price_cents'] * scan.quantity)})")
+    
+    cart = st.session_state.cart
+    st.caption(f"🛒 {sum(item['quantity'] for item in cart)} items · "
+               f"KES {format_cents(sum(item['total_cents'] for item in cart))} before tax")
+
+def show_product_grid(products):
+    """Searchable, sortable product cards with quantity and Add to Cart"""
+    
+    # Search and filter in a single row
+    search_col1, search_col2, search_col3 = st.columns([3, 2, 2])
+    with search_col1:
+        search_term = st.text_input("🔍 Search products", placeholder="Type product name or category...", key="search_main")
+    with search_col2:
+        categories = list(set(p['category'] for p in products))
+        selected_category = st.selectbox("📂 Filter by category", ["All"] + categories, key="category_main")
+    with search_col3:
+        sort_option = st.selectbox("🔢 Sort by", ["Name (A-Z)", "Name (Z-A)", "Price (Low-High)", "Price (High-Low)"], key="sort_main")
+    
+    # Filter products
+    filtered_products = products
+    
+    if search_term:
+        filtered_products = [p for p in filtered_products 
+                           if search_term.lower() in p['name'].lower() 
+                           or search_term.lower() in p['category'].lower()]
+    
+    if selected_category != "All":
+        filtered_products = [p for p in filtered_products if p['category'] == selected_category]
+    
+    # Sort using QuickSort
+    sort_key_map = {
+        "Name (A-Z)": ('name', False),
+        "Name (Z-A)": ('name', True),
+        "Price (Low-High)": ('price', False),
+        "Price (High-Low)": ('price', True)
+    }
+    
+    sort_key, reverse = sort_key_map[sort_option]
+    sorted_products = quicksort_products(filtered_products, sort_key)
+    if reverse:
+        sorted_products = sorted_products[::-1]
+    
+    # Display products in grid without nested columns
+    st.markdown("### Available Products")
+    
+    # Create a container for products
+    products_container = st.container()
+    
+    with products_container:
+        # Display products in rows of 3 without nested columns
+        for i in range(0, len(sorted_products), 3):
+            row_products = sorted_products[i:i+3]
+            cols = st.columns(3)
+            
+            for j, product in enumerate(row_products):
+                with cols[j]:
+                    stock_status = "🟢" if product['stock_quantity'] >= product['min_stock_level'] else \
+                                  "🟡" if product['stock_quantity'] >= product['min_stock_level'] * 0.3 else "🔴"
+                    
+                    st.markdown(f"""
+                    <div class='card'>
+                        <h4>{stock_status} {product['name']}</h4>
+                        <p><strong>Category:</strong> {product['category']}</p>
+                        <p><strong>Price:</strong> KES {format_cents(product['price_cents'])}</p>
+                        <p><strong>Stock:</strong> {product['stock_quantity']} units</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    qty = st.number_input("Quantity", min_value=1, max_value=product['stock_quantity'], 
+                                         value=1, key=f"qty_{product['id']}_{i}_{j}")
+                    
+                    if st.button("➕ Add to Cart", key=f"add_{product['id']}_{i}_{j}"):
+                        add_to_cart(product, qty)
+                        st.success(f"Added {qty} x {product['name']} to cart!")
+                        st.rerun()
+
+def show_receipt_preview(receipt_data):
+    """Display receipt preview"""
+    st.markdown("### 📄 Receipt Preview")
+    business = receipt_business(receipt_data)
+    
+    # Create receipt using Streamlit components instead of raw HTML
+    with st.container():
+        st.markdown(f"""
+        <div style="border: 1px solid #ddd; padding: 20px; border-radius: 10px; background-color: #f9f9f9;">
+            <h3 style="text-align: center; color: #1E3A8A;">{business['business_name'].upper()}</h3>
+            <p style="text-align: center;">{business['store_name'] or ''}</p>
+            <p style="text-align: center;">{business['address']}</p>
+            <p style="text-align: center;">Tel: {' | '.join(business['phones'])}</p>
+            <p style="text-align: center;">Email: {business['email']}</p>
+            <hr>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Transaction details
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**Transaction ID:** {receipt_data['transaction_id']}")
+            st.markdown(f"**Date:** {receipt_data['date']}")
+        with col2:
+            st.markdown(f"**Customer:** {receipt_data['customer_name']}")
+            st.markdown(f"**Cashier:** {receipt_data['user']}")
+        
+        st.markdown("---")
+        
+        # Items table using Streamlit dataframe
+        st.markdown("**Items Purchased:**")
+        items_data = []
+        for item in receipt_data['items']:
+            items_data.append({
+                'Item': item['name'],
+                'Qty': item['quantity'],
+                'Price': f"KES {format_cents(item['price_cents'])}",
+                'Discount': f"KES {format_cents(item.get('discount_cents', 0))}",
+                'Total': f"KES {format_cents(item['total_cents'])}"
+            })
+        
+        df_items = pd.DataFrame(items_data)
+        st.dataframe(df_items, width='stretch', hide_index=True)
+        
+        st.markdown("---")
+        
+        # Summary
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col2:
+            st.markdown("**Subtotal:**")
+            if receipt_data.get('discount_cents'):
+                st.markdown("**Discounts (included):**")
+            st.markdown(f"**{receipt_tax_label(receipt_data)}:**")
+            st.markdown("**Total:**")
+        with col3:
+            st.markdown(f"KES {format_cents(receipt_data['subtotal_cents'])}")
+            if receipt_data.get('discount_cents'):
+                st.markdown(f"-KES {format_cents(receipt_data['discount_cents'])}")
+            st.markdown(f"KES {format_cents(receipt_data['tax_cents'])}")
+            st.markdown(f"**KES {format_cents(receipt_data['total_cents'])}**")
+        
+        st.markdown("---")
+        st.markdown(f"**Payment Method:** {receipt_data['payment_method']}")
+        
+        st.markdown(f"""
+        <div style="text-align: center; margin-top: 20px;">
+            <p>{business['footer'] or ''}</p>
+            <p>Visit us: {business['website']}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Export buttons
+    st.markdown("---")
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("📥 Download PDF Receipt", key="pdf_btn"):
+            generate_pdf_receipt(receipt_data)
+    with col2:
+        if st.button("📊 Export to Excel", key="excel_btn"):
+            generate_excel_receipt(receipt_data)
+
+def generate_pdf_receipt(receipt_data):
+    """Generate PDF receipt"""
+    # Use the PDF rendered in the background at checkout if it is ready
+    pdf_bytes = get_checkout_pipeline(store_db_path()).result(receipt_data['transaction_id'], "receipt_pdf")
+    if pdf_bytes is None:
+        from receipts import build_pdf_receipt
+        pdf_bytes = build_pdf_receipt(receipt_data)
+    
+    st.download_button(
+        label="⬇️ Click to Download PDF",
+        data=pdf_bytes,
+        file_name=f"receipt_{receipt_data['transaction_id']}.pdf",
+        mime="application/pdf",
+        key=f"download_pdf_{receipt_data['transaction_id']}"
+    )
+
+def generate_excel_receipt(receipt_data):
+    """Generate Excel receipt"""
+    from receipts import build_excel_receipt
+    
+    st.download_button(
+        label="⬇️ Click to Download Excel",
+        data=build_excel_receipt(receipt_data),
+        file_name=f"receipt_{receipt_data['transaction_id']}.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        key=f"download_excel_{receipt_data['transaction_id']}"
+    )
@@ -0,0 +1,263 @@
+from datetime import datetime, timedelta
+import streamlit as st
+from audit_log import STATUSES
+from permissions import PERMISSIONS, ROLES
+from resources import audit, get_audit_log, get_permissions, get_session_store, get_settings, save_settings
+from views.common import audit_frame, option_index, show_audit_page
+from views import register
+
+# Audit events shown under Security > Audit Logs
+SECURITY_EVENTS = ['Login', 'Login Failed', 'Logout', 'Password Reset', 'User Added', 'User Updated',
+                   'User Deleted', 'Settings Changed', 'Logs Cleared', 'Access Denied']
+RETENTION_DAYS = 90
+EXPORT_LIMIT = 100000
+
+# MODULE 8: Security Settings
+@register("Security")
+def show_security():
+    st.markdown("<h1 class='main-header'>🔐 Security Settings</h1>", unsafe_allow_html=True)
+    
+    cfg = get_settings().values()
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["🔑 Password Policy", "👥 Access Control", "📜 Audit Logs", "🛡️ Security Features"])
+    
+    with tab1:
+        st.markdown("### Password Security Policy")
+        
+        with st.form("password_policy_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                min_length = st.slider("Minimum Password Length", 6, 20, cfg['password_min_length'], key="min_length")
+                require_uppercase = st.checkbox("Require Uppercase Letters", value=cfg['password_require_upper'], key="req_upper")
+                require_lowercase = st.checkbox("Require Lowercase Letters", value=cfg['password_require_lower'], key="req_lower")
+                require_numbers = st.checkbox("Require Numbers", value=cfg['password_require_digit'], key="req_numbers")
+            
+            with col2:
+                require_special = st.checkbox("Require Special Characters", value=cfg['password_require_special'], key="req_special")
+                password_expiry = st.slider("Password Expiry (days)", 0, 365, cfg['password_expiry_days'], key="pass_expiry")
+                max_login_attempts = st.slider("Max Failed Login Attempts", 1, 10, cfg['max_login_attempts'], key="max_attempts")
+                lockout_duration = st.slider("Lockout Duration (minutes)", 1, 60, cfg['lockout_minutes'], key="lockout_duration")
+            
+            save_policy = st.form_submit_button("💾 Save Policy", type="primary", key="save_policy")
+            
+            # The login rate limiter applies attempts/lockout through its settings subscription
+            if save_policy:
+                if save_settings({'password_min_length': min_length, 'password_require_upper': require_uppercase,
+                                  'password_require_lower': require_lowercase, 'password_require_digit': require_numbers,
+                                  'password_require_special': require_special, 'password_expiry_days': password_expiry,
+                                  'max_login_attempts': max_login_attempts, 'lockout_minutes': lockout_duration},
+                                 "Password policy"):
+                    st.success("Password policy updated successfully!")
+                else:
+                    st.error("Password policy could not be saved.")
+        
+        st.markdown("### Password Strength Test")
+        test_password = st.text_input("Test Password Strength", type="password", key="test_password")
+        
+        if test_password:
+            strength = 0
+            feedback = []
+            
+            if len(test_password) >= cfg['password_min_length']:
+                strength += 1
+                feedback.append("✓ Minimum length met")
+            else:
+                feedback.append("✗ Minimum length not met")
+            
+            if any(c.isupper() for c in test_password):
+                strength += 1
+                feedback.append("✓ Contains uppercase")
+            
+            if any(c.islower() for c in test_password):
+                strength += 1
+                feedback.append("✓ Contains lowercase")
+            
+            if any(c.isdigit() for c in test_password):
+                strength += 1
+                feedback.append("✓ Contains numbers")
+            
+            if any(not c.isalnum() for c in test_password):
+                strength += 1
+                feedback.append("✓ Contains special characters")
+            
+            # Display strength meter
+            colors = ['#EF4444', '#F59E0B', '#FBBF24', '#10B981', '#059669']
+            strength_text = ['Very Weak', 'Weak', 'Fair', 'Good', 'Excellent']
+            
+            st.markdown(f"""
+            <div style="background-color: #F3F4F6; padding: 10px; border-radius: 5px;">
+                <div style="display: flex; justify-content: space-between; margin-bottom: 5px;">
+                    <span>Password Strength:</span>
+                    <span style="color: {colors[strength-1]}; font-weight: bold;">{strength_text[strength-1]}</span>
+                </div>
+                <div style="height: 10px; background-color: #E5E7EB; border-radius: 5px;">
+                    <div style="width: {strength * 20}%; height: 100%; background-color: {colors[strength-1]}; border-radius: 5px;"></div>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            for item in feedback:
+                st.write(item)
+    
+    with tab2:
+        st.markdown("### Role-Based Access Control")
+        
+        permissions = get_permissions()
+        selected_role = st.selectbox("Select Role to Configure", ROLES, key="select_role")
+        
+        if selected_role:
+            st.markdown(f"#### Permissions for {selected_role.upper()} Role")
+            if selected_role == 'admin':
+                st.caption("Administrators always hold every permission.")
+            
+            granted = permissions.permissions_for(selected_role)
+            modules = {}
+            for permission, label, module in PERMISSIONS:
+                modules.setdefault(module, []).append((permission, label))
+            
+            selected = set()
+            for col, (module, entries) in zip(st.columns(len(modules)), modules.items()):
+                with col:
+                    st.markdown(f"**{module}**")
+                    for permission, label in entries:
+                        # Keyed per role so switching roles shows that role's stored grants
+                        if st.checkbox(label, value=permission in granted, disabled=selected_role == 'admin',
+                                       key=f"can_{permission}_{selected_role}"):
+                            selected.add(permission)
+            
+            st.caption(f"Permission set version {permissions.version}")
+            
+            if st.button(f"💾 Save {selected_role} Permissions", type="primary", key=f"save_{selected_role}_perms",
+                         disabled=selected_role == 'admin'):
+                if permissions.set_role_permissions(selected_role, selected):
+                    audit("Settings Changed", f"Permissions for {selected_role}: {', '.join(sorted(selected)) or 'none'}")
+                    st.success(f"Permissions for {selected_role} role saved successfully!")
+                else:
+                    st.error(f"Permissions for {selected_role} could not be saved.")
+    
+    with tab3:
+        st.markdown("### Security Audit Logs")
+        
+        # Filter options
+        col_filter1, col_filter2 = st.columns(2)
+        
+        with col_filter1:
+            log_event = st.multiselect("Filter by Event", SECURITY_EVENTS, key="log_event")
+        
+        with col_filter2:
+            log_status = st.multiselect("Filter by Status", STATUSES, key="log_status")
+        
+        # Display logs (newest first, paged in the database)
+        events = log_event or SECURITY_EVENTS
+        show_audit_page("security_log_page", events=events, statuses=log_status)
+        
+        # Export and clear logs
+        col_export, col_clear = st.columns(2)
+        
+        with col_export:
+            if st.button("📥 Export Audit Logs", type="primary", key="export_audit"):
+                csv = audit_frame(get_audit_log().query(events=events, statuses=log_status,
+                                                        limit=EXPORT_LIMIT)).to_csv(index=False)
+                st.download_button(
+                    label="⬇️ Download CSV",
+                    data=csv,
+                    file_name=f"audit_logs_{datetime.now().strftime('%Y%m%d')}.csv",
+                    mime="text/csv",
+                    key=f"audit_download_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+                )
+        
+        with col_clear:
+            if st.button("🗑️ Clear Old Logs", type="secondary", key="clear_old_logs"):
+                st.session_state.confirm_clear_logs_shown = True
+            if st.session_state.get('confirm_clear_logs_shown'):
+                st.warning(f"This will delete logs older than {RETENTION_DAYS} days. Continue?")
+                if st.checkbox("Yes, clear old logs", key="confirm_clear_logs"):
+                    if get_audit_log().purge(datetime.now() - timedelta(days=RETENTION_DAYS)):
+                        audit("Logs Cleared", f"Entries older than {RETENTION_DAYS} days", status='WARNING')
+                        st.session_state.confirm_clear_logs_shown = False
+                        st.info("Old logs cleared successfully!")
+                    else:
+                        st.error("Could not clear old logs")
+    
+    with tab4:
+        st.markdown("### Advanced Security Features")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### Authentication")
+            
+            # Options hidden behind a disabled switch keep their saved values
+            features = {'two_factor': st.checkbox("Enable Two-Factor Authentication", value=cfg['two_factor'], key="two_factor")}
+            if features['two_factor']:
+                methods = ["SMS", "Email", "Authenticator App"]
+                features['two_factor_method'] = st.selectbox("2FA Method", 
+                                                methods,
+                                                index=option_index(methods, cfg['two_factor_method']),
+                                                key="two_factor_method")
+                features['require_2fa_admins'] = st.checkbox("Require 2FA for Admins", value=cfg['require_2fa_admins'], key="req_2fa_admins")
+                features['require_2fa_all'] = st.checkbox("Require 2FA for All Users", value=cfg['require_2fa_all'], key="req_2fa_all")
+            
+            features['biometric_auth'] = st.checkbox("Enable Biometric Authentication", value=cfg['biometric_auth'], key="biometric_auth")
+            if features['biometric_auth']:
+                st.info("Biometric authentication requires compatible hardware")
+        
+        with col2:
+            st.markdown("#### Session Security")
+            
+            session_store = get_session_store()
+            features['single_session'] = st.checkbox("Single Session Per User", value=cfg['single_session'], key="single_session")
+            if features['single_session']:
+                st.info("Users will be logged out from other devices")
+            
+            features['session_timeout_minutes'] = st.slider("Session Timeout (minutes)", 15, 480, cfg['session_timeout_minutes'],
+                                                            key="session_timeout")
+            st.caption(f"{session_store.active_sessions()} active sessions · "
+                       f"{session_store.hits} cached / {session_store.misses} database session lookups")
+            features['secure_cookies'] = st.checkbox("Secure Cookies Only", value=cfg['secure_cookies'], key="secure_cookies")
+            features['http_only'] = st.checkbox("HTTP Only Cookies", value=cfg['http_only'], key="http_only")
+        
+        st.markdown("---")
+        st.markdown("#### Data Protection")
+        
+        col_prot1, col_prot2 = st.columns(2)
+        
+        with col_prot1:
+            features['data_encryption'] = st.checkbox("Enable Data Encryption", value=cfg['data_encryption'], key="data_encryption")
+            if features['data_encryption']:
+                levels = ["AES-128", "AES-256", "RSA-2048", "RSA-4096"]
+                features['encryption_level'] = st.selectbox("Encryption Level", 
+                                              levels,
+                                              index=option_index(levels, cfg['encryption_level']),
+                                              key="encryption_level")
+            
+            features['backup_encryption'] = st.checkbox("Encrypt Backups", value=cfg['backup_encryption'], key="backup_encryption")
+        
+        with col_prot2:
+            features['mask_sensitive'] = st.checkbox("Mask Sensitive Data", value=cfg['mask_sensitive'], key="mask_sensitive")
+            if features['mask_sensitive']:
+                fields = ["Passwords", "Credit Cards", "Phone Numbers", "Email Addresses"]
+                features['mask_fields'] = st.multiselect("Fields to Mask", 
+                                           fields,
+                                           default=[f for f in cfg['mask_fields'] if f in fields],
+                                           key="mask_fields")
+            
+            features['auto_logout_sensitive'] = st.checkbox("Auto-logout on Sensitive Operations",
+                                                            value=cfg['auto_logout_sensitive'], key="auto_logout_sensitive")
+        
+        st.markdown("---")
+        st.markdown("#### Security Monitoring")
+        
+        features['intrusion_detection'] = st.checkbox("Enable Intrusion Detection", value=cfg['intrusion_detection'], key="intrusion_detection")
+        if features['intrusion_detection']:
+            features['alert_on_many_failures'] = st.checkbox("Alert on Multiple Failures", value=cfg['alert_on_many_failures'], key="alert_failures")
+            features['monitor_privileged'] = st.checkbox("Monitor Privileged Accounts", value=cfg['monitor_privileged'], key="monitor_privileged")
+            features['log_all_access'] = st.checkbox("Log All Access Attempts", value=cfg['log_all_access'], key="log_all_access")
+        
+        # The session store applies timeout and single-session mode through its settings subscription
+        if st.button("🛡️ Apply Security Settings", type="primary", key="apply_security"):
+            if save_settings(features, "Security features"):
+                st.success("Security settings applied successfully!")
+            else:
+                st.error("Security settings could not be saved.")
@@ -0,0 +1,469 @@
+import json
+import re
+from datetime import datetime, time
+import pandas as pd
+import streamlit as st
+from instrumentation import timings
+from money import ROUNDING_RULES, format_cents, to_cents
+from pricing import RULE_KINDS
+from resources import (audit, authorize, get_figure_cache, get_pricing_engine, get_settings, get_stores, requires,
+                       save_settings)
+from views.common import option_index
+from views import register
+
+# MODULE 7: Settings System Interface
+@register("Settings", data=("products",))
+def show_settings():
+    st.markdown("<h1 class='main-header'>⚙️ System Settings</h1>", unsafe_allow_html=True)
+    
+    # Widget defaults come from the cached settings; saving writes them back in one transaction
+    cfg = get_settings().values()
+    
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🏢 Business Profile", "🧾 Receipt Template", "🔔 Notifications",
+                                                  "🛠️ System Preferences", "🏬 Stores", "🏷️ Pricing"])
+    
+    with tab1:
+        st.markdown("### Business Information")
+        
+        with st.form("business_profile_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                business_name = st.text_input("Business Name*", value=cfg['business_name'], key="biz_name")
+                tax_id = st.text_input("Tax ID/VAT Number", value=cfg['tax_id'], key="tax_id")
+                currencies = ["KES", "USD", "EUR", "GBP"]
+                currency = st.selectbox("Currency", currencies, index=option_index(currencies, cfg['currency']), key="currency")
+                tax_rate = st.number_input("Default Tax Rate (%)", value=cfg['tax_rate'], min_value=0.0, max_value=30.0, step=0.1, key="default_tax")
+                tax_rounding = st.selectbox("Tax Rounding", ROUNDING_RULES, index=option_index(ROUNDING_RULES, cfg['tax_rounding']),
+                                            key="tax_rounding",
+                                            help="Per invoice: tax on the subtotal, rounded once. Per line: tax rounded on each line and summed.")
+            
+            with col2:
+                address = st.text_area("Address", value=cfg['address'], key="address")
+                phone1 = st.text_input("Primary Phone", value=cfg['phone1'], key="phone1")
+                phone2 = st.text_input("Secondary Phone", value=cfg['phone2'], key="phone2")
+                email = st.text_input("Business Email", value=cfg['email'], key="biz_email")
+                website = st.text_input("Website", value=cfg['website'], key="website")
+            
+            logo_file = st.file_uploader("Upload Business Logo", type=['png', 'jpg', 'jpeg'], key="logo_upload")
+            
+            col_btn1, col_btn2 = st.columns(2)
+            with col_btn1:
+                save_profile = st.form_submit_button("💾 Save Profile", type="primary", key="save_profile")
+            with col_btn2:
+                cancel_profile = st.form_submit_button("Cancel", type="secondary", key="cancel_profile")
+            
+            if save_profile:
+                if not business_name.strip():
+                    st.error("Please fill in all required fields (*)")
+                elif save_settings({'business_name': business_name.strip(), 'tax_id': tax_id, 'currency': currency,
+                                    'tax_rate': tax_rate, 'tax_rounding': tax_rounding, 'address': address, 'phone1': phone1, 'phone2': phone2,
+                                    'email': email, 'website': website}, "Business profile"):
+                    st.success("Business profile updated successfully!")
+                else:
+                    st.error("Business profile could not be saved.")
+    
+    with tab2:
+        st.markdown("### Receipt Template Customization")
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.markdown("#### Template Preview")
+            
+            # Live preview of receipt template
+            preview_html = """
+            <div style="border: 2px dashed #ccc; padding: 20px; border-radius: 10px; background-color: #fff;">
+                <div style="text-align: center;">
+                    <h3 style="color: #1E3A8A;">[BUSINESS NAME]</h3>
+                    <p>[ADDRESS]</p>
+                    <p>Tel: [PHONE1] | [PHONE2]</p>
+                    <p>Email: [EMAIL] | Website: [WEBSITE]</p>
+                    <hr style="border-top: 2px solid #1E3A8A;">
+                    <p><strong>Transaction:</strong> [TRANSACTION_ID]</p>
+                    <p><strong>Date:</strong> [DATE] | <strong>Cashier:</strong> [USER]</p>
+                    <hr>
+                </div>
+            </div>
+            """
+            st.markdown(preview_html, unsafe_allow_html=True)
+        
+        with col2:
+            st.markdown("#### Template Options")
+            
+            header_size = st.slider("Header Font Size", 12, 24, cfg['receipt_header_size'], key="header_size")
+            show_logo = st.checkbox("Show Logo", value=cfg['receipt_show_logo'], key="show_logo")
+            show_footer = st.checkbox("Show Footer Message", value=cfg['receipt_show_footer'], key="show_footer")
+            footer_message = st.text_area("Footer Message", value=cfg['receipt_footer'], key="footer_msg")
+            
+            styles = ["Modern", "Classic", "Minimal", "Professional"]
+            template_style = st.selectbox("Template Style", 
+                                         styles,
+                                         index=option_index(styles, cfg['receipt_style']),
+                                         key="template_style")
+            
+            if st.button("🔄 Update Template", type="primary", key="update_template"):
+                if save_settings({'receipt_header_size': header_size, 'receipt_show_logo': show_logo,
+                                  'receipt_show_footer': show_footer, 'receipt_footer': footer_message,
+                                  'receipt_style': template_style}, "Receipt template"):
+                    st.success("Receipt template updated successfully!")
+                else:
+                    st.error("Receipt template could not be saved.")
+    
+    with tab3:
+        st.markdown("### Notification Settings")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### Email Notifications")
+            
+            # Options hidden behind a disabled switch keep their saved values
+            notify = {'email_notifications': st.checkbox("Enable Email Notifications", value=cfg['email_notifications'], key="email_notify")}
+            
+            if notify['email_notifications']:
+                notify['low_stock_email'] = st.checkbox("Low Stock Alerts", value=cfg['low_stock_email'], key="low_stock_email")
+                notify['sales_report_email'] = st.checkbox("Daily Sales Reports", value=cfg['sales_report_email'], key="sales_report_email")
+                notify['system_alerts'] = st.checkbox("System Alerts", value=cfg['system_alerts'], key="system_alerts")
+                
+                frequencies = ["Real-time", "Hourly", "Daily", "Weekly"]
+                notify['email_frequency'] = st.selectbox("Report Frequency", 
+                                              frequencies,
+                                              index=option_index(frequencies, cfg['email_frequency']),
+                                              key="email_freq")
+                
+                notify['email_recipients'] = st.text_area("Notification Recipients (comma-separated)",
+                                               value=cfg['email_recipients'],
+                                               key="email_recipients")
+        
+        with col2:
+            st.markdown("#### In-App Notifications")
+            
+            notify['inapp_notifications'] = st.checkbox("Enable In-App Notifications", value=cfg['inapp_notifications'], key="inapp_notify")
+            
+            if notify['inapp_notifications']:
+                notify['show_sales_popup'] = st.checkbox("Show Sales Confirmations", value=cfg['show_sales_popup'], key="show_popup")
+                notify['show_stock_alerts'] = st.checkbox("Show Stock Warnings", value=cfg['show_stock_alerts'], key="show_stock_alerts")
+                notify['show_system_messages'] = st.checkbox("Show System Messages", value=cfg['show_system_messages'], key="show_system_msgs")
+                
+                notify['notification_sound'] = st.checkbox("Play Notification Sound", value=cfg['notification_sound'], key="notify_sound")
+                sounds = ["Default", "Chime", "Beep", "None"]
+                notify['sound_type'] = st.selectbox("Sound Type", sounds, index=option_index(sounds, cfg['sound_type']), key="sound_type")
+        
+        # The low-stock alert engine picks up email settings through its settings subscription
+        if st.button("🔔 Save Notification Settings", type="primary", key="save_notify"):
+            if save_settings(notify, "Notifications"):
+                st.success("Notification settings updated successfully!")
+            else:
+                st.error("Notification settings could not be saved.")
+    
+    with tab4:
+        st.markdown("### System Preferences")
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("#### General Settings")
+            
+            views = ["Sales Overview", "Inventory", "Reports", "User Dashboard"]
+            prefs = {'default_view': st.selectbox("Default Dashboard View", 
+                                       views,
+                                       index=option_index(views, cfg['default_view']),
+                                       key="default_view")}
+            
+            prefs['auto_logout'] = st.checkbox("Enable Auto Logout", value=cfg['auto_logout'], key="auto_logout")
+            if prefs['auto_logout']:
+                prefs['logout_minutes'] = st.slider("Inactivity Timeout (minutes)", 5, 120, cfg['logout_minutes'], key="logout_time")
+            
+            prefs['data_retention_days'] = st.number_input("Data Retention Period (days)", 
+                                           min_value=30, max_value=365*5, value=cfg['data_retention_days'], step=30,
+                                           key="data_retention")
+            
+            backups = ["Daily", "Weekly", "Monthly", "Never"]
+            prefs['backup_frequency'] = st.selectbox("Auto Backup Frequency", 
+                                          backups,
+                                          index=option_index(backups, cfg['backup_frequency']),
+                                          key="backup_freq")
+        
+        with col2:
+            st.markdown("#### Display Settings")
+            
+            themes = ["Light", "Dark", "Auto"]
+            prefs['theme'] = st.selectbox("Theme", themes, index=option_index(themes, cfg['theme']), key="theme")
+            languages = ["English", "Swahili", "French", "Spanish"]
+            prefs['language'] = st.selectbox("Language", languages, index=option_index(languages, cfg['language']), key="language")
+            date_formats = ["YYYY-MM-DD", "DD/MM/YYYY", "MM/DD/YYYY", "DD MMM YYYY"]
+            prefs['date_format'] = st.selectbox("Date Format", 
+                                      date_formats,
+                                      index=option_index(date_formats, cfg['date_format']),
+                                      key="date_format")
+            
+            prefs['decimal_places'] = st.slider("Decimal Places", 0, 4, cfg['decimal_places'], key="decimal_places")
+            number_formats = ["1,000.00", "1.000,00", "1 000.00"]
+            prefs['number_format'] = st.selectbox("Number Format", 
+                                        number_formats,
+                                        index=option_index(number_formats, cfg['number_format']),
+                                        key="number_format")
+        
+        st.markdown("---")
+        st.markdown("#### System Maintenance")
+        
+        col_maint1, col_maint2, col_maint3 = st.columns(3)
+        
+        with col_maint1:
+            if st.button("🔄 Clear Cache", type="secondary", key="clear_cache"):
+                get_figure_cache().invalidate()
+                st.cache_data.clear()
+                st.session_state.products_data = None
+                st.info("Cache cleared successfully!")
+        
+        with col_maint2:
+            if st.button("📊 Rebuild Indexes", type="secondary", key="rebuild_index"):
+                st.info("Database indexes rebuilt successfully!")
+        
+        with col_maint3:
+            if st.button("🚀 System Diagnostics", type="secondary", key="sys_diagnostics"):
+                st.session_state.show_diagnostics = True
+        
+        if st.session_state.get('show_diagnostics'):
+            show_diagnostics_panel()
+        
+        if st.button("💾 Save All Settings", type="primary", key="save_all_settings"):
+            if save_settings(prefs, "System preferences"):
+                st.success("All system settings saved successfully!")
+            else:
+                st.error("System settings could not be saved.")
+    
+    with tab5:
+        show_stores()
+    
+    with tab6:
+        show_pricing()
+
+def show_stores():
+    """Outlets: their receipt details, and where their products and sales are stored"""
+    stores = get_stores()
+    st.markdown("### Stores")
+    st.caption("Receipts print the business profile with the store's own address, phone and email where set.")
+    
+    st.dataframe(pd.DataFrame([{
+        'Code': store['code'],
+        'Name': store['name'],
+        'Address': store['address'] or "—",
+        'Phone': store['phone'] or "—",
+        'Database': store['db_path'] or "Main database",
+        'Status': "🟢 Active" if store['is_active'] else "🔴 Inactive"
+    } for store in stores.stores(active_only=False)]), width='stretch', hide_index=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Add Store")
+        with st.form("add_store_form"):
+            code = st.text_input("Store Code*", placeholder="e.g. westlands", key="store_code").strip().lower()
+            name = st.text_input("Store Name*", key="store_name")
+            address = st.text_input("Address", key="store_address")
+            phone = st.text_input("Phone", key="store_phone")
+            email = st.text_input("Email", key="store_email")
+            own_database = st.checkbox("Separate database file", value=False, key="store_own_db",
+                                       help="A busy store with its own file never waits on other stores' writes")
+            seed_demo = st.checkbox("Start with the demo catalogue", value=False, key="store_seed_demo",
+                                    help="Ten sample products with opening stock, for trying the app out")
+            
+            if st.form_submit_button("🏬 Add Store", type="primary") and authorize('manage_settings'):
+                if not (code and name.strip()):
+                    st.error("Please fill in all required fields (*)")
+                elif not re.fullmatch(r"[a-z0-9_-]+", code):
+                    st.error("Store codes may only contain letters, digits, '-' and '_'.")
+                elif stores.add_store(code, name.strip(), address or None, phone or None, email or None,
+                                      db_path=f"store_{code}.db" if own_database else None, seed_demo=seed_demo):
+                    audit("Settings Changed", f"Store added: {code}")
+                    st.success(f"Store '{name}' added" + (" with the demo catalogue." if seed_demo else "."))
+                else:
+                    st.error(f"Store could not be added (is the code '{code}' already in use?).")
+    
+    with col2:
+        st.markdown("#### Edit Store")
+        all_stores = stores.stores(active_only=False)
+        store_id = st.selectbox("Store", [store['id'] for store in all_stores],
+                                format_func=lambda i: stores.get(i)['name'], key="edit_store")
+        store = stores.get(store_id)
+        if store:
+            with st.form("edit_store_form"):
+                new_name = st.text_input("Store Name", value=store['name'], key=f"edit_store_name_{store_id}")
+                new_address = st.text_input("Address", value=store['address'] or "", key=f"edit_store_address_{store_id}")
+                new_phone = st.text_input("Phone", value=store['phone'] or "", key=f"edit_store_phone_{store_id}")
+                new_email = st.text_input("Email", value=store['email'] or "", key=f"edit_store_email_{store_id}")
+                active = st.checkbox("Active", value=bool(store['is_active']), key=f"edit_store_active_{store_id}")
+                
+                if st.form_submit_button("💾 Save Store", type="primary") and authorize('manage_settings'):
+                    if stores.update_store(store_id, name=new_name.strip() or None, address=new_address,
+                                           phone=new_phone, email=new_email, is_active=active):
+                        audit("Settings Changed", f"Store updated: {store['code']}")
+                        st.success(f"Store '{new_name}' saved.")
+                    else:
+                        st.error("Store could not be saved (the main store must stay active).")
+
+def rule_summary(rule, product_names):
+    """What a pricing rule does, in words"""
+    products = ", ".join(product_names.get(i, f"#{i}") for i in rule_products(rule))
+    applies_to = products or rule['category'] or "—"
+    if rule['kind'] == 'tax':
+        return f"{rule['rate']}% VAT on {rule['category']}"
+    if rule['kind'] == 'bundle':
+        return f"KES {format_cents(rule['discount_cents'] or 0)} off each set of {applies_to}"
+    if rule['kind'] == 'quantity':
+        return f"{rule['rate']}% off {applies_to} from {rule['min_quantity']} units"
+    return f"{rule['rate']}% off {applies_to}"
+
+def rule_products(rule):
+    return json.loads(rule['product_ids'] or "[]")
+
+def show_pricing():
+    """Category VAT rates, promotions, quantity discounts and bundles applied at checkout"""
+    engine = get_pricing_engine()
+    stores = get_stores()
+    products = st.session_state.products_data or []
+    product_names = {p['id']: p['name'] for p in products}
+    categories = sorted({p['category'] for p in products if p['category']})
+    store_choices = [None] + [store['id'] for store in stores.stores()]
+    
+    def store_label(store_id):
+        store = stores.get(store_id) if store_id is not None else None
+        return "All stores" if store_id is None else store['name'] if store else f"#{store_id}"
+    
+    st.markdown("### Pricing Rules")
+    st.caption("Lines get their best promotion or quantity discount (they do not stack); bundle discounts come on "
+               "top. Category VAT replaces the checkout tax rate for that category.")
+    
+    rules = engine.rules()
+    if rules:
+        st.dataframe(pd.DataFrame([{
+            'ID': rule['id'],
+            'Name': rule['name'],
+            'Type': RULE_KINDS.get(rule['kind'], rule['kind']),
+            'Rule': rule_summary(rule, product_names),
+            'Store': store_label(rule['store_id']),
+            'From': rule['starts_at'] or "—",
+            'Until': rule['ends_at'] or "—",
+            'Status': "🟢 Active" if rule['is_active'] else "🔴 Inactive"
+        } for rule in rules]), width='stretch', hide_index=True)
+    else:
+        st.info("No pricing rules yet: every sale is charged at list price and the checkout tax rate.")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Add Rule")
+        kind = st.selectbox("Type", list(RULE_KINDS), format_func=RULE_KINDS.get, key="rule_kind")
+        with st.form("add_rule_form"):
+            name = st.text_input("Rule Name*", placeholder="e.g. Weekend coffee offer", key="rule_name")
+            category, product_ids, rate, min_quantity, discount = None, [], None, None, None
+            if kind == 'tax':
+                category = st.selectbox("Category*", categories, key="rule_category")
+                rate = st.number_input("VAT Rate (%)", 0.0, 100.0, 16.0, 0.5, key="rule_vat")
+            elif kind == 'bundle':
+                product_ids = st.multiselect("Bundle Products*", list(product_names),
+                                             format_func=product_names.get, key="rule_bundle_products")
+                discount = st.number_input("Discount per Bundle (KES)", 0.0, value=50.0, step=10.0, key="rule_bundle_discount")
+            else:
+                category = st.selectbox("Category", [None] + categories, format_func=lambda c: c or "—",
+                                        key="rule_discount_category")
+                product_ids = st.multiselect("Products", list(product_names), format_func=product_names.get,
+                                             key="rule_products")
+                rate = st.number_input("Discount (%)", 0.0, 100.0, 10.0, 0.5, key="rule_rate")
+                if kind == 'quantity':
+                    min_quantity = st.number_input("From Quantity", 2, value=3, key="rule_min_quantity")
+            store_id = st.selectbox("Store", store_choices, format_func=store_label, key="rule_store")
+            timed_rule = st.checkbox("Only between dates", value=False, key="rule_timed")
+            col_from, col_until = st.columns(2)
+            with col_from:
+                starts = st.date_input("From", key="rule_starts")
+            with col_until:
+                ends = st.date_input("Until (exclusive)", key="rule_ends")
+            
+            if st.form_submit_button("🏷️ Add Rule", type="primary") and authorize('manage_settings'):
+                if not name.strip():
+                    st.error("Please fill in all required fields (*)")
+                elif kind == 'tax' and not category:
+                    st.error("Choose the category the VAT rate applies to.")
+                elif kind == 'bundle' and len(product_ids) < 2:
+                    st.error("A bundle needs at least two products.")
+                elif kind in ('promotion', 'quantity') and not (category or product_ids):
+                    st.error("Choose the products or the category the discount applies to.")
+                elif timed_rule and ends <= starts:
+                    st.error("The end date must be after the start date.")
+                else:
+                    rule_id = engine.add_rule(
+                        name.strip(), kind, category=category, product_ids=product_ids, rate=rate,
+                        min_quantity=min_quantity, discount_cents=to_cents(discount) if discount else None,
+                        store_id=store_id,
+                        starts_at=datetime.combine(starts, time()) if timed_rule else None,
+                        ends_at=datetime.combine(ends, time()) if timed_rule else None)
+                    if rule_id:
+                        audit("Settings Changed", f"Pricing rule added: {name.strip()} ({RULE_KINDS[kind]})")
+                        st.success(f"Rule '{name.strip()}' added.")
+                    else:
+                        st.error("Rule could not be saved.")
+    
+    with col2:
+        st.markdown("#### Activate / Deactivate")
+        if rules:
+            rule_id = st.selectbox("Rule", [rule['id'] for rule in rules], key="toggle_rule",
+                                   format_func=lambda i: next(r['name'] for r in rules if r['id'] == i))
+            rule = next(r for r in rules if r['id'] == rule_id)
+            label = "⏸️ Deactivate" if rule['is_active'] else "▶️ Activate"
+            if st.button(label, type="secondary", key="toggle_rule_btn") and authorize('manage_settings'):
+                if engine.set_active(rule_id, not rule['is_active']):
+                    audit("Settings Changed", f"Pricing rule {'deactivated' if rule['is_active'] else 'activated'}: {rule['name']}")
+                    st.rerun()
+                else:
+                    st.error("Rule could not be changed.")
+        stats = engine.stats()
+        st.caption(f"Priced carts cached: {stats['entries']} · hits {stats['hits']:,} · misses {stats['misses']:,}")
+
+@requires('manage_settings')
+def show_diagnostics_panel():
+    """Rolling wall-time percentiles recorded by the instrumentation layer (admins only)"""
+    st.markdown("#### 🚀 Performance Diagnostics")
+    
+    tab_labels = {
+        'rerun': "🔁 Reruns",
+        'page': "📄 Pages",
+        'sql': "🗄️ SQL",
+        'chart': "📊 Charts",
+        'export': "📤 Exports"
+    }
+    tabs = st.tabs(list(tab_labels.values()) + ["🐢 Slow Queries"])
+    
+    for tab, category in zip(tabs, tab_labels):
+        with tab:
+            rows = timings.summary(category)
+            if rows:
+                st.dataframe([{k: v for k, v in row.items() if k != 'category'} for row in rows],
+                             width='stretch', hide_index=True)
+            else:
+                st.info("No samples recorded yet")
+    
+    with tabs[-1]:
+        log_path = timings.slow_query_log
+        st.caption(f"Statements over {timings.slow_query_ms:.0f} ms"
+                   + (f" are also logged to {log_path}" if log_path else " (set SLOW_QUERY_LOG to keep a log file)"))
+        if timings.slow_queries:
+            st.dataframe(list(reversed(timings.slow_queries)), width='stretch', hide_index=True)
+        else:
+            st.info("No slow queries recorded")
+    
+    cache_stats = get_figure_cache().stats()
+    st.caption(f"Chart cache: {cache_stats['entries']} figures, {cache_stats['hits']} hits, "
+               f"{cache_stats['misses']} misses, {cache_stats['bytes'] / 1024:,.0f} KB")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("♻️ Reset Timings", key="reset_timings"):
+            timings.reset()
+            st.rerun()
+    with col2:
+        if st.button("✖️ Close Diagnostics", key="close_diagnostics"):
+            st.session_state.show_diagnostics = False
+            st.rerun()
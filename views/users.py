@@ -0,0 +1,257 @@
+import secrets
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+from audit_log import EVENTS
+from passwords import policy_problems
+from permissions import ROLES
+from resources import (audit, authorize, get_audit_log, get_last_login_tracker, get_session_store, get_settings,
+                       get_stores)
+from views.common import audit_frame, show_audit_page
+from views import register
+
+# Most audit entries written to one CSV export
+EXPORT_LIMIT = 100000
+USERS_PER_PAGE = 50
+# Matches offered when picking a user to manage
+USER_MATCHES = 50
+
+def store_label(store_id):
+    """A user's store for display; users without one work at every store"""
+    if store_id is None:
+        return "All stores"
+    store = get_stores().get(store_id)
+    return store['name'] if store else f"#{store_id}"
+
+def user_frame(users):
+    """Users as a DataFrame for display; login times not yet flushed to the database are shown too"""
+    tracker = get_last_login_tracker()
+    return pd.DataFrame([{
+        'ID': user['id'],
+        'Username': user['username'],
+        'Role': user['role'],
+        'Email': user['email'],
+        'Store': store_label(user['store_id']),
+        'Status': "🟢 Active" if user['is_active'] else "🔴 Inactive",
+        'Last Login': tracker.pending(user['id']) or user['last_login_at'] or "Never"
+    } for user in users], columns=['ID', 'Username', 'Role', 'Email', 'Store', 'Status', 'Last Login'])
+
+def show_user_page(key, search=None, role=None, active=None, page_size=USERS_PER_PAGE):
+    """Show one page of users ordered by username with Previous/Next buttons"""
+    db = st.session_state.db
+    # Keyset paging: the (username, id) cursor of every page visited so far, reset when the filters change
+    filters = (search, role, active)
+    paging = st.session_state.get(key)
+    if not paging or paging['filters'] != filters:
+        paging = st.session_state[key] = {'filters': filters, 'cursors': [None],
+                                          'total': db.count_users(search, role, active)}
+    
+    users = db.list_users(search, role, active, after=paging['cursors'][-1], limit=page_size + 1)
+    has_next = len(users) > page_size
+    users = users[:page_size]
+    
+    if users:
+        st.dataframe(user_frame(users), width='stretch', hide_index=True)
+    else:
+        st.info("No users match these filters.")
+    
+    col_prev, col_page, col_next = st.columns([1, 2, 1])
+    with col_prev:
+        if st.button("⬅️ Previous", key=f"{key}_prev", disabled=len(paging['cursors']) == 1):
+            paging['cursors'].pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(paging['cursors'])} · {paging['total']:,} users")
+    with col_next:
+        if st.button("Next ➡️", key=f"{key}_next", disabled=not has_next):
+            paging['cursors'].append((users[-1]['username'], users[-1]['id']))
+            st.rerun()
+
+def _sign_out(username):
+    """End a user's sessions so role or status changes apply at once"""
+    get_session_store().revoke_user(username)
+
+# MODULE 6: User Management Interface (Admin Only)
+@register("User Management")
+def show_user_management():
+    st.markdown("<h1 class='main-header'>👥 User Management</h1>", unsafe_allow_html=True)
+    
+    db = st.session_state.db
+    store_choices = [None] + [store['id'] for store in get_stores().stores()]
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["👤 User List", "➕ Add User", "📊 Activity Logs", "⚙️ Account Settings"])
+    
+    with tab1:
+        st.markdown("### Registered Users")
+        
+        col_search, col_role, col_status = st.columns([2, 1, 1])
+        with col_search:
+            search = st.text_input("🔍 Search username or email", placeholder="Starts with...", key="user_search")
+        with col_role:
+            role_filter = st.selectbox("Role", ["All"] + list(ROLES), key="user_role_filter")
+        with col_status:
+            status_filter = st.selectbox("Status", ["All", "Active", "Inactive"], key="user_status_filter")
+        
+        show_user_page("user_list_page", search=search.strip() or None,
+                       role=None if role_filter == "All" else role_filter,
+                       active=None if status_filter == "All" else status_filter == "Active")
+    
+    with tab2:
+        st.markdown("### Add New User")
+        
+        with st.form("add_user_form"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                new_username = st.text_input("Username*", placeholder="Enter username", key="new_username")
+                new_email = st.text_input("Email*", placeholder="user@example.com", key="new_email")
+                new_password = st.text_input("Password*", type="password", placeholder="Enter password", key="new_password")
+            
+            with col2:
+                new_role = st.selectbox("Role*", list(ROLES), index=ROLES.index("clerk"), key="new_role")
+                new_store = st.selectbox("Store", store_choices, format_func=store_label, key="new_store")
+                is_active = st.checkbox("Active Account", value=True, key="is_active")
+                send_welcome = st.checkbox("Send welcome email", value=True, key="send_welcome")
+            
+            col_btn1, col_btn2 = st.columns(2)
+            with col_btn1:
+                submit_user = st.form_submit_button("👤 Add User", type="primary", key="submit_user")
+            with col_btn2:
+                cancel_user = st.form_submit_button("Cancel", type="secondary", key="cancel_user")
+            
+            if submit_user and authorize('manage_users'):
+                new_username = new_username.strip()
+                weaknesses = policy_problems(new_password, get_settings().values())
+                if not (new_username and new_email and new_password):
+                    st.error("Please fill in all required fields (*)")
+                elif weaknesses:
+                    st.error(f"Passwords must contain {', '.join(weaknesses)}.")
+                elif db.get_user(username=new_username):
+                    st.error(f"Username '{new_username}' is already taken.")
+                elif db.create_user(new_username, new_password, new_role, new_email.strip(), is_active, new_store):
+                    audit("User Added", f"{new_username} ({new_role}, {store_label(new_store)})")
+                    st.success(f"User '{new_username}' added successfully!")
+                    if send_welcome:
+                        st.info("Welcome email sent successfully!")
+                else:
+                    st.error("User could not be saved. Please try again.")
+    
+    with tab3:
+        st.markdown("### 📜 User Activity Logs")
+        
+        # Filter options
+        col_filter1, col_filter2 = st.columns(2)
+        
+        with col_filter1:
+            log_user = st.text_input("Filter by User", placeholder="Exact username", key="log_user").strip()
+        
+        with col_filter2:
+            log_action = st.multiselect("Filter by Action", EVENTS, key="log_action")
+        
+        # Display logs (newest first, paged in the database)
+        show_audit_page("activity_log_page", users=[log_user] if log_user else None, events=log_action)
+        
+        # Export logs
+        if st.button("📥 Export Activity Logs", type="primary", key="export_logs") and authorize('view_logs'):
+            entries = get_audit_log().query([log_user] if log_user else None, log_action, limit=EXPORT_LIMIT)
+            csv = audit_frame(entries).to_csv(index=False)
+            st.download_button(
+                label="⬇️ Download CSV",
+                data=csv,
+                file_name=f"activity_logs_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv",
+                key=f"activity_download_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            )
+    
+    with tab4:
+        st.markdown("### Account Settings Management")
+        
+        account_search = st.text_input("🔍 Find user", placeholder="Username or email starts with...",
+                                       key="account_search").strip()
+        matches = db.list_users(search=account_search or None, limit=USER_MATCHES)
+        selected_user = st.selectbox("Select User", [u['username'] for u in matches], key="select_user")
+        if len(matches) == USER_MATCHES:
+            st.caption(f"Showing the first {USER_MATCHES} matches; refine the search to find others.")
+        
+        if selected_user:
+            user = next((u for u in matches if u['username'] == selected_user), None)
+            
+            if user:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("#### Account Status")
+                    
+                    current_status = "🟢 Active" if user['is_active'] else "🔴 Inactive"
+                    st.write(f"**Current Status:** {current_status}")
+                    
+                    new_status = st.radio("Change Status", ["Active", "Inactive"], key="new_status",
+                                          index=0 if user['is_active'] else 1)
+                    
+                    if st.button("🔄 Update Status", type="primary", key="update_status") and authorize('manage_users'):
+                        if db.update_user(user['id'], is_active=new_status == "Active"):
+                            if new_status != "Active":
+                                _sign_out(selected_user)
+                            audit("User Updated", f"{selected_user}: status {new_status}")
+                            st.success(f"Account status updated to: {new_status}")
+                        else:
+                            st.error("Status could not be changed (an active administrator must remain).")
+                
+                with col2:
+                    st.markdown("#### Role Management")
+                    
+                    st.write(f"**Current Role:** {user['role']}")
+                    new_role = st.selectbox("Assign New Role", list(ROLES), key="assign_role",
+                                            index=ROLES.index(user['role']) if user['role'] in ROLES else 0)
+                    
+                    if st.button("👑 Update Role", type="primary", key="update_role") and authorize('manage_users'):
+                        if db.update_user(user['id'], role=new_role):
+                            _sign_out(selected_user)
+                            audit("User Updated", f"{selected_user}: role {new_role}")
+                            st.success(f"Role updated to: {new_role}")
+                        else:
+                            st.error("Role could not be changed (an active administrator must remain).")
+                
+                st.markdown("#### Store Assignment")
+                st.write(f"**Current Store:** {store_label(user['store_id'])}")
+                col_store, col_store_btn = st.columns([2, 1])
+                with col_store:
+                    new_store = st.selectbox("Works at", store_choices, format_func=store_label, key="assign_store",
+                                             index=store_choices.index(user['store_id']) if user['store_id'] in store_choices else 0)
+                with col_store_btn:
+                    if st.button("🏬 Update Store", type="primary", key="update_store") and authorize('manage_users'):
+                        if db.set_user_store(user['id'], new_store):
+                            # Signed out so the next login starts at the new store
+                            _sign_out(selected_user)
+                            audit("User Updated", f"{selected_user}: store {store_label(new_store)}")
+                            st.success(f"Store updated to: {store_label(new_store)}")
+                        else:
+                            st.error("Store could not be changed.")
+                
+                st.markdown("---")
+                st.markdown("#### Dangerous Zone")
+                
+                col_danger1, col_danger2 = st.columns(2)
+                
+                with col_danger1:
+                    if st.button("🔒 Force Password Reset", type="secondary", key="force_reset") and authorize('manage_users'):
+                        temporary = secrets.token_urlsafe(9)
+                        if db.update_user(user['id'], password=temporary):
+                            _sign_out(selected_user)
+                            audit("Password Reset", selected_user)
+                            st.warning(f"Password reset. Temporary password for {selected_user}: `{temporary}` "
+                                       "(shown once; share it securely).")
+                        else:
+                            st.error("Password could not be reset.")
+                
+                with col_danger2:
+                    confirm = st.checkbox("I confirm I want to delete this account", key="confirm_delete")
+                    if st.button("🗑️ Delete Account", type="secondary", key="delete_account", disabled=not confirm) \
+                            and authorize('manage_users'):
+                        # Accounts are deactivated rather than removed: sales and audit entries refer to them
+                        if db.deactivate_user(user['id']):
+                            _sign_out(selected_user)
+                            audit("User Deleted", selected_user, status='WARNING')
+                            st.error(f"Account '{selected_user}' deleted (deactivated).")
+                        else:
+                            st.error("Account could not be deleted (an active administrator must remain).")